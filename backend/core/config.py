@@ -6,3 +6,11 @@ SECRET_KEY = os.getenv("SECRET_KEY", "hackathon-demo-secret-change-in-production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 DATABASE_URL = "sqlite:///./business_ai.db"
+
+# Grid emission factor for carbon estimates (kg CO2 per kWh). CARBON_HOURLY_FACTORS optionally
+# overrides it per hour of day with 24 comma-separated values, hour 0 first.
+CARBON_FACTOR_KG_PER_KWH = float(os.getenv("CARBON_FACTOR_KG_PER_KWH", "0.4"))
+CARBON_HOURLY_FACTORS = os.getenv("CARBON_HOURLY_FACTORS", "")
+
+# Rendered PDF reports, one file per combination of module data versions
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", "./report_cache")
@@ -1,5 +1,5 @@
 # SQLite database setup
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from core.config import DATABASE_URL
 
@@ -17,3 +17,28 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def ensure_columns(bind=engine) -> None:
+    """
+    Add model columns (and their indexes) that are missing from existing tables.
+
+    create_all() only creates whole tables, so databases created by an older
+    version of the app would otherwise never pick up newly added columns.
+    Only additive, nullable/defaulted changes are handled here.
+    """
+    insp = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col.type.compile(dialect=bind.dialect)}"
+                if col.default is not None and col.default.is_scalar:
+                    ddl += f" DEFAULT {col.default.arg!r}"
+                conn.execute(text(ddl))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
@@ -1,17 +1,66 @@
 # FastAPI app: CORS, routers, demo data init
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from database import engine
 from database import Base
+from database import ensure_columns
 from services.demo_data import init_db
+from services.search_index import ensure_search_index
+from services.energy_timeseries import backfill_timestamps
+from services.energy_profile_service import ensure_energy_profile
+from services.anomaly_engine import backfill_anomalies
+from services.reorder_engine import backfill_reorder_points
+from services.classification_engine import backfill_inventory_classes
+from services.data_version_service import sync_row_counts
+from services.energy_stream import buffer as reading_buffer
+from services.report_jobs import fail_interrupted_jobs, shutdown_report_workers
 from models.inventory import InventoryItem
 from models.expense import ExpenseItem
 from models.fraud import FraudRecord
 from models.green_grid import GreenGridRecord
-from routers import auth, expense, fraud, inventory, green_grid, health, recommendations, carbon, report, chat, ai
+from models.vendor import Vendor
+from models.inventory_snapshot import InventorySnapshot
+from models.inventory_upload import InventoryUpload
+from models.data_version import DataVersion
+from models.energy_profile import EnergyProfileCell
+from models.energy_tariff import EnergyTariffRate
+from models.energy_anomaly_state import EnergyAnomalyState
+from models.energy_forecast import EnergyForecastModel
+from models.health_score import HealthScoreRecord
+from models.report_job import ReportJob
+from routers import auth, expense, fraud, inventory, green_grid, health, recommendations, carbon, report, chat, ai, data
+
+def prepare_database() -> None:
+    """Create tables, migrate and backfill older databases, and seed the demo user."""
+    Base.metadata.create_all(bind=engine)
+    ensure_columns()
+    ensure_search_index()
+    backfill_timestamps()
+    backfill_anomalies()
+    backfill_reorder_points()
+    backfill_inventory_classes()
+    ensure_energy_profile()
+    sync_row_counts()
+    fail_interrupted_jobs()
+    init_db()
+
 
-app = FastAPI(title="Lucent AI API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup work runs here, not at import: report worker processes (spawn) re-import
+    # the main module and must not fail the job they were started for
+    prepare_database()
+    # Streamed Green Grid readings are flushed in the background and once more on shutdown
+    reading_buffer.start()
+    yield
+    reading_buffer.stop()
+    shutdown_report_workers()
+
+
+app = FastAPI(title="Lucent AI API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,10 +70,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create tables and demo user
-Base.metadata.create_all(bind=engine)
-init_db()
-
 app.include_router(auth.router)
 app.include_router(expense.router)
 app.include_router(fraud.router)
@@ -36,6 +81,7 @@ app.include_router(carbon.router)
 app.include_router(report.router)
 app.include_router(chat.router)
 app.include_router(ai.router)
+app.include_router(data.router)
 
 
 @app.get("/health")
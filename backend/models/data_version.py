@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from database import Base
+
+class DataVersion(Base):
+    """Monotonically increasing data version per module (bumped on every write)."""
+    __tablename__ = "data_versions"
+
+    module = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    row_count = Column(Integer, nullable=False, default=0)   # module table rows as of the last bump
+    updated_at = Column(DateTime, nullable=True)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, Float
+from database import Base
+
+class EnergyAnomalyState(Base):
+    """Running EWMA mean/variance of usage per department (the online anomaly detector's state)."""
+    __tablename__ = "energy_anomaly_state"
+
+    department = Column(String(100), primary_key=True)
+    mean = Column(Float, nullable=False, default=0.0)
+    var = Column(Float, nullable=False, default=0.0)
+    readings = Column(Integer, nullable=False, default=0)
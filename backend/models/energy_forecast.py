@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from database import Base
+
+class EnergyForecastModel(Base):
+    """Fitted seasonal forecast parameters per department (hour-of-week profile plus linear trend)."""
+    __tablename__ = "energy_forecast_models"
+
+    department = Column(String(100), primary_key=True)
+    data_version = Column(Integer, nullable=False)     # green_grid data version the fit was made from
+    fitted_at = Column(DateTime, nullable=False)
+    t_ref = Column(DateTime, nullable=False)           # last observed hour; trend is measured from here
+    slope = Column(Float, nullable=False, default=0.0) # kWh per hour
+    profile = Column(JSON, nullable=False)             # 168 hour-of-week levels at t_ref, Monday 00:00 first
+    residual_std = Column(Float, nullable=False, default=0.0)
+    hours = Column(Integer, nullable=False, default=0) # hourly observations used
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, Float
+from database import Base
+
+class EnergyProfileCell(Base):
+    """Energy usage aggregated per department × day-of-week × hour-of-day (maintained on upload)."""
+    __tablename__ = "energy_profile"
+
+    department = Column(String(100), primary_key=True)
+    dow = Column(Integer, primary_key=True)       # 0 = Monday
+    hour = Column(Integer, primary_key=True)      # 0-23
+    total_kwh = Column(Float, nullable=False, default=0.0)
+    readings = Column(Integer, nullable=False, default=0)
+    max_kwh = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String, Float
+from database import Base
+
+class EnergyTariffRate(Base):
+    """Time-of-use electricity rate per day type and hour-of-day (cost per kWh)."""
+    __tablename__ = "energy_tariff_rates"
+
+    day_type = Column(String(16), primary_key=True)   # "weekday" | "weekend"
+    hour = Column(Integer, primary_key=True)          # 0-23
+    rate = Column(Float, nullable=False)
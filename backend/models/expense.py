@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, ForeignKey
 from database import Base
 
 class ExpenseItem(Base):
@@ -8,3 +8,4 @@ class ExpenseItem(Base):
     category = Column(String, index=True)
     amount = Column(Float)
     month = Column(String)
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), index=True, nullable=True)
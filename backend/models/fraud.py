@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
 from database import Base
 
 class FraudRecord(Base):
@@ -8,3 +8,4 @@ class FraudRecord(Base):
     transaction_id = Column(String, unique=True, index=True)
     amount = Column(Integer)
     is_fraud = Column(Boolean, default=False)
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), index=True, nullable=True)
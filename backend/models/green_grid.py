@@ -1,9 +1,19 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, Index
 from database import Base
 
 class GreenGridRecord(Base):
     __tablename__ = "green_grid_records"
 
     id = Column(Integer, primary_key=True, index=True)
-    hour = Column(String)
+    hour = Column(String)  # raw hour/date label as uploaded
+    ts = Column(DateTime, nullable=True, index=True)  # parsed reading time (UTC); NULL for hour-only labels
+    hour_of_day = Column(Integer, nullable=True)      # 0-23 for hour-only labels (no date)
+    department = Column(String(100), nullable=True)
     usage_kwh = Column(Float)
+    anomaly_score = Column(Float, nullable=True)     # EWMA z-score at ingest (NULL during warm-up)
+    is_anomaly = Column(Boolean, nullable=True)      # NULL until scored
+
+    __table_args__ = (
+        Index("ix_green_grid_department_ts", "department", "ts"),
+        Index("ix_green_grid_anomaly_ts", "is_anomaly", "ts"),
+    )
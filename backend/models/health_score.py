@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from database import Base
+
+class HealthScoreRecord(Base):
+    """One composite health score per distinct combination of module data versions."""
+    __tablename__ = "health_score_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recorded_at = Column(DateTime, nullable=False, index=True)
+    versions = Column(String(64), nullable=False)     # e.g. "expense=3,fraud=2,green_grid=7,inventory=5"
+    score = Column(Integer, nullable=False)
+    cash_flow = Column(Integer, nullable=True)        # factor scores; NULL when the module has no data
+    fraud_risk = Column(Integer, nullable=True)
+    inventory = Column(Integer, nullable=True)
+    sustainability = Column(Integer, nullable=True)
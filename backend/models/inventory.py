@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, Index
 from database import Base
 
 class InventoryItem(Base):
@@ -6,5 +6,12 @@ class InventoryItem(Base):
     id = Column(Integer, primary_key=True, index=True)
     item_name = Column(String(255), unique=True, index=True, nullable=False)
     category = Column(String(255), nullable=False)
-    quantity = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0, index=True)
     price = Column(Float, nullable=False, default=0.0)
+    reorder_at = Column(Integer, nullable=True)  # maintained by services.reorder_engine
+    abc_class = Column(String(1), nullable=True, index=True)  # maintained by services.classification_engine
+    xyz_class = Column(String(1), nullable=True, index=True)
+
+    __table_args__ = (
+        Index("ix_inventory_category_quantity", "category", "quantity"),
+    )
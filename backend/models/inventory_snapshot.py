@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from database import Base
+
+class InventorySnapshot(Base):
+    """Append-only stock history: one row per SKU per inventory upload."""
+    __tablename__ = "inventory_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    item_name = Column(String(255), nullable=False)
+    category = Column(String(255), nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    price = Column(Float, nullable=False, default=0.0)
+    captured_at = Column(DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_inventory_snapshots_item_time", "item_name", "captured_at"),
+    )
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, DateTime
+from database import Base
+
+class InventoryUpload(Base):
+    """One row per inventory upload; snapshot readers forward-fill unchanged SKUs onto these times."""
+    __tablename__ = "inventory_uploads"
+
+    id = Column(Integer, primary_key=True, index=True)
+    captured_at = Column(DateTime, nullable=False, index=True)   # shared with the upload's snapshot rows
+    items = Column(Integer, nullable=False, default=0)           # SKUs in the upload
+    changed_items = Column(Integer, nullable=False, default=0)   # snapshot rows written
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from database import Base
+
+class ReportJob(Base):
+    """Full-detail PDF report rendered in a worker process; progress is written back as it renders."""
+    __tablename__ = "report_jobs"
+
+    id = Column(String(32), primary_key=True)           # uuid4 hex
+    status = Column(String(16), nullable=False, index=True, default="queued")   # queued | running | done | failed
+    requested_by = Column(String(255), nullable=True)   # token subject
+    created_at = Column(DateTime, nullable=False, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    rows_total = Column(Integer, nullable=False, default=0)   # appendix rows expected (registry row counts)
+    rows_done = Column(Integer, nullable=False, default=0)
+    pages = Column(Integer, nullable=False, default=0)
+    progress = Column(Float, nullable=False, default=0.0)     # 0..1
+    path = Column(String(512), nullable=True)
+    error = Column(String(512), nullable=True)
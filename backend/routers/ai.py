@@ -1,18 +1,27 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Any, Dict, Optional
+from sqlalchemy.orm import Session
 
 from core.security import get_current_user
-from services.business_assistant import generate_business_response
+from database import get_db
+from services.metrics_snapshot import answer_question, stream_answer
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
 
 class AskRequest(BaseModel):
     question: str
-    module_data: Optional[Dict[str, Any]] = None
 
 
 @router.post("/ask")
-def ai_ask(req: AskRequest, user=Depends(get_current_user)):
-    return generate_business_response(req.question, req.module_data)
+def ai_ask(req: AskRequest, stream: bool = False, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    if stream:
+        # Same event stream as /chat/message?stream=true
+        return StreamingResponse(
+            stream_answer(db, req.question),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    # Metrics come from the server-side snapshot; client-supplied module_data is ignored
+    return answer_question(db, req.question)
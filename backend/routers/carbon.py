@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
 from core.security import get_current_user
+from database import get_db
 from services.carbon_service import get_carbon_estimate
 
 router = APIRouter(prefix="/carbon", tags=["carbon"])
 
 
 @router.get("/estimate")
-def carbon_estimate(user=Depends(get_current_user)):
-    return get_carbon_estimate()
+def carbon_estimate(user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return get_carbon_estimate(db)
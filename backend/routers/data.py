@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from core.security import get_current_user
+from database import SessionLocal, get_db
+from services.data_version_service import get_versions
+
+router = APIRouter(prefix="/data", tags=["data"])
+
+POLL_SECONDS = 1.0          # registry read interval per stream (one primary-key table scan)
+KEEPALIVE_SECONDS = 15.0
+
+
+@router.get("/versions")
+def data_versions(user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return get_versions(db)
+
+
+def _read_versions():
+    db = SessionLocal()
+    try:
+        return get_versions(db)
+    finally:
+        db.close()
+
+
+@router.get("/versions/stream")
+async def data_versions_stream(request: Request, user=Depends(get_current_user)):
+    """
+    Server-Sent Events: one `versions` event with the full registry on
+    connect, then one whenever any module's version changes.
+    """
+    async def events():
+        last = None
+        idle = 0.0
+        while not await request.is_disconnected():
+            versions = await run_in_threadpool(_read_versions)
+            if versions != last:
+                last = versions
+                idle = 0.0
+                yield f"event: versions\ndata: {json.dumps(versions)}\n\n"
+            elif idle >= KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keepalive\n\n"
+            await asyncio.sleep(POLL_SECONDS)
+            idle += POLL_SECONDS
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends, UploadFile, File
 from sqlalchemy.orm import Session
 from core.security import get_current_user
 from database import get_db
-from services.expense_service import get_expense_summary, get_expense_trend_data, upload_expense_csv, get_expense_status
+from services.data_version_service import bump_version
+from services.expense_service import get_expense_summary, get_expense_trend_data, upload_expense_csv, get_expense_status, get_expense_vendor_summary
 
 router = APIRouter(prefix="/expense", tags=["expense"])
 
@@ -21,6 +22,11 @@ def expense_trends(user=Depends(get_current_user), db: Session = Depends(get_db)
     return get_expense_trend_data(db)
 
 
+@router.get("/vendors")
+def expense_vendors(limit: int = 20, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return get_expense_vendor_summary(db, limit)
+
+
 @router.post("/upload-csv")
 def upload_csv(file: UploadFile = File(...), user=Depends(get_current_user), db: Session = Depends(get_db)):
     return upload_expense_csv(file, db)
@@ -31,6 +37,7 @@ from models.expense import ExpenseItem
 def clear_expense_data(user=Depends(get_current_user), db: Session = Depends(get_db)):
     try:
         db.query(ExpenseItem).delete()
+        bump_version(db, "expense")
         db.commit()
         return {"message": "Data cleared successfully"}
     except Exception as e:
@@ -2,9 +2,11 @@ from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from sqlalchemy.orm import Session
 from core.security import get_current_user
 from database import get_db
-from services.fraud_service import get_fraud_insights, get_fraud_chart_data, upload_fraud_csv, get_fraud_status
+from services.data_version_service import bump_version
+from services.fraud_service import get_fraud_insights, get_fraud_chart_data, upload_fraud_csv, get_fraud_status, get_fraud_vendor_summary
 from services.explainability_engine import explain_transaction
 from services.recommendation_engine import get_fraud_recommendations
+from services.search_index import search_fraud
 
 router = APIRouter(prefix="/fraud", tags=["fraud"])
 
@@ -23,6 +25,16 @@ def fraud_chart(user=Depends(get_current_user), db: Session = Depends(get_db)):
     return get_fraud_chart_data(db)
 
 
+@router.get("/vendors")
+def fraud_vendors(limit: int = 20, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return get_fraud_vendor_summary(db, limit)
+
+
+@router.get("/search")
+def fraud_search(q: str, limit: int = 20, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return search_fraud(db, q, limit)
+
+
 @router.post("/upload-csv")
 def upload_csv(file: UploadFile = File(...), user=Depends(get_current_user), db: Session = Depends(get_db)):
     return upload_fraud_csv(file, db)
@@ -33,6 +45,7 @@ from models.fraud import FraudRecord
 def clear_fraud_data(user=Depends(get_current_user), db: Session = Depends(get_db)):
     try:
         db.query(FraudRecord).delete()
+        bump_version(db, "fraud")
         db.commit()
         return {"message": "Data cleared successfully"}
     except Exception as e:
@@ -1,8 +1,19 @@
-from fastapi import APIRouter, Depends, UploadFile, File
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from core.security import get_current_user
 from database import get_db
-from services.green_grid_service import get_green_grid_data, get_energy_chart_data, upload_green_csv, get_green_grid_status
+from services.anomaly_engine import get_anomalies
+from services.data_version_service import bump_version
+from services.energy_cost_engine import get_energy_costs
+from services.energy_forecast_engine import get_energy_forecast
+from services.energy_stream import get_live_stats, ingest_ndjson
+from services.tariff_service import get_tariff, set_tariff
+from services.green_grid_service import get_green_grid_data, get_energy_chart_data, get_energy_readings, get_departments, get_load_shift_plan, upload_green_csv, get_green_grid_status
 
 router = APIRouter(prefix="/green-grid", tags=["green-grid"])
 
@@ -12,13 +23,123 @@ def green_grid_status(db: Session = Depends(get_db), user=Depends(get_current_us
 
 
 @router.get("/data")
-def green_grid_data(user=Depends(get_current_user), db: Session = Depends(get_db)):
-    return get_green_grid_data(db)
+def green_grid_data(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return get_green_grid_data(db, start, end, department)
 
 
 @router.get("/chart")
-def energy_chart(user=Depends(get_current_user), db: Session = Depends(get_db)):
-    return get_energy_chart_data(db)
+def energy_chart(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+    max_points: int = 1000,
+    method: str = "bucket",
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return get_energy_chart_data(db, start, end, department, max_points, method)
+
+
+@router.get("/readings")
+def energy_readings(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return get_energy_readings(db, start, end, department)
+
+
+@router.post("/readings")
+async def ingest_readings(request: Request, user=Depends(get_current_user)):
+    """NDJSON batch, one reading per line. The raw body is read whatever the Content-Type."""
+    body = await request.body()
+    return await run_in_threadpool(ingest_ndjson, body)
+
+
+@router.get("/live")
+def live_stats(department: Optional[str] = None, user=Depends(get_current_user)):
+    return get_live_stats(department)
+
+
+@router.get("/anomalies")
+def energy_anomalies(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+    limit: int = 200,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return get_anomalies(db, start, end, department, limit)
+
+
+@router.get("/forecast")
+def energy_forecast(
+    hours: int = 24,
+    department: Optional[str] = None,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return get_energy_forecast(db, hours, department)
+
+
+@router.get("/load-shift")
+def load_shift_plan(
+    flexible_percent: float = 20.0,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return get_load_shift_plan(db, flexible_percent, start, end, department)
+
+
+class TariffBand(BaseModel):
+    day_type: str
+    start_hour: int
+    end_hour: int
+    rate: float
+
+
+class TariffRequest(BaseModel):
+    bands: List[TariffBand]
+
+
+@router.get("/tariff")
+def energy_tariff(user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return get_tariff(db)
+
+
+@router.put("/tariff")
+def update_energy_tariff(request: TariffRequest, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return set_tariff(db, [band.model_dump() for band in request.bands])
+
+
+@router.get("/cost")
+def energy_cost(
+    period: str = "month",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+    flexible_percent: float = 20.0,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return get_energy_costs(db, period, start, end, department, flexible_percent)
+
+
+@router.get("/departments")
+def energy_departments(user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return get_departments(db)
 
 
 @router.post("/upload-csv")
@@ -26,11 +147,16 @@ def upload_csv(file: UploadFile = File(...), user=Depends(get_current_user), db:
     return upload_green_csv(file, db)
 
 from models.green_grid import GreenGridRecord
+from models.energy_profile import EnergyProfileCell
+from models.energy_anomaly_state import EnergyAnomalyState
 
 @router.delete("/clear")
 def clear_green_grid_data(user=Depends(get_current_user), db: Session = Depends(get_db)):
     try:
         db.query(GreenGridRecord).delete()
+        db.query(EnergyProfileCell).delete()
+        db.query(EnergyAnomalyState).delete()
+        bump_version(db, "green_grid")
         db.commit()
         return {"message": "Data cleared successfully"}
     except Exception as e:
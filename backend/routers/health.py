@@ -1,10 +1,17 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
 from core.security import get_current_user
-from services.health_score_service import get_health_score
+from database import get_db
+from services.health_score_service import get_health_score, get_health_history
 
 router = APIRouter(prefix="/health", tags=["health"])
 
 
 @router.get("/score")
-def health_score(user=Depends(get_current_user)):
-    return get_health_score()
+def health_score(user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return get_health_score(db)
+
+
+@router.get("/history")
+def health_history(limit: int = 90, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return get_health_history(db, limit)
@@ -1,9 +1,15 @@
+from datetime import datetime
+from typing import Optional
+
 from fastapi import APIRouter, Depends, UploadFile, File
 from sqlalchemy.orm import Session
 from core.security import get_current_user
 from database import get_db
-from services.inventory_service import get_inventory_summary, get_inventory_forecast, process_inventory_csv, get_inventory_status
+from services.inventory_service import get_inventory_summary, get_inventory_items, get_inventory_forecast, get_inventory_item_forecast, get_inventory_stockout_risk, process_inventory_csv, get_inventory_status
+from services.data_version_service import bump_version
+from services.inventory_history_service import list_snapshot_times, get_inventory_as_of, get_inventory_delta
 from services.recommendation_engine import get_inventory_recommendations
+from services.search_index import search_inventory
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
@@ -16,8 +22,34 @@ def upload_inventory_csv(file: UploadFile = File(...), db: Session = Depends(get
     return process_inventory_csv(file, db)
 
 @router.get("/summary")
-def inventory_summary(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    return get_inventory_summary(db)
+def inventory_summary(
+    abc_class: Optional[str] = None,
+    xyz_class: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    return get_inventory_summary(db, abc_class, xyz_class)
+
+
+@router.get("/items")
+def inventory_items(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    sort: str = "name",
+    order: str = "asc",
+    category: Optional[str] = None,
+    below_threshold: bool = False,
+    abc_class: Optional[str] = None,
+    xyz_class: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    return get_inventory_items(db, limit, cursor, sort, order, category, below_threshold, abc_class, xyz_class)
+
+
+@router.get("/search")
+def inventory_search(q: str, limit: int = 20, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return search_inventory(db, q, limit)
 
 
 @router.get("/forecast")
@@ -25,16 +57,50 @@ def inventory_forecast(db: Session = Depends(get_db), user=Depends(get_current_u
     return get_inventory_forecast(db)
 
 
+@router.get("/forecast/items")
+def inventory_item_forecast(limit: int = 50, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return get_inventory_item_forecast(db, limit)
+
+
+@router.get("/stockout-risk")
+def inventory_stockout_risk(
+    weeks: int = 4,
+    scenarios: int = 1000,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    return get_inventory_stockout_risk(db, weeks, scenarios, limit)
+
+
+@router.get("/history")
+def inventory_history(limit: int = 50, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return list_snapshot_times(db, limit)
+
+
+@router.get("/history/as-of")
+def inventory_as_of(at: Optional[datetime] = None, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return get_inventory_as_of(db, at)
+
+
+@router.get("/history/delta")
+def inventory_delta(start: datetime, end: Optional[datetime] = None, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return get_inventory_delta(db, start, end)
+
+
 @router.get("/recommendations")
 def inventory_recommendations(user=Depends(get_current_user)):
     return get_inventory_recommendations()
 
 from models.inventory import InventoryItem
+from models.inventory_snapshot import InventorySnapshot
 
 @router.delete("/clear")
 def clear_inventory_data(user=Depends(get_current_user), db: Session = Depends(get_db)):
     try:
         db.query(InventoryItem).delete()
+        db.query(InventorySnapshot).delete()
+        bump_version(db, "inventory")
         db.commit()
         return {"message": "Data cleared successfully"}
     except Exception as e:
@@ -1,16 +1,45 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy.orm import Session
 from core.security import get_current_user
-from services.report_service import generate_report_pdf
+from database import get_db
+from services.report_cache import etag_matches, get_report_file
+from services.report_jobs import create_report_job, get_report_job, job_status
 
 router = APIRouter(prefix="/report", tags=["report"])
 
 
 @router.get("/pdf")
-def download_report(user=Depends(get_current_user)):
-    pdf_bytes = generate_report_pdf()
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=business_report.pdf"},
-    )
+def download_report(request: Request, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    # Served from the on-disk cache (pre-rendered after uploads); unchanged data answers 304
+    path, etag = get_report_file(db)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="application/pdf", filename="business_report.pdf", headers=headers)
+
+
+@router.post("/jobs", status_code=202)
+def create_job(user=Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Start a full-detail report (every transaction, item and reading) in the background.
+
+    Appendices are complete. Pages are laid out in fixed-size parts and each part is
+    merged into the output file as soon as it is finished, so a worker's memory does
+    not grow with the row count.
+    """
+    return create_report_job(db, user)
+
+
+@router.get("/jobs/{job_id}")
+def report_job(job_id: str, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    """Job progress as JSON while queued/running/failed; the PDF itself once done."""
+    job = get_report_job(db, job_id, user)
+    if job.status == "done":
+        return FileResponse(
+            job.path,
+            media_type="application/pdf",
+            filename="business_report_full.pdf",
+            headers={"X-Report-Pages": str(job.pages)},
+        )
+    return job_status(job)
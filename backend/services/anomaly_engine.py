@@ -0,0 +1,192 @@
+"""
+Online anomaly detection for Green Grid energy usage.
+
+Each department keeps an exponentially weighted mean and variance of its
+readings (alpha = EWMA_ALPHA). A reading is scored against the state before
+it is folded in, z = (x − mean) / sqrt(var), and flagged when |z| exceeds
+Z_THRESHOLD once WARMUP_READINGS readings have been seen. That catches local
+spikes a global average misses, and the update is O(1) per reading with the
+state persisted in energy_anomaly_state between uploads.
+
+Batches are scored without a Python loop: both updates are first-order
+linear recurrences of the form y_t = (1 − a)·y_{t−1} + a·v_t, which is
+exactly pandas' ewm(adjust=False).mean() once the stored state is prepended
+as the seed value:
+
+    mean_t = (1 − a)·mean_{t−1} + a·x_t
+    var_t  = (1 − a)·var_{t−1}  + a·(1 − a)·d_t²,   d_t = x_t − mean_{t−1}
+
+The same code backfills historical readings at startup.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import engine
+from models.energy_anomaly_state import EnergyAnomalyState
+from models.green_grid import GreenGridRecord
+
+
+EWMA_ALPHA = 0.1            # ~ the last 20 readings dominate the baseline
+Z_THRESHOLD = 3.5
+WARMUP_READINGS = 24        # no flags until a department's baseline has seen a day of hourly readings
+
+_STATE_COLUMNS = ["department", "mean", "var", "readings"]
+
+
+def _ewm(values: pd.Series, groups: pd.Series) -> pd.Series:
+    return values.groupby(groups, sort=False).transform(
+        lambda s: s.ewm(alpha=EWMA_ALPHA, adjust=False).mean()
+    )
+
+
+def score_batch(readings: pd.DataFrame, state: pd.DataFrame) -> tuple:
+    """
+    Score readings (ts, department, usage_kwh) against per-department state
+    (department, mean, var, readings). Readings are processed in time order
+    within each department. Returns (scores, flags, new_state) with scores and
+    flags aligned to readings.index.
+    """
+    a = EWMA_ALPHA
+    rows = readings[["department", "ts", "usage_kwh"]].copy()
+    rows["seed"] = False
+    seeds = state[state["department"].isin(rows["department"].unique())]
+    seeds = pd.DataFrame({
+        "department": seeds["department"].to_numpy(),
+        "ts": pd.NaT,
+        "usage_kwh": seeds["mean"].to_numpy(dtype=float),
+        "seed": True,
+        "seed_var": seeds["var"].to_numpy(dtype=float),
+        "prior": seeds["readings"].to_numpy(dtype=int),
+    }, index=-1 - np.arange(len(seeds)))   # readings keep their own (non-negative) index
+    # Seed rows sort first in their department; NaT would otherwise sort last
+    frame = pd.concat([seeds, rows], ignore_index=False)
+    frame = frame.assign(_order=~frame["seed"]).sort_values(["department", "_order", "ts"], kind="stable")
+    dept = frame["department"]
+
+    mean = _ewm(frame["usage_kwh"], dept)
+    mean_before = mean.groupby(dept, sort=False).shift(1)
+    first = mean_before.isna()            # seed row, or a department's first ever reading
+    d = (frame["usage_kwh"] - mean_before).where(~first, 0.0)
+    v = ((1 - a) * d ** 2).where(~frame["seed"], frame["seed_var"])
+    var = _ewm(v, dept)
+    var_before = var.groupby(dept, sort=False).shift(1)
+
+    prior = frame["prior"].groupby(dept, sort=False).transform("max").fillna(0)
+    seen = prior + (~frame["seed"]).groupby(dept, sort=False).cumsum() - 1   # readings before this one
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = d / np.sqrt(var_before)
+    scored = ~first & (seen >= WARMUP_READINGS) & (var_before > 0)
+    z = z.where(scored)
+    flags = (z.abs() > Z_THRESHOLD) & scored
+
+    real = ~frame["seed"]
+    tail = pd.DataFrame({"department": dept, "mean": mean, "var": var, "readings": seen + 1})
+    new_state = tail[real].groupby("department", sort=False).tail(1)
+    return z[real].reindex(readings.index), flags[real].reindex(readings.index), new_state[_STATE_COLUMNS]
+
+
+def load_state(db: Session) -> pd.DataFrame:
+    q = select(*(getattr(EnergyAnomalyState, c) for c in _STATE_COLUMNS))
+    return pd.DataFrame(db.execute(q).all(), columns=_STATE_COLUMNS)
+
+
+def save_state(state: pd.DataFrame, db: Session) -> None:
+    """Upsert per-department detector state. Runs in the caller's transaction."""
+    if state.empty:
+        return
+    stmt = sqlite_insert(EnergyAnomalyState)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EnergyAnomalyState.department],
+        set_={"mean": stmt.excluded.mean, "var": stmt.excluded.var, "readings": stmt.excluded.readings},
+    )
+    db.execute(stmt, [
+        {"department": dept, "mean": float(m), "var": float(v), "readings": int(n)}
+        for dept, m, v, n in state.itertuples(index=False)
+    ])
+
+
+def score_readings(readings: pd.DataFrame, db: Session) -> pd.DataFrame:
+    """Add anomaly_score / is_anomaly columns to prepared readings and advance the stored state."""
+    if readings.empty:
+        return readings
+    scores, flags, state = score_batch(readings, load_state(db))
+    save_state(state, db)
+    return readings.assign(
+        anomaly_score=scores.astype(object).where(scores.notna(), None),
+        is_anomaly=flags.astype(bool),
+    )
+
+
+def backfill_anomalies(bind=engine) -> None:
+    """Score readings stored before detection existed by replaying each department's history."""
+    with Session(bind) as db:
+        if db.query(GreenGridRecord.id).filter(
+            GreenGridRecord.is_anomaly.is_(None), GreenGridRecord.ts.is_not(None)
+        ).first() is None:
+            return
+        rows = db.execute(
+            select(GreenGridRecord.id, GreenGridRecord.department, GreenGridRecord.ts,
+                   GreenGridRecord.usage_kwh, GreenGridRecord.is_anomaly)
+            .where(GreenGridRecord.ts.is_not(None), GreenGridRecord.usage_kwh.is_not(None))
+        ).all()
+        df = pd.DataFrame(rows, columns=["id", "department", "ts", "usage_kwh", "is_anomaly"])
+        df["department"] = df["department"].fillna("General")
+        scores, flags, state = score_batch(df, load_state(db).iloc[0:0])
+        todo = df["is_anomaly"].isna().to_numpy()
+        db.execute(update(GreenGridRecord), [
+            {"id": int(i), "anomaly_score": None if np.isnan(z) else float(z), "is_anomaly": bool(f)}
+            for i, z, f in zip(df["id"][todo], scores[todo].astype(float), flags[todo])
+        ])
+        db.query(EnergyAnomalyState).delete()
+        save_state(state, db)
+        db.commit()
+
+
+def get_anomalies(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+    limit: int = 200,
+) -> Dict[str, Any]:
+    """Flagged readings, newest first, served from the (is_anomaly, ts) index."""
+    if not 1 <= limit <= 5000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 5000")
+    filters = [GreenGridRecord.is_anomaly.is_(True)]
+    if department:
+        filters.append(GreenGridRecord.department == department)
+    if start is not None:
+        filters.append(GreenGridRecord.ts >= start)
+    if end is not None:
+        filters.append(GreenGridRecord.ts < end)
+    total = db.query(GreenGridRecord.id).filter(*filters).count()
+    rows = (
+        db.query(GreenGridRecord.ts, GreenGridRecord.department, GreenGridRecord.usage_kwh, GreenGridRecord.anomaly_score)
+        .filter(*filters)
+        .order_by(GreenGridRecord.ts.desc())
+        .limit(limit)
+        .all()
+    )
+    items: List[Dict[str, Any]] = [
+        {
+            "ts": ts.isoformat(),
+            "department": dept,
+            "usage_kwh": round(float(usage), 3),
+            "z_score": round(float(z), 2) if z is not None else None,
+            "direction": "spike" if (z or 0) > 0 else "drop",
+        }
+        for ts, dept, usage, z in rows
+    ]
+    return {
+        "total": total,
+        "threshold_z": Z_THRESHOLD,
+        "alpha": EWMA_ALPHA,
+        "anomalies": items,
+    }
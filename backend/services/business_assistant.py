@@ -1,170 +1,275 @@
 # Business Assistant: contextual responses using real module metrics
-from typing import Any, Dict, List
+import re
+from typing import Any, Callable, Dict, List, Mapping, Tuple
 
 
-def generate_business_response(question: str, module_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Generate a structured response using real metrics from module data."""
-    q = question.lower().strip()
-    metrics = module_data or {}
+# Intent → keywords, matched case-insensitively from the start of a word: a plain
+# keyword must be the whole word (or its plural), a keyword ending in "*" is a stem
+# that matches any word it begins. List order is the matcher's alternation order.
+INTENT_KEYWORDS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("expense", ("expense", "spend*", "cost", "budget")),
+    ("fraud", ("fraud*", "risk*", "anomal*", "threat", "suspicious")),
+    ("inventory", ("inventory", "inventories", "stock*", "reorder*", "item", "product")),
+    ("health", ("health*", "score", "overall", "performance")),
+    ("carbon", ("carbon", "sustainab*", "emission", "co2", "footprint")),
+    ("green_grid", ("green", "energy", "power", "electric*", "kwh")),
+    ("recommendations", ("recommend*", "suggest*", "advice", "tip", "improv*")),
+    ("greeting", ("hello", "hi", "hey", "help")),
+]
 
-    health = metrics.get("health") or {}
+# module_data keys each intent reads; only these providers are resolved
+INTENT_MODULES: Dict[str, Tuple[str, ...]] = {
+    "expense": ("expense",),
+    "fraud": ("fraud",),
+    "inventory": ("inventory",),
+    "health": ("health",),
+    "carbon": ("carbon",),
+    "green_grid": ("green_grid",),
+    "recommendations": ("recommendations",),
+    "greeting": (),
+    "overview": ("health", "expense", "fraud", "inventory", "green_grid"),
+}
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation (the answer-memo key)."""
+    return re.sub(r"\s+", " ", question.lower()).strip().rstrip("?!. ")
+
+
+def _keyword_pattern(keyword: str) -> str:
+    if keyword.endswith("*"):
+        return re.escape(keyword[:-1]) + r"\w*"
+    return re.escape(keyword) + r"(?:e?s)?\b"
+
+
+# Every keyword in one alternation with a named group per intent, compiled once:
+# finditer scans the question a single time and m.lastgroup is the intent.
+_INTENT_PATTERN = re.compile(r"\b(?:" + "|".join(
+    f"(?P<{intent}>" + "|".join(_keyword_pattern(w) for w in keywords) + ")"
+    for intent, keywords in INTENT_KEYWORDS
+) + ")")
+
+
+def detect_intents(question: str) -> List[str]:
+    """
+    Every intent mentioned in the question, in order of first mention.
+    A greeting only counts when nothing else matched; no match is "overview".
+    """
+    found: Dict[str, None] = {}
+    for match in _INTENT_PATTERN.finditer(question.lower()):
+        found.setdefault(match.lastgroup, None)
+    intents = [i for i in found if i != "greeting"] or list(found)
+    return intents or ["overview"]
+
+
+class LazyModuleData:
+    """
+    Read-only module_data mapping whose values are zero-argument providers,
+    each called on first access only. A question about fraud therefore
+    computes fraud insights and nothing else.
+    """
+
+    def __init__(self, providers: Mapping[str, Callable[[], Any]]):
+        self._providers = providers
+        self._values: Dict[str, Any] = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self._providers:
+            return default
+        if key not in self._values:
+            self._values[key] = self._providers[key]()
+        return self._values[key]
+
+
+def _expense_answer(metrics) -> Tuple[List[str], List[str]]:
     expense = metrics.get("expense") or {}
+    if metrics.get("expense") is not None and expense.get("total", 0) > 0:
+        total = expense.get("total", 0)
+        trend = expense.get("trend", "stable")
+        trend_pct = expense.get("trend_percent", 0)
+        by_cat = expense.get("by_category", [])
+        top = sorted(by_cat, key=lambda x: x.get("value", 0), reverse=True)[:3]
+        parts = [f"**Total expenses:** ${total:,.2f} (trend: {trend}, {trend_pct:+.1f}%)"]
+        if top:
+            parts.append("**Top categories:** " + ", ".join(
+                f"{c.get('name', '')} (${c.get('value', 0):,.2f})" for c in top
+            ))
+        return ["\n\n".join(parts)], ["expense"]
+    return [
+        "No expense data has been uploaded yet. Go to **Expense Sense** and upload a CSV with columns: `category`, `amount`, `month` to get spending insights."
+    ], []
+
+
+def _fraud_answer(metrics) -> Tuple[List[str], List[str]]:
     fraud = metrics.get("fraud") or {}
+    if metrics.get("fraud") is not None and fraud.get("total_transactions", 0) > 0:
+        anomalies = fraud.get("anomalies_detected", 0)
+        total_tx = fraud.get("total_transactions", 0)
+        risk = fraud.get("risk_level", "unknown")
+        pct = round((anomalies / total_tx * 100) if total_tx > 0 else 0, 1)
+        return [
+            f"**Fraud risk level:** {risk.upper()}\n\n{anomalies} anomalies detected out of {total_tx} transactions ({pct}% fraud rate)."
+        ], ["fraud"]
+    return [
+        "No transaction data has been uploaded yet. Go to **Fraud Lens** and upload a CSV with columns: `transaction_id`, `amount`, `is_fraud` to run anomaly detection."
+    ], []
+
+
+def _inventory_answer(metrics) -> Tuple[List[str], List[str]]:
     inventory = metrics.get("inventory") or {}
-    green_grid = metrics.get("green_grid") or {}
+    if metrics.get("inventory") is not None and inventory.get("total_items"):
+        low = inventory.get("low_stock_count", 0)
+        low_items = inventory.get("low_stock_items", [])[:5]
+        parts = [f"**Total items tracked:** {inventory.get('total_items', 0)} | **Low stock items:** {low}"]
+        if low_items:
+            parts.append("**Needs reordering:** " + ", ".join(
+                f"{i.get('name', '')} ({i.get('stock', 0)} left"
+                + (f", ~{i['days_of_cover']:.0f} days of cover)" if i.get("days_of_cover") is not None else ")")
+                for i in low_items
+            ))
+        else:
+            parts.append("All items are well-stocked.")
+        return ["\n\n".join(parts)], ["inventory"]
+    return [
+        "No inventory data has been uploaded yet. Go to **Smart Inventory** and upload a CSV with columns: `item_name`, `category`, `quantity`, `price` to track stock levels."
+    ], []
+
+
+def _health_answer(metrics) -> Tuple[List[str], List[str]]:
+    health = metrics.get("health") or {}
+    if health:
+        score = health.get("score", 0)
+        level = health.get("level", "unknown")
+        factors = health.get("factors", [])
+        parts = [f"**Business health score:** {score}/100 ({level})"]
+        if factors:
+            parts.append("**Factors:** " + ", ".join(
+                f"{f.get('name', '')}: {f.get('score', 0)}" for f in factors
+            ))
+        return ["\n\n".join(parts)], ["health"]
+    return ["Health score aggregates data from all modules. Upload data to each module to improve your score."], []
+
+
+def _carbon_answer(metrics) -> Tuple[List[str], List[str]]:
     carbon = metrics.get("carbon") or {}
+    if carbon:
+        kg = carbon.get("kg_co2_per_year", 0)
+        equiv = carbon.get("equivalent", "")
+        rating = carbon.get("rating", "")
+        answer = f"**Carbon footprint:** {kg:,.0f} kg CO₂/yr\n\n{equiv}. Rating: **{rating}**"
+        if carbon.get("low_confidence"):
+            answer += f"\n\nLow confidence: annualised from {carbon.get('basis_days', 0)} day(s) of readings."
+        return [answer], ["carbon"]
+    return ["Carbon estimates are derived from your energy data. Upload data to Green Grid for sustainability insights."], []
+
+
+def _green_grid_answer(metrics) -> Tuple[List[str], List[str]]:
+    green_grid = metrics.get("green_grid") or {}
+    if metrics.get("green_grid") is not None and green_grid.get("current_usage_kwh", 0) > 0:
+        usage = green_grid.get("current_usage_kwh", 0)
+        savings = green_grid.get("potential_savings_percent", 0)
+        recs = green_grid.get("recommendations", [])
+        parts = [f"**Average energy usage:** {usage:.2f} kWh\n\n**Potential savings:** {savings:.1f}%"]
+        peak_hours = green_grid.get("peak_hours") or []
+        if peak_hours:
+            parts.append("**Peak hours:** " + ", ".join(f"{h:02d}:00" for h in peak_hours))
+        if recs:
+            parts.append("**Recommendations:** " + "; ".join(recs[:2]))
+        return ["\n\n".join(parts)], ["green_grid"]
+    return [
+        "No energy data uploaded yet. Go to **Green Grid** and upload a CSV with columns: `hour`, `usage_kwh` to get energy insights."
+    ], []
+
+
+def _recommendations_answer(metrics) -> Tuple[List[str], List[str]]:
     recommendations = metrics.get("recommendations") or []
+    if recommendations:
+        parts = [f"**{len(recommendations)} AI recommendations:**"]
+        for r in recommendations[:5]:
+            title = r.get('title', '')
+            priority = r.get('priority', '')
+            parts.append(f"• **{title}** ({priority} priority)")
+        return ["\n\n".join(parts)], ["recommendations"]
+    return ["No recommendations available yet. Upload data to each module to generate AI-powered recommendations."], []
 
-    # Helper: a module has real data if it was fetched (not None)
-    has_expense = metrics.get("expense") is not None
-    has_fraud = metrics.get("fraud") is not None
-    has_inventory = metrics.get("inventory") is not None
-    has_green = metrics.get("green_grid") is not None
 
-    answer_parts: List[str] = []
-    metrics_used: List[str] = []
+def _greeting_answer(metrics) -> Tuple[List[str], List[str]]:
+    return [
+        "Hello! I'm your **Business AI Assistant**.\n\nI can answer questions about:\n"
+        "• 💰 **Expenses** — spending breakdown and trends\n"
+        "• 🛡️ **Fraud** — anomaly detection and risk level\n"
+        "• 📦 **Inventory** — stock levels and reorder alerts\n"
+        "• 📊 **Health Score** — overall business performance\n"
+        "• 🌱 **Energy** — consumption and sustainability\n"
+        "• 💡 **Recommendations** — AI-powered action items\n\n"
+        "Upload data to each module to unlock real insights."
+    ], []
 
-    if any(w in q for w in ("expense", "spend", "cost", "budget")):
-        if has_expense and expense.get("total", 0) > 0:
-            total = expense.get("total", 0)
-            trend = expense.get("trend", "stable")
-            trend_pct = expense.get("trend_percent", 0)
-            by_cat = expense.get("by_category", [])
-            top = sorted(by_cat, key=lambda x: x.get("value", 0), reverse=True)[:3]
-            parts = [f"**Total expenses:** ${total:,.2f} (trend: {trend}, {trend_pct:+.1f}%)"]
-            if top:
-                parts.append("**Top categories:** " + ", ".join(
-                    f"{c.get('name', '')} (${c.get('value', 0):,.2f})" for c in top
-                ))
-            answer_parts.append("\n\n".join(parts))
-            metrics_used.append("expense")
-        else:
-            answer_parts.append(
-                "No expense data has been uploaded yet. Go to **Expense Sense** and upload a CSV with columns: `category`, `amount`, `month` to get spending insights."
-            )
-
-    elif any(w in q for w in ("fraud", "risk", "anomal", "threat", "suspicious")):
-        if has_fraud and fraud.get("total_transactions", 0) > 0:
-            anomalies = fraud.get("anomalies_detected", 0)
-            total_tx = fraud.get("total_transactions", 0)
-            risk = fraud.get("risk_level", "unknown")
-            pct = round((anomalies / total_tx * 100) if total_tx > 0 else 0, 1)
-            answer_parts.append(
-                f"**Fraud risk level:** {risk.upper()}\n\n{anomalies} anomalies detected out of {total_tx} transactions ({pct}% fraud rate)."
-            )
-            metrics_used.append("fraud")
-        else:
-            answer_parts.append(
-                "No transaction data has been uploaded yet. Go to **Fraud Lens** and upload a CSV with columns: `transaction_id`, `amount`, `is_fraud` to run anomaly detection."
-            )
-
-    elif any(w in q for w in ("inventory", "stock", "reorder", "item", "product")):
-        if has_inventory and inventory.get("items"):
-            low = inventory.get("low_stock_count", 0)
-            items = inventory.get("items", [])
-            low_items = [i for i in items if i.get("stock", 0) <= i.get("reorder_at", 0)][:5]
-            parts = [f"**Total items tracked:** {len(items)} | **Low stock items:** {low}"]
-            if low_items:
-                parts.append("**Needs reordering:** " + ", ".join(
-                    f"{i.get('name', '')} ({i.get('stock', 0)} left)" for i in low_items
-                ))
-            else:
-                parts.append("All items are well-stocked.")
-            answer_parts.append("\n\n".join(parts))
-            metrics_used.append("inventory")
-        else:
-            answer_parts.append(
-                "No inventory data has been uploaded yet. Go to **Smart Inventory** and upload a CSV with columns: `item_name`, `category`, `quantity`, `price` to track stock levels."
-            )
-
-    elif any(w in q for w in ("health", "score", "overall", "performance")):
-        if health:
-            score = health.get("score", 0)
-            level = health.get("level", "unknown")
-            factors = health.get("factors", [])
-            parts = [f"**Business health score:** {score}/100 ({level})"]
-            if factors:
-                parts.append("**Factors:** " + ", ".join(
-                    f"{f.get('name', '')}: {f.get('score', 0)}" for f in factors
-                ))
-            answer_parts.append("\n\n".join(parts))
-            metrics_used.append("health")
-        else:
-            answer_parts.append("Health score aggregates data from all modules. Upload data to each module to improve your score.")
-
-    elif any(w in q for w in ("carbon", "sustainab", "emission", "co2", "footprint")):
-        if carbon:
-            kg = carbon.get("kg_co2_per_year", 0)
-            equiv = carbon.get("equivalent", "")
-            rating = carbon.get("rating", "")
-            answer_parts.append(f"**Carbon footprint:** {kg:,.0f} kg CO₂/yr\n\n{equiv}. Rating: **{rating}**")
-            metrics_used.append("carbon")
-        else:
-            answer_parts.append("Carbon estimates are derived from your energy data. Upload data to Green Grid for sustainability insights.")
-
-    elif any(w in q for w in ("green", "energy", "power", "electric", "kwh")):
-        if has_green and green_grid.get("current_usage_kwh", 0) > 0:
-            usage = green_grid.get("current_usage_kwh", 0)
-            savings = green_grid.get("potential_savings_percent", 0)
-            recs = green_grid.get("recommendations", [])
-            parts = [f"**Average energy usage:** {usage:.2f} kWh\n\n**Potential savings:** {savings:.1f}%"]
-            if recs:
-                parts.append("**Recommendations:** " + "; ".join(recs[:2]))
-            answer_parts.append("\n\n".join(parts))
-            metrics_used.append("green_grid")
-        else:
-            answer_parts.append(
-                "No energy data uploaded yet. Go to **Green Grid** and upload a CSV with columns: `hour`, `usage_kwh` to get energy insights."
-            )
-
-    elif any(w in q for w in ("recommend", "suggest", "advice", "tip", "improve")):
-        if recommendations:
-            parts = [f"**{len(recommendations)} AI recommendations:**"]
-            for r in recommendations[:5]:
-                title = r.get('title', '')
-                priority = r.get('priority', '')
-                parts.append(f"• **{title}** ({priority} priority)")
-            answer_parts.append("\n\n".join(parts))
-            metrics_used.append("recommendations")
-        else:
-            answer_parts.append("No recommendations available yet. Upload data to each module to generate AI-powered recommendations.")
 
-    elif any(w in q for w in ("hello", "hi", "hey", "help")):
-        answer_parts.append(
-            "Hello! I'm your **Business AI Assistant**.\n\nI can answer questions about:\n"
-            "• 💰 **Expenses** — spending breakdown and trends\n"
-            "• 🛡️ **Fraud** — anomaly detection and risk level\n"
-            "• 📦 **Inventory** — stock levels and reorder alerts\n"
-            "• 📊 **Health Score** — overall business performance\n"
-            "• 🌱 **Energy** — consumption and sustainability\n"
-            "• 💡 **Recommendations** — AI-powered action items\n\n"
-            "Upload data to each module to unlock real insights."
-        )
+def _overview_answer(metrics) -> Tuple[List[str], List[str]]:
+    # Generic overview — only show modules with real data
+    health = metrics.get("health") or {}
+    expense = metrics.get("expense") or {}
+    fraud = metrics.get("fraud") or {}
+    inventory = metrics.get("inventory") or {}
+    green_grid = metrics.get("green_grid") or {}
 
-    else:
-        # Generic overview — only show modules with real data
-        summary_parts = []
-        if health:
-            summary_parts.append(f"**Health score:** {health.get('score', 0)}/100")
-        if has_expense and expense.get("total", 0) > 0:
-            summary_parts.append(f"**Total expenses:** ${expense.get('total', 0):,.2f}")
-        if has_fraud and fraud.get("total_transactions", 0) > 0:
-            summary_parts.append(f"**Fraud risk:** {fraud.get('risk_level', 'N/A')} ({fraud.get('anomalies_detected', 0)} anomalies)")
-        if has_inventory and inventory.get("items"):
-            summary_parts.append(f"**Low stock items:** {inventory.get('low_stock_count', 0)}")
-        if has_green and green_grid.get("current_usage_kwh", 0) > 0:
-            summary_parts.append(f"**Avg energy:** {green_grid.get('current_usage_kwh', 0):.1f} kWh")
-
-        if summary_parts:
-            answer_parts.append("**Quick overview:**\n\n" + "\n".join(summary_parts))
-        else:
-            answer_parts.append(
-                "No module data uploaded yet. Upload CSV files to **Expense Sense**, **Fraud Lens**, **Smart Inventory**, or **Green Grid** to get real insights."
-            )
+    summary_parts = []
+    if health:
+        summary_parts.append(f"**Health score:** {health.get('score', 0)}/100")
+    if expense.get("total", 0) > 0:
+        summary_parts.append(f"**Total expenses:** ${expense.get('total', 0):,.2f}")
+    if fraud.get("total_transactions", 0) > 0:
+        summary_parts.append(f"**Fraud risk:** {fraud.get('risk_level', 'N/A')} ({fraud.get('anomalies_detected', 0)} anomalies)")
+    if inventory.get("total_items"):
+        summary_parts.append(f"**Low stock items:** {inventory.get('low_stock_count', 0)}")
+    if green_grid.get("current_usage_kwh", 0) > 0:
+        summary_parts.append(f"**Avg energy:** {green_grid.get('current_usage_kwh', 0):.1f} kWh")
 
+    answer_parts = []
+    if summary_parts:
+        answer_parts.append("**Quick overview:**\n\n" + "\n".join(summary_parts))
+    else:
         answer_parts.append(
-            "You can ask me about: expenses, fraud risks, inventory stock, business health score, energy usage, or recommendations."
+            "No module data uploaded yet. Upload CSV files to **Expense Sense**, **Fraud Lens**, **Smart Inventory**, or **Green Grid** to get real insights."
         )
+    answer_parts.append(
+        "You can ask me about: expenses, fraud risks, inventory stock, business health score, energy usage, or recommendations."
+    )
+    return answer_parts, []
+
+
+_HANDLERS: Dict[str, Callable[[Any], Tuple[List[str], List[str]]]] = {
+    "expense": _expense_answer,
+    "fraud": _fraud_answer,
+    "inventory": _inventory_answer,
+    "health": _health_answer,
+    "carbon": _carbon_answer,
+    "green_grid": _green_grid_answer,
+    "recommendations": _recommendations_answer,
+    "greeting": _greeting_answer,
+    "overview": _overview_answer,
+}
+
+
+def intent_modules(intents: List[str]) -> Tuple[str, ...]:
+    """module_data keys read when answering these intents."""
+    return tuple(dict.fromkeys(key for intent in intents for key in INTENT_MODULES[intent]))
+
+
+def compose_sections(intents: List[str], module_data) -> List[Tuple[str, List[str], List[str]]]:
+    """(intent, answer_parts, metrics_used) for each intent, in the order given."""
+    metrics = module_data or {}
+    return [(intent, *_HANDLERS[intent](metrics)) for intent in intents]
+
+
+def compose_response(sections: List[Tuple[str, List[str], List[str]]]) -> Dict[str, Any]:
+    """Join composed sections into the assistant's response dict."""
+    answer_parts: List[str] = []
+    metrics_used: List[str] = []
+    for _, parts, used in sections:
+        answer_parts.extend(parts)
+        metrics_used.extend(used)
 
     content = "\n\n".join(answer_parts) if answer_parts else (
         "I can help with your business metrics. Try asking about expenses, fraud, inventory, or health score."
@@ -172,4 +277,15 @@ def generate_business_response(question: str, module_data: Dict[str, Any]) -> Di
     return {
         "answer": content,
         "metrics_used": metrics_used,
+        "intents": [intent for intent, _, _ in sections],
     }
+
+
+def generate_business_response(question: str, module_data) -> Dict[str, Any]:
+    """
+    Generate a structured response using real metrics from module data.
+    module_data is a dict or a LazyModuleData; only the modules of the
+    intents found in the question are read from it. A question naming
+    several modules ("compare fraud and expense trends") gets one section each.
+    """
+    return compose_response(compose_sections(detect_intents(question), module_data))
@@ -1,18 +1,75 @@
-# Carbon Footprint Estimator (rule-based)
-import random
+# Carbon Footprint Estimator: Green Grid readings × grid emission factor, annualised
 from typing import Dict, Any
 
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core.config import CARBON_FACTOR_KG_PER_KWH, CARBON_HOURLY_FACTORS
+from models.green_grid import GreenGridRecord
+from services.data_version_service import get_version
+from services.energy_profile_service import load_profile
+from services.versioned_cache import VersionedCache
+
+
+KG_CO2_PER_TREE_YEAR = 22
+DAYS_PER_YEAR = 365
+LOW_CONFIDENCE_DAYS = 30        # fewer days of readings than this are flagged as a low-confidence estimate
+GOOD_RATING_KG = 2000
+
+_cache = VersionedCache(maxsize=4)
+
+
+def emission_factors() -> np.ndarray:
+    """kg CO2 per kWh for each hour of day (24 values)."""
+    if not CARBON_HOURLY_FACTORS.strip():
+        return np.full(24, CARBON_FACTOR_KG_PER_KWH)
+    factors = np.array([float(v) for v in CARBON_HOURLY_FACTORS.split(",")])
+    if factors.shape != (24,) or (factors < 0).any():
+        raise ValueError("CARBON_HOURLY_FACTORS needs 24 non-negative comma-separated values")
+    return factors
+
+
+def _build_estimate(db: Session) -> Dict[str, Any]:
+    factors = emission_factors()
+    # kWh per hour of day from the profile cube (≤ departments × 168 rows)
+    cells = load_profile(db)
+    kwh_by_hour = np.bincount(cells["hour"].to_numpy(dtype=int), cells["total_kwh"].to_numpy(dtype=float), 24) \
+        if not cells.empty else np.zeros(24)
+    days = db.query(func.count(func.distinct(func.date(GreenGridRecord.ts)))).scalar() or 0
+
+    total_kwh = float(kwh_by_hour.sum())
+    observed_kg = float(kwh_by_hour @ factors)
+    if not total_kwh or not days:
+        kg_co2 = kwh_per_year = 0.0
+    else:
+        # Daily average over the days with readings, scaled to a year
+        scale = DAYS_PER_YEAR / days
+        kg_co2 = round(observed_kg * scale, 0)
+        kwh_per_year = total_kwh * scale
+
+    suggestions = [
+        "Use renewable energy for office",
+        "Reduce business travel",
+        "Optimize logistics routes",
+    ]
+    if np.ptp(factors) > 0:
+        dirtiest = np.argsort(-factors, kind="stable")[:3]
+        suggestions.insert(0, "Shift flexible load away from the most carbon-intensive grid hours: "
+                           + ", ".join(f"{h:02d}:00" for h in sorted(dirtiest)))
 
-def get_carbon_estimate() -> Dict[str, Any]:
-    kg_co2 = round(random.uniform(1200, 2800), 0)
-    equivalent = "~{} trees/year".format(round(kg_co2 / 22))
     return {
         "kg_co2_per_year": kg_co2,
-        "equivalent": equivalent,
-        "rating": "good" if kg_co2 < 2000 else "moderate",
-        "suggestions": [
-            "Use renewable energy for office",
-            "Reduce business travel",
-            "Optimize logistics routes",
-        ],
+        "equivalent": "~{} trees/year".format(round(kg_co2 / KG_CO2_PER_TREE_YEAR)),
+        "rating": "good" if kg_co2 < GOOD_RATING_KG else "moderate",
+        "kwh_per_year": round(kwh_per_year, 1),
+        "emission_factor_kg_per_kwh": round(observed_kg / total_kwh, 4) if total_kwh else round(float(factors.mean()), 4),
+        "basis_days": days,
+        "low_confidence": days < LOW_CONFIDENCE_DAYS,
+        "suggestions": suggestions,
     }
+
+
+def get_carbon_estimate(db: Session) -> Dict[str, Any]:
+    """Deterministic annual CO2 estimate, cached per energy data version."""
+    return _cache.get_or_compute(("carbon", get_version(db, "green_grid")), lambda: _build_estimate(db))
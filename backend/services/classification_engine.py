@@ -0,0 +1,122 @@
+"""
+ABC/XYZ classification engine for Smart Inventory.
+
+ABC ranks SKUs by stock value (quantity × price): sorted descending, the
+cumulative value share decides the class — A up to 80%, B up to 95%, C the
+long tail. XYZ ranks SKUs by stock variability (coefficient of variation of
+their snapshot history): X steady, Y variable, Z volatile. SKUs with fewer
+than MIN_XYZ_POINTS snapshots have no XYZ class yet.
+
+Classes are computed once per upload and persisted on the inventory rows so
+readers can filter by class in SQL.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from database import engine
+from models.inventory import InventoryItem
+from services.data_version_service import bump_version
+from services.forecast_engine import load_stock_history
+
+
+ABC_BOUNDS = (0.80, 0.95)       # cumulative value share closing classes A and B
+XYZ_BOUNDS = (0.25, 0.50)       # coefficient of variation closing classes X and Y
+MIN_XYZ_POINTS = 3
+
+ABC_CLASSES = ("A", "B", "C")
+XYZ_CLASSES = ("X", "Y", "Z")
+
+
+def classify_abc(value: np.ndarray) -> np.ndarray:
+    """
+    ABC class per SKU. An SKU belongs to the class in which its cumulative
+    share *starts*, so the SKU that crosses a bound stays in the higher class.
+    """
+    value = np.clip(np.asarray(value, dtype=float), 0, None)
+    total = value.sum()
+    if total <= 0:
+        return np.full(len(value), "C", dtype=object)
+
+    order = np.argsort(-value, kind="stable")
+    share_before = (np.cumsum(value[order]) - value[order]) / total
+    ranked = np.array(ABC_CLASSES, dtype=object)[np.searchsorted(ABC_BOUNDS, share_before, side="right")]
+
+    classes = np.empty(len(value), dtype=object)
+    classes[order] = ranked
+    return classes
+
+
+def classify_xyz(codes: np.ndarray, qty: np.ndarray, n_skus: int) -> np.ndarray:
+    """
+    XYZ class per SKU from its observed stock levels (codes index 0..n_skus-1).
+    Mean and variance come from per-SKU sums via np.bincount; SKUs with too
+    little history get None.
+    """
+    qty = np.asarray(qty, dtype=float)
+    n = np.bincount(codes, minlength=n_skus).astype(float)
+    s = np.bincount(codes, weights=qty, minlength=n_skus)
+    ss = np.bincount(codes, weights=qty * qty, minlength=n_skus)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s / n
+        var = np.clip(ss / n - mean * mean, 0, None)
+        cv = np.where(mean > 0, np.sqrt(var) / mean, np.inf)
+
+    classes = np.array(XYZ_CLASSES, dtype=object)[np.searchsorted(XYZ_BOUNDS, cv, side="left").clip(max=2)]
+    classes[n < MIN_XYZ_POINTS] = None
+    return classes
+
+
+def compute_classes(items: pd.DataFrame, history: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    items: DataFrame with item_name, quantity, price.
+    history: snapshot rows with item_name, quantity (optional).
+    Returns items with abc_class and xyz_class columns added.
+    """
+    df = items.copy()
+    df["abc_class"] = classify_abc(df["quantity"].to_numpy() * df["price"].to_numpy())
+    if history is None or history.empty:
+        df["xyz_class"] = None
+        return df
+    codes = pd.Index(df["item_name"]).get_indexer(history["item_name"])
+    known = codes >= 0
+    df["xyz_class"] = classify_xyz(codes[known], history["quantity"].to_numpy()[known], len(df))
+    return df
+
+
+def apply_inventory_classes(db: Session) -> None:
+    """
+    Recompute ABC/XYZ for the whole catalogue and persist it on the inventory
+    rows (one executemany UPDATE). Called inside the upload transaction.
+    """
+    db.flush()
+    rows = db.execute(
+        select(InventoryItem.id, InventoryItem.item_name, InventoryItem.quantity, InventoryItem.price)
+    ).all()
+    if not rows:
+        return
+    items = pd.DataFrame(rows, columns=["id", "item_name", "quantity", "price"])
+    items[["quantity", "price"]] = items[["quantity", "price"]].fillna(0)
+    classes = compute_classes(items, load_stock_history(db))
+    db.execute(
+        update(InventoryItem),
+        [
+            {"id": int(i), "abc_class": abc, "xyz_class": xyz}
+            for i, abc, xyz in zip(classes["id"], classes["abc_class"], classes["xyz_class"])
+        ],
+    )
+
+
+def backfill_inventory_classes(bind=engine) -> None:
+    """Fill abc_class/xyz_class for rows stored before classes were persisted."""
+    with Session(bind) as db:
+        # xyz_class stays NULL for SKUs with short history, so abc_class marks unclassified rows
+        if db.query(InventoryItem.id).filter(InventoryItem.abc_class.is_(None)).first() is None:
+            return
+        apply_inventory_classes(db)
+        bump_version(db, "inventory")     # cached reports and answers were built from the old classes
+        db.commit()
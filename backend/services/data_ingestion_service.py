@@ -8,27 +8,35 @@ from sqlalchemy.orm import Session
 
 from services.schema_validator import validate_schema
 from services.data_normalizer import normalize
+from services.vendor_service import encode_vendors
+from services.data_version_service import bump_version
+from services.inventory_history_service import record_stock_snapshots
+from services.reorder_engine import apply_reorder_points
+from services.energy_timeseries import prepare_readings, store_readings
+from services.classification_engine import apply_inventory_classes
 from models.expense import ExpenseItem
 from models.fraud import FraudRecord
 from models.inventory import InventoryItem
-from models.green_grid import GreenGridRecord
 
 
 def _store_expense(df: pd.DataFrame, db: Session) -> Tuple[int, int]:
     """Insert expense rows. Returns (processed, failed)."""
     processed = 0
     failed = 0
-    for _, row in df.iterrows():
+    vendor_ids = encode_vendors(df["vendor"], db) if "vendor" in df.columns else None
+    for idx, row in df.iterrows():
         try:
             item = ExpenseItem(
                 category=str(row.get("category", "")),
                 amount=float(row.get("amount", 0)),
                 month=str(row.get("month", "")),
+                vendor_id=vendor_ids[idx] if vendor_ids is not None else None,
             )
             db.add(item)
             processed += 1
         except Exception:
             failed += 1
+    bump_version(db, "expense")
     return processed, failed
 
 
@@ -36,17 +44,20 @@ def _store_fraud(df: pd.DataFrame, db: Session) -> Tuple[int, int]:
     """Insert/merge fraud rows. Returns (processed, failed)."""
     processed = 0
     failed = 0
-    for _, row in df.iterrows():
+    vendor_ids = encode_vendors(df["vendor"], db) if "vendor" in df.columns else None
+    for idx, row in df.iterrows():
         try:
             item = FraudRecord(
                 transaction_id=str(row.get("transaction_id", "")),
                 amount=int(float(row.get("amount", 0))),
                 is_fraud=bool(row.get("is_fraud", False)),
+                vendor_id=vendor_ids[idx] if vendor_ids is not None else None,
             )
             db.merge(item)
             processed += 1
         except Exception:
             failed += 1
+    bump_version(db, "fraud")
     return processed, failed
 
 
@@ -54,6 +65,7 @@ def _store_inventory(df: pd.DataFrame, db: Session) -> Tuple[int, int]:
     """Insert/update inventory rows. Returns (processed, failed)."""
     processed = 0
     failed = 0
+    stored: Dict[str, Dict[str, Any]] = {}
     for _, row in df.iterrows():
         try:
             item_name = str(row.get("item_name", "")).strip()
@@ -80,27 +92,27 @@ def _store_inventory(df: pd.DataFrame, db: Session) -> Tuple[int, int]:
                     quantity=quantity,
                     price=price,
                 ))
+            stored[item_name] = {
+                "item_name": item_name,
+                "category": category,
+                "quantity": quantity,
+                "price": price,
+            }
             processed += 1
         except Exception:
             failed += 1
+    record_stock_snapshots(list(stored.values()), db)
+    apply_reorder_points(db)
+    apply_inventory_classes(db)
+    bump_version(db, "inventory")
     return processed, failed
 
 
 def _store_energy(df: pd.DataFrame, db: Session) -> Tuple[int, int]:
     """Insert energy/green-grid rows. Returns (processed, failed)."""
-    processed = 0
-    failed = 0
-    for _, row in df.iterrows():
-        try:
-            item = GreenGridRecord(
-                hour=str(row.get("hour", "")),
-                usage_kwh=float(row.get("usage_kwh", 0)),
-            )
-            db.add(item)
-            processed += 1
-        except Exception:
-            failed += 1
-    return processed, failed
+    readings = prepare_readings(df)
+    processed = store_readings(readings, db)
+    return processed, len(df) - processed
 
 
 _STORE_FNS = {
@@ -8,10 +8,10 @@ COLUMN_MAPS: Dict[str, Dict[str, Optional[str]]] = {
     "expense_data": {
         # New schema → DB fields
         "date": "month",        # extract month from date
-        "vendor": None,         # not stored in current DB model
+        "vendor": "vendor",     # encoded into the vendors dimension on store
     },
     "fraud_data": {
-        "vendor": None,         # not stored in current DB model
+        "vendor": "vendor",     # encoded into the vendors dimension on store
         "timestamp": None,      # not stored in current DB model
     },
     "inventory_data": {
@@ -20,7 +20,7 @@ COLUMN_MAPS: Dict[str, Dict[str, Optional[str]]] = {
     "energy_data": {
         "date": "hour",                    # map date → hour
         "energy_consumption": "usage_kwh", # rename
-        "department": None,                # not stored in current DB model
+        "department": "department",        # stored per reading
     },
 }
 
@@ -62,7 +62,7 @@ def normalize(df: pd.DataFrame, dataset_type: str, schema_name: str) -> pd.DataF
             if old_name in df.columns:
                 if new_name is None:
                     drops.append(old_name)
-                else:
+                elif new_name != old_name:
                     renames[old_name] = new_name
 
         if renames:
@@ -0,0 +1,104 @@
+# Per-module data versions: bumped inside the writing transaction, read by caches
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Set
+
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import engine
+from models.data_version import DataVersion
+from models.expense import ExpenseItem
+from models.fraud import FraudRecord
+from models.green_grid import GreenGridRecord
+from models.inventory import InventoryItem
+
+
+# Modules whose row count is tracked alongside the version (served by the /status endpoints)
+MODULE_TABLES = {
+    "expense": ExpenseItem,
+    "fraud": FraudRecord,
+    "green_grid": GreenGridRecord,
+    "inventory": InventoryItem,
+}
+
+
+# Called with the set of bumped modules (and the session's bind) after a transaction that bumped them commits
+_listeners: List[Callable[[Set[str], Any], None]] = []
+
+
+def on_version_change(callback: Callable[[Set[str], Any], None]) -> None:
+    """Register a callback run after every commit that bumped at least one module."""
+    _listeners.append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_listeners(session: Session) -> None:
+    modules = session.info.pop("bumped_modules", None)
+    if modules:
+        bind = session.get_bind()
+        for callback in _listeners:
+            callback(modules, bind)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bumps(session: Session) -> None:
+    session.info.pop("bumped_modules", None)
+
+
+def _row_count(db: Session, module: str) -> int:
+    model = MODULE_TABLES.get(module)
+    return int(db.execute(select(func.count()).select_from(model)).scalar()) if model is not None else 0
+
+
+def bump_version(db: Session, module: str) -> None:
+    """
+    Increment a module's data version and refresh its row count. Runs in the
+    caller's transaction, so readers see the new version exactly when they
+    see the new rows.
+    """
+    db.flush()      # sessions don't autoflush; count the rows this transaction added
+    now = datetime.utcnow()
+    rows = _row_count(db, module)
+    stmt = sqlite_insert(DataVersion).values(module=module, version=1, row_count=rows, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.module],
+        set_={"version": DataVersion.version + 1, "row_count": rows, "updated_at": now},
+    )
+    db.execute(stmt)
+    db.info.setdefault("bumped_modules", set()).add(module)
+
+
+def get_version(db: Session, module: str) -> int:
+    version = db.execute(select(DataVersion.version).where(DataVersion.module == module)).scalar()
+    return int(version or 0)
+
+
+def get_versions(db: Session) -> Dict[str, Dict[str, Any]]:
+    """Every registered module's version, row count and last change, from one small table."""
+    versions = {m: {"version": 0, "row_count": 0, "updated_at": None} for m in MODULE_TABLES}
+    for module, version, rows, updated_at in db.execute(
+        select(DataVersion.module, DataVersion.version, DataVersion.row_count, DataVersion.updated_at)
+    ):
+        versions[module] = {
+            "version": version,
+            "row_count": rows or 0,
+            "updated_at": updated_at.isoformat() if updated_at else None,
+        }
+    return versions
+
+
+def get_module_status(db: Session, module: str) -> Dict[str, Any]:
+    """has_data / row_count from the registry: a primary-key read instead of COUNT(*)."""
+    rows = db.execute(select(DataVersion.row_count).where(DataVersion.module == module)).scalar() or 0
+    return {"has_data": rows > 0, "row_count": rows}
+
+
+def sync_row_counts(bind=engine) -> None:
+    """Seed registry row counts at startup (databases from before counts were tracked). Versions are untouched."""
+    with Session(bind) as db:
+        for module in MODULE_TABLES:
+            rows = _row_count(db, module)
+            stmt = sqlite_insert(DataVersion).values(module=module, version=0, row_count=rows)
+            db.execute(stmt.on_conflict_do_update(index_elements=[DataVersion.module], set_={"row_count": rows}))
+        db.commit()
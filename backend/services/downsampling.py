@@ -0,0 +1,40 @@
+# Series downsampling for charts: Largest-Triangle-Three-Buckets (LTTB) in NumPy
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points LTTB keeps when reducing (x, y) to n_out points.
+    x must be sorted ascending. First and last points are always kept; each
+    bucket in between keeps the point forming the largest triangle with the
+    previously kept point and the next bucket's mean. The per-bucket area
+    computation is vectorized; only the bucket walk is sequential.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("LTTB needs at least 3 output points")
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # n_out - 2 buckets over the interior points [1, n - 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    csx = np.concatenate(([0.0], np.cumsum(x)))
+    csy = np.concatenate(([0.0], np.cumsum(y)))
+
+    # Mean of every bucket (the last "next bucket" is the final point)
+    counts = np.diff(edges)
+    mean_x = np.append((csx[edges[1:]] - csx[edges[:-1]]) / counts, x[-1])
+    mean_y = np.append((csy[edges[1:]] - csy[edges[:-1]]) / counts, y[-1])
+
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        cx, cy = mean_x[b + 1], mean_y[b + 1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[b + 1] = a
+    return keep
@@ -0,0 +1,131 @@
+"""
+Energy cost engine for Green Grid.
+
+Prices readings against the time-of-use tariff. Readings are first summed
+per (department, day, hour) in SQL — the rate is constant within an hour, so
+this is exact — and each row's rate is then picked from the 2 × 24 tariff
+matrix with one NumPy fancy-index lookup ([is_weekend, hour]) instead of
+per-row band matching.
+
+The what-if moves the flexible share of each day's load into that day's
+cheapest tariff band (water-filled there to keep the peak low) and also
+reports the cost of the peak-minimising plan from /green-grid/load-shift.
+Results are cached per (energy data version, tariff version).
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.orm import Session
+
+from models.green_grid import GreenGridRecord
+from services.data_version_service import get_version
+from services.energy_timeseries import load_hourly_matrix
+from services.load_shift_engine import water_fill
+from services.tariff_service import get_rate_matrix
+from services.versioned_cache import VersionedCache
+
+
+PERIODS = ("day", "week", "month")
+
+_cache = VersionedCache(maxsize=16)
+
+
+def _hourly_usage(db: Session, start, end, department) -> pd.DataFrame:
+    day = func.date(GreenGridRecord.ts)
+    hour = cast(func.strftime("%H", GreenGridRecord.ts), Integer)
+    q = (
+        select(GreenGridRecord.department, day, hour, func.sum(GreenGridRecord.usage_kwh))
+        .where(GreenGridRecord.ts.is_not(None))
+    )
+    if department:
+        q = q.where(GreenGridRecord.department == department)
+    if start is not None:
+        q = q.where(GreenGridRecord.ts >= start)
+    if end is not None:
+        q = q.where(GreenGridRecord.ts < end)
+    rows = db.execute(q.group_by(GreenGridRecord.department, day, hour)).all()
+    return pd.DataFrame(rows, columns=["department", "day", "hour", "kwh"])
+
+
+def _period_label(days: pd.Series, period: str) -> pd.Series:
+    if period == "day":
+        return days.dt.strftime("%Y-%m-%d")
+    if period == "week":
+        return (days - pd.to_timedelta(days.dt.dayofweek, unit="D")).dt.strftime("%Y-%m-%d")
+    return days.dt.strftime("%Y-%m")
+
+
+def _build_costs(db: Session, period: str, start, end, department, flexible_share: float) -> Dict[str, Any]:
+    rates = get_rate_matrix(db)
+    usage = _hourly_usage(db, start, end, department)
+    if usage.empty:
+        return {"period": period, "total_kwh": 0.0, "total_cost": 0.0, "periods": [], "what_if": None}
+
+    days = pd.to_datetime(usage["day"])
+    weekend = (days.dt.dayofweek >= 5).to_numpy(dtype=int)
+    usage["cost"] = usage["kwh"].to_numpy() * rates[weekend, usage["hour"].to_numpy()]
+    usage["period"] = _period_label(days, period)
+
+    grouped = (
+        usage.groupby(["period", "department"], sort=True)[["kwh", "cost"]].sum().reset_index()
+    )
+    periods = [
+        {
+            "period": p,
+            "department": d,
+            "kwh": round(float(k), 3),
+            "cost": round(float(c), 2),
+            "avg_rate": round(float(c / k), 4) if k else 0.0,
+        }
+        for p, d, k, c in grouped.itertuples(index=False)
+    ]
+
+    # What-if: price the water-filled profile on the same days
+    labels, load = load_hourly_matrix(db, start, end, department)
+    day_rates = rates[(pd.to_datetime(labels).dayofweek >= 5).astype(int)]
+    cheapest = day_rates == day_rates.min(axis=1, keepdims=True)
+    original_cost = float(np.nansum(load * day_rates))
+    shifted_cost = float(np.nansum(water_fill(load, flexible_share, receive=cheapest) * day_rates))
+    peak_shaving_cost = float(np.nansum(water_fill(load, flexible_share) * day_rates))
+
+    return {
+        "period": period,
+        "total_kwh": round(float(usage["kwh"].sum()), 3),
+        "total_cost": round(float(usage["cost"].sum()), 2),
+        "periods": periods,
+        "what_if": {
+            "flexible_percent": round(flexible_share * 100, 1),
+            "original_cost": round(original_cost, 2),
+            "shifted_cost": round(shifted_cost, 2),
+            "savings": round(original_cost - shifted_cost, 2),
+            "savings_percent": round((1 - shifted_cost / original_cost) * 100, 1) if original_cost else 0.0,
+            "peak_shaving_cost": round(peak_shaving_cost, 2),
+        },
+    }
+
+
+def get_energy_costs(
+    db: Session,
+    period: str = "month",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+    flexible_percent: float = 20.0,
+) -> Dict[str, Any]:
+    """Cost per period and department plus the load-shift what-if, cached per data and tariff version."""
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail=f"period must be one of: {', '.join(PERIODS)}")
+    if not 0 <= flexible_percent <= 100:
+        raise HTTPException(status_code=400, detail="flexible_percent must be between 0 and 100")
+    key = (
+        "cost", get_version(db, "green_grid"), get_version(db, "tariff"),
+        period, start, end, department, flexible_percent,
+    )
+    return _cache.get_or_compute(
+        key,
+        lambda: _build_costs(db, period, start, end, department, flexible_percent / 100),
+    )
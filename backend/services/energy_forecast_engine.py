@@ -0,0 +1,206 @@
+"""
+Short-horizon energy usage forecaster for Green Grid.
+
+Model per department, on hourly kWh totals:
+
+    y(t) = level[hour_of_week(t)] + slope · t        (t in hours, 0 = last observed hour)
+
+fitted by least squares over the last FIT_WINDOW of history. With one level
+per hour-of-week slot the slope is the within-slot regression of y on t, so
+every department is fitted at once from np.bincount sums over a combined
+(department, slot) key: no per-department loop and no matrix solve.
+Slots not seen yet fall back to the hour-of-day level, so less than a week
+of history still forecasts the daily shape.
+
+Fitted parameters are persisted in energy_forecast_models together with the
+green_grid data version they came from, refitted by a version-change
+listener after each commit that changed the readings. A request is one
+vectorized evaluation of the stored profile and trend over the requested
+horizon; it never writes, and fits in memory if the stored models are
+behind (e.g. the refit is still running or failed).
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import engine
+from models.energy_forecast import EnergyForecastModel
+from models.green_grid import GreenGridRecord
+from services.data_version_service import get_version, on_version_change
+from services.versioned_cache import VersionedCache
+
+
+FIT_WINDOW = timedelta(weeks=8)
+MIN_HORIZON, MAX_HORIZON = 24, 168
+SLOTS = 168                     # hours in a week
+INTERVAL_Z = 1.96               # ~95% band from the residual spread
+MIN_BAND_SHARE = 0.1            # residual spread is at least 10% of the mean hourly usage
+
+_cache = VersionedCache(maxsize=4)
+
+
+def _hourly_totals(db: Session) -> pd.DataFrame:
+    hour = func.strftime("%Y-%m-%d %H:00:00", GreenGridRecord.ts)
+    rows = db.execute(
+        select(GreenGridRecord.department, hour, func.sum(GreenGridRecord.usage_kwh))
+        .where(GreenGridRecord.ts.is_not(None), GreenGridRecord.usage_kwh.is_not(None))
+        .group_by(GreenGridRecord.department, hour)
+    ).all()
+    df = pd.DataFrame(rows, columns=["department", "hour", "kwh"])
+    df["department"] = df["department"].fillna("General")
+    df["hour"] = pd.to_datetime(df["hour"])
+    return df
+
+
+def fit_models(hourly: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fit every department from hourly totals (department, hour, kwh). Returns
+    one row per department: t_ref, slope, profile (168 levels), residual_std, hours.
+    """
+    codes, departments = pd.factorize(hourly["department"])
+    n_dept = len(departments)
+    t_ref = hourly.groupby(codes)["hour"].max().to_numpy()
+    recent = hourly["hour"].to_numpy() > t_ref[codes] - np.timedelta64(FIT_WINDOW)
+    hourly, codes = hourly[recent], codes[recent]
+
+    y = hourly["kwh"].to_numpy(dtype=float)
+    t = (hourly["hour"].to_numpy() - t_ref[codes]) / np.timedelta64(1, "h")
+    slot = hourly["hour"].dt.dayofweek.to_numpy() * 24 + hourly["hour"].dt.hour.to_numpy()
+    key = codes * SLOTS + slot
+    size = n_dept * SLOTS
+
+    count = np.bincount(key, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_mean = np.bincount(key, t, size) / count
+        y_mean = np.bincount(key, y, size) / count
+    dt = t - t_mean[key]
+    dy = y - y_mean[key]
+    num = np.bincount(codes, dt * dy, n_dept)
+    den = np.bincount(codes, dt * dt, n_dept)
+    slope = np.divide(num, den, out=np.zeros(n_dept), where=den > 1e-9)
+
+    # Level of each slot at t = 0. Slots not seen yet (under a week of history)
+    # take the detrended mean of their hour of day, then of the department.
+    detrended_y = y - slope[codes] * t
+    hod_key = codes * 24 + hourly["hour"].dt.hour.to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hod_level = np.bincount(hod_key, detrended_y, n_dept * 24) / np.bincount(hod_key, minlength=n_dept * 24)
+    hod_level = hod_level.reshape(n_dept, 24)
+    detrended = np.bincount(codes, detrended_y, n_dept) / np.bincount(codes, minlength=n_dept)
+    hod_level = np.where(np.isnan(hod_level), detrended[:, None], hod_level)
+    level = (y_mean - np.repeat(slope, SLOTS) * t_mean).reshape(n_dept, SLOTS)
+    level = np.where(np.isnan(level), np.tile(hod_level, SLOTS // 24), level)
+
+    # Residual spread with one degree of freedom per fitted slot level plus the slope.
+    # Floor: a short history (no spare degrees of freedom, e.g. every slot seen
+    # once) or a perfectly regular one must not collapse the band to zero.
+    residual = y - (level.ravel()[key] + slope[codes] * t)
+    hours = np.bincount(codes, minlength=n_dept)
+    n_params = (count.reshape(n_dept, SLOTS) > 0).sum(axis=1) + 1
+    dof = hours - n_params
+    sse = np.bincount(codes, residual ** 2, n_dept)
+    residual_std = np.sqrt(np.divide(sse, dof, out=np.zeros(n_dept), where=dof > 0))
+    residual_std = np.maximum(residual_std, MIN_BAND_SHARE * np.abs(detrended))
+
+    return pd.DataFrame({
+        "department": departments,
+        "t_ref": pd.to_datetime(t_ref),
+        "slope": slope,
+        "profile": list(level),
+        "residual_std": residual_std,
+        "hours": hours,
+    })
+
+
+_MODEL_COLUMNS = ["department", "t_ref", "slope", "profile", "residual_std", "hours"]
+
+
+def _fit(db: Session) -> pd.DataFrame:
+    hourly = _hourly_totals(db)
+    return fit_models(hourly) if not hourly.empty else pd.DataFrame(columns=_MODEL_COLUMNS)
+
+
+def refit_forecast_models(bind=engine) -> None:
+    """Fit every department and persist the parameters with the data version they came from."""
+    with Session(bind) as db:
+        version = get_version(db, "green_grid")
+        models = _fit(db)
+        db.query(EnergyForecastModel).delete()
+        now = datetime.utcnow()
+        db.add_all([
+            EnergyForecastModel(
+                department=m.department,
+                data_version=version,
+                fitted_at=now,
+                t_ref=m.t_ref.to_pydatetime(),
+                slope=float(m.slope),
+                profile=[round(float(v), 6) for v in m.profile],
+                residual_std=float(m.residual_std),
+                hours=int(m.hours),
+            )
+            for m in models.itertuples(index=False)
+        ])
+        db.commit()
+
+
+def _refit_on_change(modules: Set[str], bind) -> None:
+    # Write path: runs after a commit that changed energy data, never on a GET
+    if "green_grid" not in modules:
+        return
+    try:
+        refit_forecast_models(bind)
+    except Exception:
+        pass    # a request falls back to fitting in memory; the writer's transaction has already committed
+
+
+on_version_change(_refit_on_change)
+
+
+def _load_or_fit(db: Session, version: int) -> pd.DataFrame:
+    """Stored models when they match `version`, otherwise an in-memory fit (nothing is written)."""
+    rows = db.query(EnergyForecastModel).all()
+    if rows and all(r.data_version == version for r in rows):
+        return pd.DataFrame({
+            "department": [r.department for r in rows],
+            "t_ref": pd.to_datetime([r.t_ref for r in rows]),
+            "slope": [r.slope for r in rows],
+            "profile": [np.asarray(r.profile, dtype=float) for r in rows],
+            "residual_std": [r.residual_std for r in rows],
+            "hours": [r.hours for r in rows],
+        })
+    return _fit(db)
+
+
+def get_energy_forecast(db: Session, hours: int = 24, department: Optional[str] = None) -> Dict[str, Any]:
+    """Hourly kWh forecast for the next `hours` hours after each department's last reading."""
+    if not MIN_HORIZON <= hours <= MAX_HORIZON:
+        raise HTTPException(status_code=400, detail=f"hours must be between {MIN_HORIZON} and {MAX_HORIZON}")
+    version = get_version(db, "green_grid")
+    models = _cache.get_or_compute(("models", version), lambda: _load_or_fit(db, version))
+    if department:
+        models = models[models["department"] == department]
+
+    steps = np.arange(1, hours + 1)
+    forecasts = []
+    for m in models.itertuples(index=False):
+        ts = m.t_ref + pd.to_timedelta(steps, unit="h")
+        slot = ts.dayofweek.to_numpy() * 24 + ts.hour.to_numpy()
+        kwh = np.clip(m.profile[slot] + m.slope * steps, 0, None)
+        band = INTERVAL_Z * m.residual_std
+        forecasts.append({
+            "department": m.department,
+            "trend_kwh_per_day": round(float(m.slope) * 24, 3),
+            "history_hours": int(m.hours),
+            "total_kwh": round(float(kwh.sum()), 3),
+            "points": [
+                {"ts": t.isoformat(), "kwh": round(float(v), 3),
+                 "lower": round(max(float(v) - band, 0.0), 3), "upper": round(float(v) + band, 3)}
+                for t, v in zip(ts, kwh)
+            ],
+        })
+    return {"hours": hours, "data_version": version, "departments": forecasts}
@@ -0,0 +1,160 @@
+# Green Grid energy profile cube: department × day-of-week × hour-of-day usage aggregates
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Integer, cast, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import engine
+from models.energy_profile import EnergyProfileCell
+from models.green_grid import GreenGridRecord
+
+
+# Shared thresholds for every Green Grid consumer (data endpoint, recommendations, report, chat)
+PEAK_SLOT_FACTOR = 1.4      # a weekly hour slot is "peak" when its mean exceeds 1.4× the overall mean
+SPIKE_FACTOR = 1.6          # a single reading above 1.6× the overall mean is a high-carbon spike
+
+_CELL_COLUMNS = ["department", "dow", "hour", "total_kwh", "readings", "max_kwh"]
+
+
+def update_profile(readings: pd.DataFrame, db: Session) -> None:
+    """
+    Fold newly stored readings (ts, department, usage_kwh) into the cube with
+    one executemany upsert. Runs in the caller's transaction.
+    """
+    if readings.empty:
+        return
+    cells = (
+        readings.assign(dow=readings["ts"].dt.dayofweek, hour=readings["ts"].dt.hour)
+        .groupby(["department", "dow", "hour"], sort=False)["usage_kwh"]
+        .agg(total_kwh="sum", readings="count", max_kwh="max")
+        .reset_index()
+    )
+    stmt = sqlite_insert(EnergyProfileCell)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EnergyProfileCell.department, EnergyProfileCell.dow, EnergyProfileCell.hour],
+        set_={
+            "total_kwh": EnergyProfileCell.total_kwh + stmt.excluded.total_kwh,
+            "readings": EnergyProfileCell.readings + stmt.excluded.readings,
+            "max_kwh": func.max(EnergyProfileCell.max_kwh, stmt.excluded.max_kwh),
+        },
+    )
+    db.execute(stmt, [
+        {
+            "department": dept,
+            "dow": int(dow),
+            "hour": int(hour),
+            "total_kwh": float(total),
+            "readings": int(n),
+            "max_kwh": float(peak),
+        }
+        for dept, dow, hour, total, n, peak in cells.itertuples(index=False)
+    ])
+
+
+def rebuild_profile(db: Session) -> None:
+    """Recompute the whole cube from the stored readings in one INSERT ... SELECT."""
+    db.query(EnergyProfileCell).delete()
+    # SQLite %w counts from Sunday = 0; the cube uses Monday = 0 like pandas
+    dow = (cast(func.strftime("%w", GreenGridRecord.ts), Integer) + 6) % 7
+    hour = cast(func.strftime("%H", GreenGridRecord.ts), Integer)
+    db.execute(
+        insert(EnergyProfileCell).from_select(
+            _CELL_COLUMNS,
+            select(
+                GreenGridRecord.department,
+                dow,
+                hour,
+                func.sum(GreenGridRecord.usage_kwh),
+                func.count(GreenGridRecord.id),
+                func.max(GreenGridRecord.usage_kwh),
+            )
+            .where(
+                GreenGridRecord.ts.is_not(None),
+                GreenGridRecord.department.is_not(None),
+                GreenGridRecord.usage_kwh.is_not(None),
+            )
+            .group_by(GreenGridRecord.department, dow, hour),
+        )
+    )
+
+
+def ensure_energy_profile(bind=engine) -> None:
+    """Build the cube at startup when readings exist but the cube is empty."""
+    with Session(bind) as db:
+        if db.query(EnergyProfileCell).first() is None and db.query(GreenGridRecord.id).first() is not None:
+            rebuild_profile(db)
+            db.commit()
+
+
+def load_profile(db: Session, department: Optional[str] = None) -> pd.DataFrame:
+    """Cube cells (at most departments × 168 rows), optionally for one department."""
+    q = select(*(getattr(EnergyProfileCell, c) for c in _CELL_COLUMNS))
+    if department:
+        q = q.where(EnergyProfileCell.department == department)
+    return pd.DataFrame(db.execute(q).all(), columns=_CELL_COLUMNS)
+
+
+def load_hour_only(db: Session, department: Optional[str] = None) -> pd.DataFrame:
+    """Hour-of-day aggregates (hour, total_kwh, readings, max_kwh) of readings stored without a date."""
+    q = (
+        select(
+            GreenGridRecord.hour_of_day,
+            func.sum(GreenGridRecord.usage_kwh),
+            func.count(GreenGridRecord.id),
+            func.max(GreenGridRecord.usage_kwh),
+        )
+        .where(GreenGridRecord.ts.is_(None), GreenGridRecord.hour_of_day.is_not(None))
+        .group_by(GreenGridRecord.hour_of_day)
+    )
+    if department:
+        q = q.where(GreenGridRecord.department == department)
+    return pd.DataFrame(db.execute(q).all(), columns=["hour", "total_kwh", "readings", "max_kwh"])
+
+
+def summarize_profile(db: Session, department: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Usage statistics read from the cube: overall mean/peak, the mean per
+    weekly hour slot and which slots run above PEAK_SLOT_FACTOR × the mean.
+    Hour-only readings count towards the overall and hour-of-day figures but
+    have no weekly slot.
+    """
+    cells = load_profile(db, department)
+    frames = [df for df in (cells, load_hour_only(db, department)) if not df.empty]
+    hours = pd.concat(frames, ignore_index=True) if frames else cells
+    readings = int(hours["readings"].sum()) if not hours.empty else 0
+    if not readings:
+        return {"readings": 0, "avg_kwh": 0.0, "peak_kwh": 0.0, "slots": 0, "peak_slots": 0,
+                "peak_hours": [], "hourly_mean_kwh": {}}
+
+    avg = float(hours["total_kwh"].sum()) / readings
+    peak = float(hours["max_kwh"].max())
+
+    # Collapse departments: one cell per (dow, hour) slot
+    slots = cells.groupby(["dow", "hour"])[["total_kwh", "readings"]].sum()
+    slot_mean = slots["total_kwh"] / slots["readings"]
+    by_hour = hours.groupby("hour")[["total_kwh", "readings"]].sum()
+    hour_mean = (by_hour["total_kwh"] / by_hour["readings"]).sort_values(ascending=False, kind="stable")
+
+    return {
+        "readings": readings,
+        "avg_kwh": avg,
+        "peak_kwh": peak,
+        "slots": len(slots),
+        "peak_slots": int((slot_mean > avg * PEAK_SLOT_FACTOR).sum()),
+        "peak_hours": [int(h) for h in hour_mean.index[:3] if hour_mean[h] > avg],
+        "hourly_mean_kwh": {int(h): round(float(v), 3) for h, v in hour_mean.sort_index().items()},
+    }
+
+
+def weekly_profile(db: Session, department: Optional[str] = None) -> np.ndarray:
+    """Mean kWh per reading for each (day-of-week, hour) slot as a 7 × 24 matrix (NaN = no data)."""
+    cells = load_profile(db, department)
+    matrix = np.full((7, 24), np.nan)
+    if cells.empty:
+        return matrix
+    slots = cells.groupby(["dow", "hour"])[["total_kwh", "readings"]].sum().reset_index()
+    matrix[slots["dow"].to_numpy(), slots["hour"].to_numpy()] = slots["total_kwh"] / slots["readings"]
+    return matrix
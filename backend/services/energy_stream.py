@@ -0,0 +1,200 @@
+"""
+Streaming meter-reading ingestion for Green Grid.
+
+POST /green-grid/readings parses an NDJSON batch with the same vectorized
+path as CSV uploads (prepare_readings) and appends it to a fixed-size ring
+buffer of preallocated arrays, so memory stays bounded however long meters
+keep sending. A background thread flushes unflushed rows to SQLite with one
+store_readings call every FLUSH_INTERVAL_SECONDS, or sooner once FLUSH_BATCH
+rows are waiting; the app's shutdown hook flushes whatever is left.
+
+Flushed rows stay in the ring until overwritten, so live statistics for the
+last hour are computed from the buffer alone. A batch that would overwrite
+rows not yet flushed forces a synchronous flush first; if that fails the
+batch is rejected rather than dropping readings.
+"""
+import io
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from database import SessionLocal
+from services.energy_timeseries import prepare_readings, store_readings
+
+
+BUFFER_CAPACITY = 50_000        # readings held in memory
+FLUSH_BATCH = 5_000             # wake the flusher early once this many rows are pending
+FLUSH_INTERVAL_SECONDS = 5.0
+LIVE_WINDOW = timedelta(hours=1)
+
+logger = logging.getLogger(__name__)
+
+
+class ReadingBuffer:
+    """Ring buffer of (ts, label, department, usage_kwh) with batched flushes to the database."""
+
+    def __init__(self, capacity: int = BUFFER_CAPACITY, flush_batch: int = FLUSH_BATCH,
+                 interval: float = FLUSH_INTERVAL_SECONDS, session_factory=SessionLocal):
+        self.capacity = capacity
+        self.flush_batch = flush_batch
+        self.interval = interval
+        self._session_factory = session_factory
+        self._ts = np.empty(capacity, dtype="datetime64[ns]")
+        self._kwh = np.empty(capacity, dtype=float)
+        self._department = np.empty(capacity, dtype=object)
+        self._label = np.empty(capacity, dtype=object)
+        self._head = 0          # next slot to write
+        self._size = 0          # valid slots
+        self._pending = 0       # newest slots not yet written to the database
+        self._lock = threading.Lock()           # guards the arrays and counters
+        self._flush_lock = threading.Lock()     # one flush at a time
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -- writes -------------------------------------------------------------
+
+    def _write(self, readings: pd.DataFrame) -> bool:
+        n = len(readings)
+        with self._lock:
+            if self._pending + n > self.capacity:
+                return False
+            idx = (self._head + np.arange(n)) % self.capacity
+            self._ts[idx] = readings["ts"].to_numpy(dtype="datetime64[ns]")
+            self._kwh[idx] = readings["usage_kwh"].to_numpy(dtype=float)
+            self._department[idx] = readings["department"].to_numpy(dtype=object)
+            self._label[idx] = readings["hour"].to_numpy(dtype=object)
+            self._head = (self._head + n) % self.capacity
+            self._size = min(self.capacity, self._size + n)
+            self._pending += n
+            pending = self._pending
+        if pending >= self.flush_batch:
+            self._wake.set()
+        return True
+
+    def push(self, readings: pd.DataFrame) -> int:
+        """Append prepared readings; flushes synchronously first when the ring is full of unflushed rows."""
+        if len(readings) > self.capacity:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds buffer capacity of {self.capacity} readings")
+        if not self._write(readings):
+            self.flush()
+            if not self._write(readings):
+                raise HTTPException(status_code=503, detail="Reading buffer is full; retry shortly")
+        return len(readings)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    # -- flushing -----------------------------------------------------------
+
+    def flush(self) -> int:
+        """Write all pending rows with one store_readings call. Returns rows written."""
+        with self._flush_lock:
+            with self._lock:
+                n = self._pending
+                if not n:
+                    return 0
+                idx = (self._head - n + np.arange(n)) % self.capacity
+                batch = pd.DataFrame({
+                    "hour": self._label[idx],
+                    "ts": pd.to_datetime(self._ts[idx]),
+                    "department": self._department[idx],
+                    "usage_kwh": self._kwh[idx],
+                })
+            # The copied rows cannot be overwritten meanwhile: they still count as pending
+            db = self._session_factory()
+            try:
+                store_readings(batch, db)
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception("Flushing %d buffered readings failed; keeping them for the next flush", n)
+                return 0
+            finally:
+                db.close()
+            with self._lock:
+                self._pending -= n
+            return n
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="green-grid-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher thread and flush what is left."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    # -- reads --------------------------------------------------------------
+
+    def stats(self, department: Optional[str] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Average and peak over the last LIVE_WINDOW of buffered readings."""
+        since = np.datetime64((now or datetime.utcnow()) - LIVE_WINDOW, "ns")
+        with self._lock:
+            size, pending = self._size, self._pending
+            ts, kwh = self._ts[:size], self._kwh[:size]
+            mask = ts >= since
+            if department:
+                mask &= self._department[:size] == department
+            values = kwh[mask]
+            latest = ts[mask].max() if values.size else None
+        return {
+            "window_minutes": int(LIVE_WINDOW.total_seconds() // 60),
+            "department": department,
+            "readings": int(values.size),
+            "avg_kwh": round(float(values.mean()), 3) if values.size else 0.0,
+            "peak_kwh": round(float(values.max()), 3) if values.size else 0.0,
+            "latest_ts": pd.Timestamp(latest).isoformat() if latest is not None else None,
+            "buffered": size,
+            "pending_flush": pending,
+            "capacity": self.capacity,
+        }
+
+
+buffer = ReadingBuffer()
+
+
+def ingest_ndjson(body: bytes) -> Dict[str, Any]:
+    """
+    Parse one NDJSON batch (one {"ts"|"hour", "usage_kwh", "department"?}
+    object per line) and buffer it. Lines without a parseable date-time (a
+    bare hour of day is not one) or usage are counted as rejected.
+    """
+    if not body.strip():
+        raise HTTPException(status_code=400, detail="Empty body; send one JSON reading per line")
+    try:
+        df = pd.read_json(io.BytesIO(body), lines=True, dtype=False, convert_dates=False)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid NDJSON: {str(e)}")
+    if "hour" not in df.columns and "ts" in df.columns:
+        df = df.rename(columns={"ts": "hour"})
+    if "hour" not in df.columns or "usage_kwh" not in df.columns:
+        raise HTTPException(status_code=400, detail="Each reading needs ts (or hour) and usage_kwh")
+
+    readings = prepare_readings(df)
+    readings = readings[readings["ts"].notna()]     # a live stream needs real reading times
+    accepted = buffer.push(readings)
+    return {"accepted": accepted, "rejected": len(df) - accepted, "pending_flush": buffer.pending}
+
+
+def get_live_stats(department: Optional[str] = None) -> Dict[str, Any]:
+    return buffer.stats(department)
@@ -0,0 +1,194 @@
+# Green Grid energy time series: timestamp parsing, bulk storage and indexed range reads
+from datetime import datetime
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Integer, and_, cast, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from database import engine
+from models.green_grid import GreenGridRecord
+from services.anomaly_engine import score_readings
+from services.data_version_service import bump_version, get_version
+from services.energy_profile_service import rebuild_profile, update_profile
+from services.versioned_cache import VersionedCache
+
+
+DEFAULT_DEPARTMENT = "General"
+
+_READING_COLUMNS = ["ts", "department", "usage_kwh"]
+
+_cache = VersionedCache(maxsize=16)
+
+
+def _bare_hours(text: pd.Series) -> pd.Series:
+    """Hour-of-day for labels that are a bare hour ("19", "19.0"), NaN for anything else."""
+    hours = pd.to_numeric(text, errors="coerce")
+    return hours.where((hours % 1 == 0) & hours.between(0, 23))
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """
+    Vectorized timestamp parsing for the free-form hour/date column.
+
+    Aware timestamps are converted to naive UTC. Bare hour-of-day values
+    ("19") carry no date and, like unparseable values, become NaT.
+    """
+    text = values.astype(str).str.strip()
+    parsed = pd.to_datetime(text.where(_bare_hours(text).isna()), errors="coerce", format="mixed", utc=True)
+    return parsed.dt.tz_convert(None)
+
+
+def prepare_readings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Map an uploaded frame (hour/date label, usage_kwh, optional department)
+    onto the stored columns. Hour-only labels keep a NULL ts and their
+    hour_of_day; rows with neither a parseable time nor usage are dropped.
+    """
+    label = df["hour"] if "hour" in df.columns else df["date"]
+    text = label.astype(str).str.strip()
+    out = pd.DataFrame({
+        "hour": text,
+        "ts": parse_timestamps(text),
+        "hour_of_day": _bare_hours(text).astype("Int64"),
+        "department": (
+            df["department"].fillna(DEFAULT_DEPARTMENT).astype(str).str.strip()
+            if "department" in df.columns else DEFAULT_DEPARTMENT
+        ),
+        "usage_kwh": pd.to_numeric(df["usage_kwh"], errors="coerce"),
+    })
+    out = out.dropna(subset=["usage_kwh"])
+    return out[out["ts"].notna() | out["hour_of_day"].notna()]
+
+
+def store_readings(readings: pd.DataFrame, db: Session) -> int:
+    """
+    Insert prepared readings with one executemany INSERT. Timestamped
+    readings are scored by the online anomaly detector and folded into the
+    energy profile cube; hour-only readings have no place in either and are
+    stored unscored. Returns rows written.
+    """
+    if readings.empty:
+        return 0
+    dated = readings["ts"].notna()
+    scored = score_readings(readings[dated], db)
+    update_profile(scored, db)
+    readings = pd.concat([scored, readings[~dated]]).reindex(columns=[*readings.columns, "anomaly_score", "is_anomaly"])
+    rows = readings.astype(object).where(readings.notna(), None).to_dict(orient="records")
+    db.execute(insert(GreenGridRecord), rows)
+    bump_version(db, "green_grid")
+    return len(rows)
+
+
+def load_readings(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Readings in [start, end), ordered by time. With a department the
+    (department, ts) index serves the range; otherwise the ts index does.
+    """
+    q = select(*(getattr(GreenGridRecord, c) for c in _READING_COLUMNS))
+    if department:
+        q = q.where(GreenGridRecord.department == department)
+    if start is not None:
+        q = q.where(GreenGridRecord.ts >= start)
+    if end is not None:
+        q = q.where(GreenGridRecord.ts < end)
+    rows = db.execute(q.order_by(GreenGridRecord.ts)).all()
+    return pd.DataFrame(rows, columns=_READING_COLUMNS)
+
+
+def _build_hourly_matrix(db, start, end, department) -> Tuple[np.ndarray, np.ndarray]:
+    day = func.date(GreenGridRecord.ts)
+    hour = cast(func.strftime("%H", GreenGridRecord.ts), Integer)
+    q = select(day, hour, func.sum(GreenGridRecord.usage_kwh)).where(GreenGridRecord.ts.is_not(None))
+    if department:
+        q = q.where(GreenGridRecord.department == department)
+    if start is not None:
+        q = q.where(GreenGridRecord.ts >= start)
+    if end is not None:
+        q = q.where(GreenGridRecord.ts < end)
+    rows = db.execute(q.group_by(day, hour)).all()
+    if not rows:
+        return np.array([], dtype=object), np.empty((0, 24))
+
+    days, hours, kwh = (np.array(col) for col in zip(*rows))
+    labels, codes = np.unique(days, return_inverse=True)
+    matrix = np.full((len(labels), 24), np.nan)
+    matrix[codes, hours.astype(int)] = kwh.astype(float)
+    return labels, matrix
+
+
+def load_hourly_matrix(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    kWh per (day, hour-of-day) as a days × 24 matrix (NaN = no readings),
+    with the sorted day labels. Aggregated in SQL and cached per energy
+    data version.
+    """
+    version = get_version(db, "green_grid")
+    return _cache.get_or_compute(
+        ("hourly", version, start, end, department),
+        lambda: _build_hourly_matrix(db, start, end, department),
+    )
+
+
+def backfill_timestamps(bind=engine) -> None:
+    """
+    Parse ts/hour_of_day/department for rows stored before those columns
+    existed. Every attempted row gets a department, so labels that do not
+    parse keep a NULL ts but are not retried on the next startup. Bare-hour
+    rows that were once stamped with a made-up date lose that ts again, and
+    the profile cube is rebuilt without them.
+    """
+    with Session(bind) as db:
+        unparsed = and_(GreenGridRecord.ts.is_(None), GreenGridRecord.department.is_(None))
+        stamped = and_(
+            GreenGridRecord.ts.is_not(None),
+            GreenGridRecord.hour_of_day.is_(None),
+            func.length(func.trim(GreenGridRecord.hour)) <= 4,
+        )
+        rows = db.execute(
+            select(GreenGridRecord.id, GreenGridRecord.hour, GreenGridRecord.ts).where(or_(unparsed, stamped))
+        ).all()
+        if not rows:
+            return
+        df = pd.DataFrame(rows, columns=["id", "hour", "ts"])
+        text = df["hour"].astype(str).str.strip()
+        hours = _bare_hours(text)
+        parsed = parse_timestamps(text)
+
+        todo = df["ts"].isna()
+        if todo.any():
+            db.execute(
+                update(GreenGridRecord),
+                [
+                    {
+                        "id": int(i),
+                        "ts": None if pd.isna(ts) else ts.to_pydatetime(),
+                        "hour_of_day": None if pd.isna(h) else int(h),
+                        "department": DEFAULT_DEPARTMENT,
+                    }
+                    for i, ts, h in zip(df["id"][todo], parsed[todo], hours[todo])
+                ],
+            )
+        restamped = df["ts"].notna() & hours.notna()
+        if restamped.any():
+            db.execute(
+                update(GreenGridRecord),
+                [
+                    {"id": int(i), "ts": None, "hour_of_day": int(h), "anomaly_score": None, "is_anomaly": None}
+                    for i, h in zip(df["id"][restamped], hours[restamped])
+                ],
+            )
+            rebuild_profile(db)
+            bump_version(db, "green_grid")
+        db.commit()
@@ -2,13 +2,16 @@ import random
 import pandas as pd
 from typing import List, Dict, Any
 from fastapi import UploadFile, HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from models.expense import ExpenseItem
+from models.vendor import Vendor
+from services.data_version_service import bump_version, get_module_status
+from services.vendor_service import encode_vendors, find_vendor_column
 
 
 def get_expense_status(db: Session) -> Dict[str, Any]:
-    count = db.query(ExpenseItem).count()
-    return {"has_data": count > 0, "row_count": count}
+    return get_module_status(db, "expense")
 
 
 def get_expense_summary(db: Session) -> Dict[str, Any]:
@@ -40,6 +43,20 @@ def get_expense_trend_data(db: Session) -> List[Dict[str, Any]]:
     return [{"month": m, "amount": round(a, 2)} for m, a in sorted(month_map.items())]
 
 
+def get_expense_vendor_summary(db: Session, limit: int = 20) -> List[Dict[str, Any]]:
+    """Top vendors by spend, aggregated over the integer vendor key."""
+    total = func.sum(ExpenseItem.amount)
+    rows = (
+        db.query(Vendor.name, total.label("total"), func.count(ExpenseItem.id).label("count"))
+        .join(Vendor, Vendor.id == ExpenseItem.vendor_id)
+        .group_by(ExpenseItem.vendor_id)
+        .order_by(total.desc())
+        .limit(limit)
+        .all()
+    )
+    return [{"vendor": name, "total": round(float(t or 0), 2), "count": n} for name, t, n in rows]
+
+
 def upload_expense_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are allowed.")
@@ -49,13 +66,18 @@ def upload_expense_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
         if not required_cols.issubset(df.columns):
             raise HTTPException(status_code=400, detail=f"CSV must contain columns: {', '.join(required_cols)}")
 
-        for _, row in df.iterrows():
+        vendor_col = find_vendor_column(df.columns)
+        vendor_ids = encode_vendors(df[vendor_col], db) if vendor_col else None
+
+        for idx, row in df.iterrows():
             item = ExpenseItem(
                 category=str(row["category"]),
                 amount=float(row["amount"]),
-                month=str(row["month"])
+                month=str(row["month"]),
+                vendor_id=vendor_ids[idx] if vendor_ids is not None else None,
             )
             db.add(item)
+        bump_version(db, "expense")
         db.commit()
 
         by_category = df.groupby("category")["amount"].sum()
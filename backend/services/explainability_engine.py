@@ -6,6 +6,8 @@ without touching or re-running the detection logic.
 from typing import Dict, Any, List
 from sqlalchemy.orm import Session
 from models.fraud import FraudRecord
+from services.search_index import prefix_bounds
+from services.vendor_service import get_vendor_name
 
 
 # Thresholds used purely for explanation — not detection
@@ -21,15 +23,26 @@ def _avg_amount(db: Session) -> float:
     return sum(r.amount for r in records) / len(records)
 
 
-def _vendor_appears_once(transaction_id: str, db: Session) -> bool:
+def _vendor_appears_once(record: FraudRecord, db: Session) -> bool:
     """
-    Treat transaction_id prefix (first 4 chars) as a pseudo-vendor code.
-    If only one record shares that prefix it's considered a 'new vendor'.
+    If the record carries a real vendor key, count records sharing it (indexed
+    integer lookup). Otherwise treat the transaction_id prefix (first 4 chars)
+    as a pseudo-vendor code. A single match is considered a 'new vendor'.
     """
+    if record.vendor_id is not None:
+        count = (
+            db.query(FraudRecord)
+            .filter(FraudRecord.vendor_id == record.vendor_id)
+            .count()
+        )
+        return count == 1
+
+    transaction_id = record.transaction_id
     prefix = transaction_id[:4] if len(transaction_id) >= 4 else transaction_id
+    lo, hi = prefix_bounds(prefix)
     count = (
         db.query(FraudRecord)
-        .filter(FraudRecord.transaction_id.like(f"{prefix}%"))
+        .filter(FraudRecord.transaction_id >= lo, FraudRecord.transaction_id < hi)
         .count()
     )
     return count == 1
@@ -70,7 +83,8 @@ def explain_transaction(transaction_id: str, db: Session) -> Dict[str, Any]:
     so we derive explanations from relative statistics:
     - amount vs dataset average and top percentiles
     - repeated / duplicate amounts among other flagged transactions
-    - simple pseudo vendor + time-of-day signals based on the transaction_id
+    - vendor history (vendor key when uploaded, else a transaction_id prefix)
+    - a pseudo time-of-day signal based on the transaction_id
     """
     record: FraudRecord | None = (
         db.query(FraudRecord)
@@ -194,14 +208,21 @@ def explain_transaction(transaction_id: str, db: Session) -> Dict[str, Any]:
                     ),
                 })
 
-    # 4. New / rare pseudo-vendor from transaction id prefix
-    if _vendor_appears_once(transaction_id, db):
+    # 4. New / rare vendor (real vendor key, or pseudo-vendor from id prefix)
+    vendor_name = get_vendor_name(record.vendor_id, db)
+    if _vendor_appears_once(record, db):
+        if vendor_name:
+            counterparty = f"Vendor \"{vendor_name}\""
+        else:
+            counterparty = (
+                f"A pseudo-vendor code derived from the transaction ID "
+                f"\"{transaction_id[:4]}\""
+            )
         points.append({
             "icon": "vendor",
             "label": "New or Unrecognised Counterparty",
             "detail": (
-                f"A pseudo-vendor code derived from the transaction ID "
-                f"\"{transaction_id[:4]}\" appears only once across all records, which "
+                f"{counterparty} appears only once across all records, which "
                 "indicates no prior history with this counterparty in the current dataset."
             ),
         })
@@ -247,5 +268,6 @@ def explain_transaction(transaction_id: str, db: Session) -> Dict[str, Any]:
         "transaction_id": transaction_id,
         "amount": record.amount,
         "is_fraud": record.is_fraud,
+        "vendor": vendor_name,
         "points": points,
     }
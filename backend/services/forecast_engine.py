@@ -0,0 +1,154 @@
+"""
+Inventory forecast engine.
+Fits a linear stock trend per SKU over the stored snapshot history and
+projects it forward. All SKUs are fitted together: per-SKU normal equations
+are accumulated with np.bincount and solved in one batched np.linalg.solve.
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.inventory import InventoryItem
+from models.inventory_snapshot import InventorySnapshot
+from models.inventory_upload import InventoryUpload
+from services.data_version_service import get_version
+from services.versioned_cache import VersionedCache
+
+
+FORECAST_WEEKS = 4
+_SECONDS_PER_WEEK = 7 * 24 * 3600
+
+_cache = VersionedCache(maxsize=4)
+
+
+def fit_stock_trends(codes: np.ndarray, t_weeks: np.ndarray, qty: np.ndarray, n_skus: int) -> Dict[str, np.ndarray]:
+    """
+    Batched least-squares fit of qty = intercept + slope * t for every SKU.
+
+    codes: SKU index (0..n_skus-1) of each observation
+    t_weeks: observation time in weeks (relative to a common reference)
+    qty: observed stock
+
+    SKUs with fewer than two distinct observation times get slope 0 and the
+    mean observed stock as intercept.
+    """
+    n = np.bincount(codes, minlength=n_skus).astype(float)
+    st = np.bincount(codes, weights=t_weeks, minlength=n_skus)
+    sq = np.bincount(codes, weights=qty, minlength=n_skus)
+    stt = np.bincount(codes, weights=t_weeks * t_weeks, minlength=n_skus)
+    stq = np.bincount(codes, weights=t_weeks * qty, minlength=n_skus)
+
+    det = n * stt - st * st
+    fittable = det > 1e-9 * np.maximum(n * stt, 1.0)
+
+    a = np.empty((n_skus, 2, 2))
+    a[:, 0, 0] = np.maximum(n, 1.0)
+    a[:, 0, 1] = np.where(fittable, st, 0.0)
+    a[:, 1, 0] = a[:, 0, 1]
+    a[:, 1, 1] = np.where(fittable, stt, 1.0)
+    b = np.stack([sq, np.where(fittable, stq, 0.0)], axis=1)
+
+    solved = np.linalg.solve(a, b[..., None])[..., 0]
+    return {"intercept": solved[:, 0], "slope": solved[:, 1], "points": n.astype(int)}
+
+
+def load_stock_history(db: Session) -> pd.DataFrame:
+    """
+    Stock history for SKUs that are currently in the inventory table: one row
+    per SKU per upload from its first snapshot on. Snapshots are only written
+    when a SKU changes, so uploads that left it unchanged are filled with its
+    as-of quantity (the last snapshot at or before the upload); flat periods
+    show up as flat instead of being skipped.
+    """
+    rows = db.execute(
+        select(InventorySnapshot.item_name, InventorySnapshot.captured_at, InventorySnapshot.quantity)
+        .join(InventoryItem, InventoryItem.item_name == InventorySnapshot.item_name)
+    ).all()
+    snaps = pd.DataFrame(rows, columns=["item_name", "captured_at", "quantity"])
+    if snaps.empty:
+        return snaps
+    snaps["captured_at"] = pd.to_datetime(snaps["captured_at"])
+
+    # Every snapshot time is an upload time; older databases have no upload log
+    times = db.execute(
+        select(InventoryUpload.captured_at).union(select(InventorySnapshot.captured_at))
+    ).scalars().all()
+    uploads = pd.DataFrame({"captured_at": pd.to_datetime(sorted(times))})
+    first = snaps.groupby("item_name", sort=False)["captured_at"].min().rename("first_at").reset_index()
+    grid = first.merge(uploads, how="cross")
+    grid = grid[grid["captured_at"] >= grid["first_at"]].drop(columns="first_at")
+    filled = pd.merge_asof(
+        grid.sort_values("captured_at", kind="stable"),
+        snaps.sort_values("captured_at", kind="stable"),
+        on="captured_at",
+        by="item_name",
+    )
+    return filled[["item_name", "captured_at", "quantity"]].reset_index(drop=True)
+
+
+def fit_item_trends(db: Session) -> pd.DataFrame:
+    """
+    Current inventory with the fitted weekly stock trend per SKU.
+    Columns: item_name, category, quantity, price, slope, points.
+    """
+    current = db.execute(
+        select(InventoryItem.item_name, InventoryItem.category, InventoryItem.quantity, InventoryItem.price)
+    ).all()
+    items = pd.DataFrame(current, columns=["item_name", "category", "quantity", "price"])
+    if items.empty:
+        return items.assign(slope=pd.Series(dtype=float), points=pd.Series(dtype=int))
+    items["quantity"] = items["quantity"].fillna(0).astype(int)
+
+    hist = load_stock_history(db)
+    if hist.empty:
+        return items.assign(slope=0.0, points=0)
+
+    ts = pd.to_datetime(hist["captured_at"])
+    t_weeks = ((ts - ts.max()).dt.total_seconds() / _SECONDS_PER_WEEK).to_numpy()
+    codes = pd.Index(items["item_name"]).get_indexer(hist["item_name"])
+    fit = fit_stock_trends(codes, t_weeks, hist["quantity"].to_numpy(dtype=float), len(items))
+    return items.assign(slope=fit["slope"], points=fit["points"])
+
+
+def _build_forecast(db: Session) -> Dict[str, Any]:
+    trends = fit_item_trends(db)
+    if trends.empty:
+        return {"aggregate": [], "items": []}
+
+    names = trends["item_name"].to_numpy(dtype=object)
+    stock = trends["quantity"].to_numpy(dtype=float)
+    slope = trends["slope"].to_numpy(dtype=float)
+    points = trends["points"].to_numpy(dtype=int)
+
+    # Project forward from the current on-hand quantity using the fitted weekly trend
+    horizon = np.arange(1, FORECAST_WEEKS + 1, dtype=float)
+    projection = np.clip(stock[:, None] + slope[:, None] * horizon[None, :], 0, None)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weeks_to_stockout = np.where(slope < 0, stock / -slope, np.nan)
+
+    aggregate = [
+        {"week": f"W{w}", "predicted_stock": round(float(total), 0)}
+        for w, total in enumerate(projection.sum(axis=0), 1)
+    ]
+    items = [
+        {
+            "name": names[i],
+            "current_stock": int(stock[i]),
+            "weekly_trend": round(float(slope[i]), 2),
+            "history_points": int(points[i]),
+            "weeks_to_stockout": None if np.isnan(weeks_to_stockout[i]) else round(float(weeks_to_stockout[i]), 1),
+            "projection": [round(float(v), 0) for v in projection[i]],
+        }
+        for i in np.argsort(slope, kind="stable")
+    ]
+    return {"aggregate": aggregate, "items": items}
+
+
+def get_forecast(db: Session) -> Dict[str, Any]:
+    """Cached forecast for the current inventory data version."""
+    version = get_version(db, "inventory")
+    return _cache.get_or_compute(("forecast", version), lambda: _build_forecast(db))
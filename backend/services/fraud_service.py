@@ -1,12 +1,17 @@
 import json
+import os
 from pathlib import Path
 
 import pandas as pd
 from typing import List, Dict, Any
 from fastapi import UploadFile, HTTPException
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 from models.fraud import FraudRecord
+from models.vendor import Vendor
+from services.data_version_service import bump_version, get_module_status
 from services.fraud_engine import normalize_columns, compute_fraud_score
+from services.vendor_service import encode_vendors, find_vendor_column
 
 
 _SNAPSHOT_PATH = Path(__file__).resolve().parent / "fraud_snapshot.json"
@@ -17,16 +22,26 @@ def _write_fraud_snapshot(payload: Dict[str, Any]) -> None:
     Persist the latest FraudLens engine output so other services (insights, PDF)
     can reuse the exact same risk scores and labels.
     """
+    tmp = _SNAPSHOT_PATH.with_suffix(".json.tmp")
     try:
-        _SNAPSHOT_PATH.write_text(
+        tmp.write_text(
             json.dumps(payload, ensure_ascii=False),
             encoding="utf-8",
         )
+        os.replace(tmp, _SNAPSHOT_PATH)    # readers never see a half-written file
     except Exception:
         # Snapshot failures must never break main fraud upload flow
         pass
 
 
+def fraud_snapshot_stamp() -> int:
+    """Modification time (ns) of the snapshot file, 0 when there is none; part of the report cache key."""
+    try:
+        return _SNAPSHOT_PATH.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
 def _read_fraud_snapshot():
     try:
         if not _SNAPSHOT_PATH.exists():
@@ -37,8 +52,7 @@ def _read_fraud_snapshot():
 
 
 def get_fraud_status(db: Session) -> Dict[str, Any]:
-    count = db.query(FraudRecord).count()
-    return {"has_data": count > 0, "row_count": count}
+    return get_module_status(db, "fraud")
 
 
 def get_fraud_insights(db: Session) -> Dict[str, Any]:
@@ -130,6 +144,33 @@ def get_fraud_chart_data(db: Session) -> List[Dict[str, Any]]:
     return [{"day": "Total", "normal": normal, "flagged": flagged}]
 
 
+def get_fraud_vendor_summary(db: Session, limit: int = 20) -> List[Dict[str, Any]]:
+    """Vendors ranked by flagged transactions, aggregated over the integer vendor key."""
+    flagged = func.sum(case((FraudRecord.is_fraud == True, 1), else_=0))  # noqa: E712
+    rows = (
+        db.query(
+            Vendor.name,
+            func.count(FraudRecord.id),
+            flagged.label("flagged"),
+            func.sum(FraudRecord.amount),
+        )
+        .join(Vendor, Vendor.id == FraudRecord.vendor_id)
+        .group_by(FraudRecord.vendor_id)
+        .order_by(flagged.desc(), func.count(FraudRecord.id).desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "vendor": name,
+            "transactions": n,
+            "flagged": int(f or 0),
+            "total_amount": int(amt or 0),
+        }
+        for name, n, f, amt in rows
+    ]
+
+
 def upload_fraud_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are allowed.")
@@ -137,6 +178,11 @@ def upload_fraud_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
         df = pd.read_csv(file.file)
         df.columns = [str(c).strip() for c in df.columns]
 
+        # Vendor column is read before alias normalisation, which folds
+        # vendor/merchant into merchant_category for the scoring engine.
+        vendor_col = find_vendor_column(df.columns)
+        vendor_names = df[vendor_col].copy() if vendor_col else None
+
         # ── Normalize column names ────────────────────────────────────────
         col_map = normalize_columns(list(df.columns))
         df.rename(columns=col_map, inplace=True)
@@ -156,9 +202,10 @@ def upload_fraud_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
             if col not in df.columns:
                 df[col] = None
 
-        # ── Clear existing data ───────────────────────────────────────────
+        # ── Clear existing data (replaced in the same transaction) ────────
         db.query(FraudRecord).delete()
-        db.commit()
+
+        vendor_ids = encode_vendors(vendor_names, db) if vendor_names is not None else None
 
         # Convert to list-of-dicts for engine
         rows = df.to_dict(orient="records")
@@ -195,6 +242,7 @@ def upload_fraud_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
                 transaction_id=tx_id,
                 amount=int(amount),
                 is_fraud=is_fraud,
+                vendor_id=vendor_ids.iat[idx] if vendor_ids is not None else None,
             )
             db.add(record)
 
@@ -219,6 +267,7 @@ def upload_fraud_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
                 "amount": amount,
                 "timestamp": str(ts_raw) if ts_raw else None,
                 "merchant_category": str(row.get("merchant_category") or ""),
+                "vendor": str(vendor_names.iat[idx]).strip() if vendor_ids is not None and vendor_ids.iat[idx] is not None else None,
                 "account_age_days": row.get("account_age_days"),
                 "risk_score": risk_score,
                 "risk_label": risk_label,
@@ -226,6 +275,7 @@ def upload_fraud_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
                 "is_fraud": is_fraud,
             })
 
+        bump_version(db, "fraud")
         db.commit()
 
         total = len(transactions_out)
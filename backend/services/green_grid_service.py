@@ -1,50 +1,205 @@
+import math
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
 from fastapi import UploadFile, HTTPException
+from sqlalchemy import Integer, cast, func
 from sqlalchemy.orm import Session
 from models.green_grid import GreenGridRecord
+from services.data_version_service import get_module_status
+from services.downsampling import lttb
+from services.energy_profile_service import summarize_profile, weekly_profile
+from services.energy_timeseries import load_hourly_matrix, load_readings, prepare_readings, store_readings
+from services.load_shift_engine import optimize_load_shift
+
+
+DEFAULT_FLEXIBLE_SHARE = 0.2    # share of load assumed movable for the dashboard summary
+
+
+def _range_filters(start: Optional[datetime], end: Optional[datetime], department: Optional[str]) -> list:
+    """Index-backed filters on (department, ts)."""
+    filters = []
+    if department:
+        filters.append(GreenGridRecord.department == department)
+    if start is not None:
+        filters.append(GreenGridRecord.ts >= start)
+    if end is not None:
+        filters.append(GreenGridRecord.ts < end)
+    return filters
 
 
 def get_green_grid_status(db: Session) -> Dict[str, Any]:
-    count = db.query(GreenGridRecord).count()
-    return {"has_data": count > 0, "row_count": count}
+    return get_module_status(db, "green_grid")
 
 
-def get_green_grid_data(db: Session) -> Dict[str, Any]:
-    records = db.query(GreenGridRecord).all()
-    if not records:
+def get_green_grid_data(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Usage overview. Whole-history requests read the energy profile cube
+    (constant time); explicit time windows aggregate the readings in SQL.
+    """
+    if start is None and end is None:
+        profile = summarize_profile(db, department)
+        n, avg = profile["readings"], profile["avg_kwh"]
+        peak_hours = profile["peak_hours"]
+        load = weekly_profile(db, department)
+    else:
+        n, avg = db.query(
+            func.count(GreenGridRecord.id),
+            func.avg(GreenGridRecord.usage_kwh),
+        ).filter(*_range_filters(start, end, department)).one()
+        peak_hours = []
+        load = load_hourly_matrix(db, start, end, department)[1]
+    if not n:
         return {
             "current_usage_kwh": 0,
             "suggested_peak_shift": 0,
             "potential_savings_percent": 0,
+            "peak_hours": [],
             "recommendations": [],
         }
 
-    usages = [r.usage_kwh for r in records]
-    avg = round(sum(usages) / len(usages), 2) if usages else 0
-    peak = round(max(usages), 2) if usages else 0
-    savings = round(((peak - avg) / peak * 100) if peak > 0 else 0, 1)
+    avg = round(float(avg or 0), 2)
+    # Peak reduction achievable by moving DEFAULT_FLEXIBLE_SHARE of each day's load
+    plan = optimize_load_shift(load, DEFAULT_FLEXIBLE_SHARE)
+    savings = plan["peak_reduction_percent"]
+    shift = round(plan["shifted_kwh"] / plan["total_kwh"] * 100, 1) if plan["total_kwh"] else 0.0
 
     recs = []
     if savings > 10:
         recs.append("Shift heavy loads to off-peak hours")
     if avg > 50:
         recs.append("Consider energy-efficient equipment upgrades")
-    recs.append("Monitor usage during identified peak windows")
+    if peak_hours:
+        recs.append("Monitor usage during peak hours: " + ", ".join(f"{h:02d}:00" for h in peak_hours))
+    else:
+        recs.append("Monitor usage during identified peak windows")
 
     return {
         "current_usage_kwh": avg,
-        "suggested_peak_shift": round(savings / 2, 1),
+        "suggested_peak_shift": shift,
         "potential_savings_percent": savings,
+        "peak_hours": peak_hours,
         "recommendations": recs[:3],
     }
 
 
-def get_energy_chart_data(db: Session) -> List[Dict[str, Any]]:
-    records = db.query(GreenGridRecord).order_by(GreenGridRecord.id).all()
-    if not records:
+def get_load_shift_plan(
+    db: Session,
+    flexible_percent: float = 20.0,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Shift `flexible_percent` of each day's load into its off-peak hours (water-filling)."""
+    if not 0 <= flexible_percent <= 100:
+        raise HTTPException(status_code=400, detail="flexible_percent must be between 0 and 100")
+    _, load = load_hourly_matrix(db, start, end, department)
+    return {"flexible_percent": flexible_percent, **optimize_load_shift(load, flexible_percent / 100)}
+
+
+CHART_METHODS = ("bucket", "lttb")
+
+
+def _bucket_chart(db: Session, filters: list, t0: datetime, t1: datetime, max_points: int) -> List[Dict[str, Any]]:
+    """Mean/min/max per fixed-width time bucket, aggregated in SQL."""
+    width = max(1, math.ceil(((t1 - t0).total_seconds() + 1) / max_points))
+    bucket = cast((func.julianday(GreenGridRecord.ts) - func.julianday(t0)) * 86400 / width, Integer).label("bucket")
+    rows = (
+        db.query(
+            bucket,
+            func.avg(GreenGridRecord.usage_kwh),
+            func.min(GreenGridRecord.usage_kwh),
+            func.max(GreenGridRecord.usage_kwh),
+            func.count(GreenGridRecord.id),
+        )
+        .filter(*filters)
+        .group_by(bucket)
+        .order_by(bucket)
+        .all()
+    )
+    points = []
+    for idx, mean, lo, hi, n in rows:
+        ts = t0 + timedelta(seconds=idx * width)
+        points.append({
+            "hour": ts.strftime("%Y-%m-%d %H:%M"),
+            "ts": ts.isoformat(),
+            "usage": round(float(mean), 2),
+            "min": round(float(lo), 2),
+            "max": round(float(hi), 2),
+            "count": n,
+        })
+    return points
+
+
+def get_energy_chart_data(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+    max_points: int = 1000,
+    method: str = "bucket",
+) -> List[Dict[str, Any]]:
+    """
+    Energy series for the chart, at most max_points long. Small ranges are
+    returned as-is; larger ones are bucketed in SQL (mean/min/max per time
+    bucket) or reduced with LTTB, which keeps the visual shape of the peaks.
+    """
+    if method not in CHART_METHODS:
+        raise HTTPException(status_code=400, detail=f"method must be one of: {', '.join(CHART_METHODS)}")
+    if not 10 <= max_points <= 5000:
+        raise HTTPException(status_code=400, detail="max_points must be between 10 and 5000")
+
+    # Rows whose label never parsed have no place on a time axis
+    filters = [GreenGridRecord.ts.isnot(None), *_range_filters(start, end, department)]
+    n, t0, t1 = db.query(
+        func.count(GreenGridRecord.id),
+        func.min(GreenGridRecord.ts),
+        func.max(GreenGridRecord.ts),
+    ).filter(*filters).one()
+    if not n:
         return []
-    return [{"hour": r.hour, "usage": round(r.usage_kwh, 2)} for r in records]
+
+    if n > max_points and method == "bucket":
+        return _bucket_chart(db, filters, t0, t1, max_points)
+
+    records = (
+        db.query(GreenGridRecord.hour, GreenGridRecord.ts, GreenGridRecord.usage_kwh)
+        .filter(*filters)
+        .order_by(GreenGridRecord.ts, GreenGridRecord.id)
+        .all()
+    )
+    if n > max_points:
+        x = np.array([ts.timestamp() for _, ts, _ in records])
+        y = np.array([usage for _, _, usage in records], dtype=float)
+        records = [records[i] for i in lttb(x, y, max_points)]
+    return [
+        {"hour": hour, "ts": ts.isoformat(), "usage": round(usage, 2)}
+        for hour, ts, usage in records
+    ]
+
+
+def get_energy_readings(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    department: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Raw readings for a time window / department, oldest first."""
+    df = load_readings(db, start, end, department)
+    return [
+        {"ts": ts.isoformat(), "department": dept, "usage_kwh": round(float(usage), 3)}
+        for ts, dept, usage in zip(df["ts"], df["department"], df["usage_kwh"])
+    ]
+
+
+def get_departments(db: Session) -> List[str]:
+    return [d for (d,) in db.query(GreenGridRecord.department).distinct().order_by(GreenGridRecord.department) if d]
 
 
 def upload_green_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
@@ -56,9 +211,7 @@ def upload_green_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
         if not required_cols.issubset(df.columns):
             raise HTTPException(status_code=400, detail=f"CSV must contain columns: {', '.join(required_cols)}")
 
-        for _, row in df.iterrows():
-            item = GreenGridRecord(hour=str(row["hour"]), usage_kwh=float(row["usage_kwh"]))
-            db.add(item)
+        store_readings(prepare_readings(df), db)
         db.commit()
 
         by_hour = df.groupby("hour")["usage_kwh"].mean()
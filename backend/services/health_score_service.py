@@ -1,30 +1,168 @@
 # Business Health Score: composite from expense, fraud, inventory, green
-import random
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set
 
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
 
-def get_health_score() -> Dict[str, Any]:
-    score = random.randint(62, 92)
+from database import engine
+from models.data_version import DataVersion
+from models.expense import ExpenseItem
+from models.fraud import FraudRecord
+from models.health_score import HealthScoreRecord
+from models.inventory import InventoryItem
+from services.data_version_service import on_version_change
+from services.energy_profile_service import summarize_profile
+from services.versioned_cache import VersionedCache
+
+
+MODULES = ("expense", "fraud", "green_grid", "inventory")
+
+# Factor name → history column
+FACTOR_COLUMNS = {
+    "Cash flow": "cash_flow",
+    "Fraud risk": "fraud_risk",
+    "Inventory": "inventory",
+    "Sustainability": "sustainability",
+}
+
+_cache = VersionedCache(maxsize=4)
+
+
+def _clamp(value: float) -> int:
+    return int(round(min(100.0, max(0.0, value))))
+
+
+def _cash_flow_factor(db: Session) -> Optional[Dict[str, Any]]:
+    """Latest month's spend vs the mean of up to three months before it; flat spend scores 80."""
+    rows = db.query(ExpenseItem.month, func.sum(ExpenseItem.amount)).group_by(ExpenseItem.month).all()
+    if len(rows) < 2:
+        return None
+    months = pd.Series({m: float(a or 0) for m, a in rows})
+    numeric = pd.to_numeric(months.index.to_series(), errors="coerce")
+    months = months.iloc[numeric.argsort().to_numpy()] if numeric.notna().all() else months.sort_index()
+    baseline = months.iloc[-4:-1].mean()
+    if baseline <= 0:
+        return None
+    growth = (months.iloc[-1] / baseline - 1) * 100
+    return {"name": "Cash flow", "score": _clamp(80 - growth), "detail": f"Latest month spend {growth:+.1f}% vs prior months"}
+
+
+def _fraud_factor(db: Session) -> Optional[Dict[str, Any]]:
+    """Share of transactions flagged as fraud; every flagged percent costs two points."""
+    total, flagged = db.query(
+        func.count(FraudRecord.id),
+        func.sum(case((FraudRecord.is_fraud == True, 1), else_=0)),
+    ).one()
+    if not total:
+        return None
+    rate = (flagged or 0) / total * 100
+    return {"name": "Fraud risk", "score": _clamp(100 - 2 * rate), "detail": f"{rate:.1f}% of transactions flagged"}
+
+
+def _inventory_factor(db: Session) -> Optional[Dict[str, Any]]:
+    """Share of SKUs below their reorder point, weighted 1.5×."""
+    total, low = db.query(
+        func.count(InventoryItem.id),
+        func.sum(case((InventoryItem.quantity < InventoryItem.reorder_at, 1), else_=0)),
+    ).one()
+    if not total:
+        return None
+    ratio = (low or 0) / total
+    return {"name": "Inventory", "score": _clamp(100 - 150 * ratio), "detail": f"{ratio * 100:.1f}% of SKUs below reorder point"}
+
+
+def _sustainability_factor(db: Session) -> Optional[Dict[str, Any]]:
+    """Peak ratio: busiest hour-of-day mean over the overall mean, from the energy profile cube."""
+    profile = summarize_profile(db)
+    if not profile["readings"] or not profile["avg_kwh"]:
+        return None
+    ratio = max(profile["hourly_mean_kwh"].values()) / profile["avg_kwh"]
+    return {"name": "Sustainability", "score": _clamp(100 - (ratio - 1) * 100), "detail": f"Peak hour runs {ratio:.2f}× average usage"}
+
+
+def _level(score: int) -> Dict[str, str]:
     if score >= 80:
-        level = "excellent"
-        color = "green"
-    elif score >= 65:
-        level = "good"
-        color = "blue"
-    elif score >= 50:
-        level = "fair"
-        color = "yellow"
+        return {"level": "excellent", "color": "green"}
+    if score >= 65:
+        return {"level": "good", "color": "blue"}
+    if score >= 50:
+        return {"level": "fair", "color": "yellow"}
+    return {"level": "needs_attention", "color": "red"}
+
+
+def _module_versions(db: Session) -> str:
+    versions = dict(db.query(DataVersion.module, DataVersion.version).filter(DataVersion.module.in_(MODULES)).all())
+    return ",".join(f"{m}={versions.get(m, 0)}" for m in MODULES)
+
+
+def _compute(db: Session, versions: str) -> Dict[str, Any]:
+    factors = [
+        f for f in (_cash_flow_factor(db), _fraud_factor(db), _inventory_factor(db), _sustainability_factor(db))
+        if f is not None
+    ]
+    if factors:
+        score = _clamp(sum(f["score"] for f in factors) / len(factors))
+        result = {"score": score, **_level(score), "factors": factors}
     else:
-        level = "needs_attention"
-        color = "red"
-    return {
-        "score": score,
-        "level": level,
-        "color": color,
-        "factors": [
-            {"name": "Cash flow", "score": min(100, score + random.randint(-10, 10))},
-            {"name": "Fraud risk", "score": min(100, 100 - (100 - score) + random.randint(-5, 5))},
-            {"name": "Inventory", "score": min(100, score + random.randint(-8, 8))},
-            {"name": "Sustainability", "score": min(100, score + random.randint(-12, 12))},
-        ],
-    }
+        result = {"score": 0, "level": "no_data", "color": "gray", "factors": []}
+    return {**result, "data_versions": versions}
+
+
+def get_health_score(db: Session) -> Dict[str, Any]:
+    """Composite of the module factors, memoized per combined module data version. Read-only."""
+    versions = _module_versions(db)
+    return _cache.get_or_compute(versions, lambda: _compute(db, versions))
+
+
+def record_health_score(bind=engine) -> None:
+    """Append a history row for the current data state, unless that state is already recorded."""
+    with Session(bind) as db:
+        versions = _module_versions(db)
+        if db.query(HealthScoreRecord.id).filter(HealthScoreRecord.versions == versions).first() is not None:
+            return
+        result = get_health_score(db)
+        if not result["factors"]:
+            return
+        db.add(HealthScoreRecord(
+            recorded_at=datetime.utcnow(),
+            versions=versions,
+            score=result["score"],
+            **{FACTOR_COLUMNS[f["name"]]: f["score"] for f in result["factors"]},
+        ))
+        db.commit()
+
+
+def _record_on_change(modules: Set[str], bind) -> None:
+    # Write path: runs after a commit that changed module data, never on a GET
+    if not modules & set(MODULES):
+        return
+    try:
+        record_health_score(bind)
+    except Exception:
+        pass    # history is best effort; the writer's transaction has already committed
+
+
+on_version_change(_record_on_change)
+
+
+def get_health_history(db: Session, limit: int = 90) -> List[Dict[str, Any]]:
+    """Recorded scores, oldest first (newest `limit` rows via the recorded_at index)."""
+    if not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    rows = (
+        db.query(HealthScoreRecord)
+        .order_by(HealthScoreRecord.recorded_at.desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "recorded_at": r.recorded_at.isoformat(),
+            "score": r.score,
+            **{col: getattr(r, col) for col in FACTOR_COLUMNS.values()},
+        }
+        for r in reversed(rows)
+    ]
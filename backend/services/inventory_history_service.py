@@ -0,0 +1,178 @@
+# Inventory stock history: append-only snapshots with as-of and delta queries
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import and_, func, insert, select
+from sqlalchemy.orm import Session
+
+from models.inventory_snapshot import InventorySnapshot
+from models.inventory_upload import InventoryUpload
+
+
+# Keep IN (...) lists under SQLite's bound-parameter limit
+_LOOKUP_CHUNK = 500
+
+_SNAPSHOT_COLUMNS = ["item_name", "category", "quantity", "price"]
+
+
+def _latest_snapshots(item_names: List[str], db: Session) -> pd.DataFrame:
+    """Most recent snapshot for each of the given SKUs (index-backed per-SKU max)."""
+    frames = []
+    for start in range(0, len(item_names), _LOOKUP_CHUNK):
+        chunk = item_names[start:start + _LOOKUP_CHUNK]
+        latest = (
+            select(InventorySnapshot.item_name, func.max(InventorySnapshot.captured_at).label("ts"))
+            .where(InventorySnapshot.item_name.in_(chunk))
+            .group_by(InventorySnapshot.item_name)
+            .subquery()
+        )
+        rows = db.execute(
+            select(*(getattr(InventorySnapshot, c) for c in _SNAPSHOT_COLUMNS))
+            .join(latest, and_(
+                InventorySnapshot.item_name == latest.c.item_name,
+                InventorySnapshot.captured_at == latest.c.ts,
+            ))
+        ).all()
+        frames.append(pd.DataFrame(rows, columns=_SNAPSHOT_COLUMNS))
+    if not frames:
+        return pd.DataFrame(columns=_SNAPSHOT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def record_stock_snapshots(
+    records: List[Dict[str, Any]],
+    db: Session,
+    captured_at: Optional[datetime] = None,
+) -> int:
+    """
+    Append one history row per changed SKU with a single executemany INSERT,
+    and log the upload itself in inventory_uploads.
+
+    SKUs whose quantity, price and category match their latest snapshot are
+    skipped, so re-uploading an unchanged catalogue adds no history rows; the
+    upload log still records the time, and load_stock_history forward-fills
+    unchanged SKUs onto it. Returns the number of history rows written.
+    """
+    if not records:
+        return 0
+    captured_at = captured_at or datetime.utcnow()
+    incoming = pd.DataFrame(records, columns=_SNAPSHOT_COLUMNS)
+    latest = _latest_snapshots(incoming["item_name"].tolist(), db)
+
+    merged = incoming.merge(latest, on="item_name", how="left", suffixes=("", "_prev"))
+    unchanged = (
+        (merged["quantity"] == merged["quantity_prev"])
+        & (merged["price"] == merged["price_prev"])
+        & (merged["category"] == merged["category_prev"])
+    )
+    changed = merged.loc[~unchanged, _SNAPSHOT_COLUMNS]
+    db.add(InventoryUpload(captured_at=captured_at, items=len(incoming), changed_items=len(changed)))
+    if changed.empty:
+        return 0
+
+    changed = changed.assign(captured_at=captured_at)
+    db.execute(insert(InventorySnapshot), changed.to_dict(orient="records"))
+    return len(changed)
+
+
+def list_snapshot_times(db: Session, limit: int = 50) -> List[Dict[str, Any]]:
+    """Upload times that wrote history, newest first, with the number of SKUs changed."""
+    rows = db.execute(
+        select(InventorySnapshot.captured_at, func.count(InventorySnapshot.id))
+        .group_by(InventorySnapshot.captured_at)
+        .order_by(InventorySnapshot.captured_at.desc())
+        .limit(limit)
+    ).all()
+    return [{"captured_at": ts.isoformat(), "changed_items": n} for ts, n in rows]
+
+
+def get_stock_as_of(db: Session, at: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Stock per SKU as it stood at time `at` (latest snapshot with captured_at <= at).
+    Uses the (item_name, captured_at) index for the per-SKU max.
+    """
+    latest = select(InventorySnapshot.item_name, func.max(InventorySnapshot.captured_at).label("ts"))
+    if at is not None:
+        latest = latest.where(InventorySnapshot.captured_at <= at)
+    latest = latest.group_by(InventorySnapshot.item_name).subquery()
+    rows = db.execute(
+        select(
+            *(getattr(InventorySnapshot, c) for c in _SNAPSHOT_COLUMNS),
+            InventorySnapshot.captured_at,
+        )
+        .join(latest, and_(
+            InventorySnapshot.item_name == latest.c.item_name,
+            InventorySnapshot.captured_at == latest.c.ts,
+        ))
+    ).all()
+    return pd.DataFrame(rows, columns=_SNAPSHOT_COLUMNS + ["captured_at"])
+
+
+def get_stock_delta(db: Session, start: datetime, end: Optional[datetime] = None) -> pd.DataFrame:
+    """Per-SKU stock change between two points in time (as-of start vs as-of end)."""
+    before = get_stock_as_of(db, start)[["item_name", "quantity"]]
+    after = get_stock_as_of(db, end)[["item_name", "category", "quantity"]]
+    delta = after.merge(before, on="item_name", how="outer", suffixes=("_end", "_start"))
+    delta[["quantity_start", "quantity_end"]] = delta[["quantity_start", "quantity_end"]].fillna(0).astype(int)
+    delta["change"] = delta["quantity_end"] - delta["quantity_start"]
+    return delta.sort_values("change", kind="stable").reset_index(drop=True)
+
+
+def get_consumption_rates(db: Session) -> List[Dict[str, Any]]:
+    """
+    Units consumed per week over the two most recent history intervals.
+    Consumption is the sum of per-SKU stock decreases; restocks are ignored.
+    Returns up to two entries, oldest interval first.
+    """
+    times = [
+        ts for (ts,) in db.execute(
+            select(InventorySnapshot.captured_at)
+            .group_by(InventorySnapshot.captured_at)
+            .order_by(InventorySnapshot.captured_at.desc())
+            .limit(3)
+        ).all()
+    ][::-1]
+
+    rates = []
+    for prev, curr in zip(times, times[1:]):
+        weeks = (curr - prev).total_seconds() / (7 * 24 * 3600)
+        if weeks <= 0:
+            continue
+        delta = get_stock_delta(db, prev, curr)
+        consumed = float((-delta["change"]).clip(lower=0).sum())
+        rates.append({
+            "start": prev.isoformat(),
+            "end": curr.isoformat(),
+            "units_consumed": int(consumed),
+            "units_per_week": round(consumed / weeks, 2),
+        })
+    return rates
+
+
+def get_inventory_as_of(db: Session, at: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    df = get_stock_as_of(db, at)
+    return [
+        {
+            "name": r.item_name,
+            "category": r.category,
+            "stock": int(r.quantity),
+            "price": float(r.price),
+            "captured_at": r.captured_at.isoformat(),
+        }
+        for r in df.itertuples(index=False)
+    ]
+
+
+def get_inventory_delta(db: Session, start: datetime, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    df = get_stock_delta(db, start, end)
+    return [
+        {
+            "name": r.item_name,
+            "category": r.category if isinstance(r.category, str) else None,
+            "stock_start": int(r.quantity_start),
+            "stock_end": int(r.quantity_end),
+            "change": int(r.change),
+        }
+        for r in df.itertuples(index=False)
+    ]
@@ -1,93 +1,248 @@
-# Smart Inventory AI: reorder suggestions (rule-based + optional LinearRegression)
-from typing import List, Dict, Any
+# Smart Inventory AI: reorder suggestions (rule-based) + per-SKU trend forecasts
+import base64
+import json
+from typing import List, Dict, Any, Optional
 from fastapi import UploadFile, HTTPException
 
-try:
-    from sklearn.linear_model import LinearRegression
-    import numpy as np
-    HAS_SKLEARN = True
-except ImportError:
-    HAS_SKLEARN = False
-
 try:
     import pandas as pd
     HAS_PANDAS = True
 except ImportError:
     HAS_PANDAS = False
 
+from sqlalchemy import and_, case, func, or_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from models.inventory import InventoryItem
+from services.data_version_service import bump_version, get_module_status
+from services.forecast_engine import get_forecast
+from services.inventory_history_service import record_stock_snapshots
+from services.classification_engine import ABC_CLASSES, XYZ_CLASSES, apply_inventory_classes
+from services.reorder_engine import apply_reorder_points, get_reorder_points, reorder_details
+from services.stockout_engine import get_stockout_risk
 
 
 def get_inventory_status(db: Session) -> Dict[str, Any]:
-    count = db.query(InventoryItem).count()
-    return {"has_data": count > 0, "row_count": count}
+    return get_module_status(db, "inventory")
+
+
+def _item_dict(i: InventoryItem, points) -> Dict[str, Any]:
+    return {
+        "name": i.item_name,
+        "stock": i.quantity,
+        "reorder_at": i.reorder_at,
+        "category": i.category,
+        "price": i.price,
+        "abc_class": i.abc_class,
+        "xyz_class": i.xyz_class,
+        **reorder_details(points, i.item_name),
+    }
+
 
+def _class_filters(abc_class: Optional[str], xyz_class: Optional[str]) -> list:
+    """SQL filters for the persisted ABC/XYZ classes (validated)."""
+    filters = []
+    if abc_class:
+        if abc_class.upper() not in ABC_CLASSES:
+            raise HTTPException(status_code=400, detail=f"abc_class must be one of: {', '.join(ABC_CLASSES)}")
+        filters.append(InventoryItem.abc_class == abc_class.upper())
+    if xyz_class:
+        if xyz_class.upper() not in XYZ_CLASSES:
+            raise HTTPException(status_code=400, detail=f"xyz_class must be one of: {', '.join(XYZ_CLASSES)}")
+        filters.append(InventoryItem.xyz_class == xyz_class.upper())
+    return filters
 
-def get_inventory_summary(db: Session) -> Dict[str, Any]:
-    db_items = db.query(InventoryItem).all()
-    if not db_items:
-        return {"items": [], "low_stock_count": 0, "suggestions": []}
 
-    # Use 20% of max quantity in category as reorder threshold, min 5
-    quantities = [i.quantity for i in db_items]
-    max_qty = max(quantities) if quantities else 100
-    reorder_threshold = max(5, int(max_qty * 0.2))
+def get_inventory_summary(
+    db: Session,
+    abc_class: Optional[str] = None,
+    xyz_class: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Catalogue-level aggregates computed in SQL; item rows are served by
+    get_inventory_items. Optionally restricted to one ABC and/or XYZ class.
+    """
+    filters = _class_filters(abc_class, xyz_class)
+    total_items, total_units = db.query(
+        func.count(InventoryItem.id),
+        func.sum(InventoryItem.quantity),
+    ).filter(*filters).one()
+    if not total_items:
+        return {
+            "total_items": 0,
+            "total_units": 0,
+            "total_value": 0,
+            "low_stock_count": 0,
+            "by_category": [],
+            "by_class": [],
+            "low_stock_items": [],
+            "suggestions": [],
+        }
+
+    # Per-SKU reorder points are persisted by the reorder engine on upload
+    is_low = InventoryItem.quantity < InventoryItem.reorder_at
+    points = get_reorder_points(db)
+    value = func.sum(InventoryItem.quantity * InventoryItem.price)
 
-    items = [
+    by_category = [
         {
-            "name": i.item_name,
-            "stock": i.quantity,
-            "reorder_at": reorder_threshold,
-            "category": i.category,
-            "price": i.price,
+            "category": cat,
+            "items": n,
+            "units": int(units or 0),
+            "stock_value": round(float(val or 0), 2),
+            "low_stock_count": int(low or 0),
         }
-        for i in db_items
+        for cat, n, units, val, low in db.query(
+            InventoryItem.category,
+            func.count(InventoryItem.id),
+            func.sum(InventoryItem.quantity),
+            value,
+            func.sum(case((is_low, 1), else_=0)),
+        )
+        .filter(*filters)
+        .group_by(InventoryItem.category)
+        .order_by(value.desc())
+        .all()
+    ]
+    low_stock_count = sum(c["low_stock_count"] for c in by_category)
+    total_value = sum(c["stock_value"] for c in by_category)
+
+    # ABC/XYZ classes are persisted by the classification engine on upload
+    by_class = [
+        {
+            "abc_class": abc,
+            "xyz_class": xyz,
+            "items": n,
+            "stock_value": round(float(val or 0), 2),
+            "value_share": round(float(val or 0) / total_value * 100, 1) if total_value else 0.0,
+            "low_stock_count": int(low or 0),
+        }
+        for abc, xyz, n, val, low in db.query(
+            InventoryItem.abc_class,
+            InventoryItem.xyz_class,
+            func.count(InventoryItem.id),
+            value,
+            func.sum(case((is_low, 1), else_=0)),
+        )
+        .filter(*filters)
+        .group_by(InventoryItem.abc_class, InventoryItem.xyz_class)
+        .order_by(InventoryItem.abc_class, InventoryItem.xyz_class)
+        .all()
+    ]
+
+    low_items = [
+        _item_dict(i, points)
+        for i in db.query(InventoryItem)
+        .filter(is_low, *filters)
+        .order_by(InventoryItem.quantity, InventoryItem.id)
+        .limit(5)
+        .all()
     ]
-    low_stock = [i for i in items if i["stock"] < i["reorder_at"]]
     return {
-        "items": items,
-        "low_stock_count": len(low_stock),
+        "total_items": total_items,
+        "total_units": int(total_units or 0),
+        "total_value": round(total_value, 2),
+        "low_stock_count": low_stock_count,
+        "by_category": by_category,
+        "by_class": by_class,
+        "low_stock_items": low_items,
         "suggestions": [
             f"Reorder {i['name']} soon (current stock: {i['stock']}, threshold: {i['reorder_at']})"
-            for i in low_stock[:5]
+            for i in low_items
         ],
     }
 
 
+_SORT_COLUMNS = {
+    "name": InventoryItem.item_name,
+    "stock": InventoryItem.quantity,
+    "price": InventoryItem.price,
+}
+
+
+def _encode_cursor(value: Any, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([value, row_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return value, int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def get_inventory_items(
+    db: Session,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    sort: str = "name",
+    order: str = "asc",
+    category: Optional[str] = None,
+    below_threshold: bool = False,
+    abc_class: Optional[str] = None,
+    xyz_class: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Keyset-paginated item listing. The cursor carries the last row's
+    (sort value, id) so each page is an index range scan, not an OFFSET.
+    """
+    if sort not in _SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(_SORT_COLUMNS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    limit = max(1, min(limit, 500))
+
+    col = _SORT_COLUMNS[sort]
+
+    q = db.query(InventoryItem).filter(*_class_filters(abc_class, xyz_class))
+    if category:
+        q = q.filter(InventoryItem.category == category)
+    if below_threshold:
+        q = q.filter(InventoryItem.quantity < InventoryItem.reorder_at)
+    if cursor:
+        last_value, last_id = _decode_cursor(cursor)
+        if order == "asc":
+            q = q.filter(or_(col > last_value, and_(col == last_value, InventoryItem.id > last_id)))
+        else:
+            q = q.filter(or_(col < last_value, and_(col == last_value, InventoryItem.id < last_id)))
+    if order == "asc":
+        q = q.order_by(col.asc(), InventoryItem.id.asc())
+    else:
+        q = q.order_by(col.desc(), InventoryItem.id.desc())
+
+    rows = q.limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = _encode_cursor(getattr(last, col.key), last.id)
+
+    points = get_reorder_points(db)
+    return {
+        "items": [_item_dict(i, points) for i in page],
+        "next_cursor": next_cursor,
+    }
+
+
 def get_inventory_forecast(db: Session) -> List[Dict[str, Any]]:
-    """Generate forecast from real DB data using linear regression on quantities."""
-    db_items = db.query(InventoryItem).all()
-    if not db_items:
-        return []
-
-    # Sort items by quantity descending and project depletion over 4 weeks
-    items_sorted = sorted(db_items, key=lambda x: x.quantity, reverse=True)[:8]
-
-    if HAS_SKLEARN:
-        # Use linear regression to project weekly stock decline
-        results = []
-        total_qty = sum(i.quantity for i in db_items)
-        # Assume ~8% weekly consumption rate based on total stock
-        weekly_rate = total_qty * 0.08
-        X = np.array([[i] for i in range(1, 6)])  # weeks 1-5 as training proxy
-        y = np.array([total_qty - (weekly_rate * i) for i in range(1, 6)])
-        model = LinearRegression().fit(X, y)
-        future = np.array([[i] for i in range(1, 5)])
-        pred = model.predict(future)
-        return [
-            {"week": f"W{i}", "predicted_stock": max(0, round(float(p), 0))}
-            for i, p in enumerate(pred, 1)
-        ]
-
-    # Fallback: simple linear depletion
-    total = sum(i.quantity for i in db_items)
-    weekly_drop = total * 0.08
-    return [
-        {"week": f"W{i}", "predicted_stock": max(0, round(total - weekly_drop * i, 0))}
-        for i in range(1, 5)
-    ]
+    """Aggregate weekly stock projection from the cached per-SKU trend fits."""
+    return get_forecast(db)["aggregate"]
+
+
+def get_inventory_item_forecast(db: Session, limit: int = 50) -> List[Dict[str, Any]]:
+    """Per-SKU projections, fastest-depleting first."""
+    return get_forecast(db)["items"][:limit]
+
+
+def get_inventory_stockout_risk(db: Session, weeks: int = 4, scenarios: int = 1000, limit: int = 50) -> Dict[str, Any]:
+    """Monte Carlo stockout probabilities per SKU, riskiest first."""
+    if not 1 <= weeks <= 26:
+        raise HTTPException(status_code=400, detail="weeks must be between 1 and 26")
+    if not 100 <= scenarios <= 5000:
+        raise HTTPException(status_code=400, detail="scenarios must be between 100 and 5000")
+    risk = get_stockout_risk(db, weeks, scenarios)
+    return {**risk, "items": risk["items"][:max(1, min(limit, 500))]}
 
 
 def process_inventory_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
@@ -172,6 +327,10 @@ def process_inventory_csv(file: UploadFile, db: Session) -> Dict[str, Any]:
                 ))
             records_added += 1
 
+        record_stock_snapshots(list(consolidated.values()), db)
+        apply_reorder_points(db)
+        apply_inventory_classes(db)
+        bump_version(db, "inventory")
         db.commit()
     except IntegrityError as e:
         db.rollback()
@@ -0,0 +1,187 @@
+# Shared metrics snapshot: lazily resolved module_data for chat, /ai/ask and the PDF report
+import asyncio
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from services.business_assistant import (
+    LazyModuleData,
+    compose_response,
+    compose_sections,
+    detect_intents,
+    intent_modules,
+    normalize_question,
+)
+from services.carbon_service import get_carbon_estimate
+from services.data_version_service import get_versions
+from services.expense_service import get_expense_summary
+from services.fraud_service import get_fraud_insights
+from services.green_grid_service import get_green_grid_data
+from services.health_score_service import get_health_score
+from services.inventory_service import get_inventory_summary
+from services.recommendations_service import get_recommendations
+from services.versioned_cache import VersionedCache
+
+
+# Modules the snapshot is derived from; any version change builds a new snapshot
+MODULES = ("expense", "fraud", "green_grid", "inventory")
+
+# module_data key → data modules whose versions its value depends on
+DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "expense": ("expense",),
+    "fraud": ("fraud",),
+    "inventory": ("inventory",),
+    "green_grid": ("green_grid",),
+    "health": MODULES,
+    "carbon": ("green_grid",),
+    "recommendations": (),
+}
+
+_cache = VersionedCache(maxsize=32)
+_answers = VersionedCache(maxsize=256)
+
+
+# Stand-ins for a module whose computation failed; failures are never cached
+_FAILED_DEFAULTS: Dict[str, Any] = {"recommendations": []}
+
+
+def _compute(db: Session, key: str, has_data: Dict[str, bool]) -> Any:
+    # Modules without uploaded data are None so the assistant asks for an upload instead of quoting zeros
+    if key == "expense":
+        return get_expense_summary(db) if has_data["expense"] else None
+    if key == "fraud":
+        return get_fraud_insights(db) if has_data["fraud"] else None
+    if key == "inventory":
+        return get_inventory_summary(db) if has_data["inventory"] else None
+    if key == "green_grid":
+        return get_green_grid_data(db) if has_data["green_grid"] else None
+    if key == "health":
+        return get_health_score(db)
+    if key == "carbon":
+        return get_carbon_estimate(db)
+    return get_recommendations()
+
+
+def _version_key(versions: Dict[str, Dict[str, Any]], modules: Tuple[str, ...]) -> tuple:
+    return tuple(versions[m]["version"] for m in modules)
+
+
+def lazy_module_data(
+    db: Session,
+    versions: Dict[str, Dict[str, Any]] = None,
+    failed: Optional[Set[str]] = None,
+) -> LazyModuleData:
+    """
+    module_data whose entries are computed on first access, each cached by the
+    versions of the modules it depends on. Reading fraud never touches expense.
+    An entry whose computation raises reads as its fallback (None) and is not
+    cached, so a transient error such as a locked database is retried on the
+    next read; its key is added to `failed`.
+    """
+    versions = versions if versions is not None else get_versions(db)
+    has_data = {m: v["row_count"] > 0 for m, v in versions.items()}
+
+    def provider(key: str) -> Callable[[], Any]:
+        cache_key = (key, _version_key(versions, DEPENDENCIES[key]))
+
+        def resolve() -> Any:
+            try:
+                return _cache.get_or_compute(cache_key, lambda: _compute(db, key, has_data))
+            except Exception:
+                if failed is not None:
+                    failed.add(key)
+                return _FAILED_DEFAULTS.get(key)
+
+        return resolve
+
+    return LazyModuleData({key: provider(key) for key in DEPENDENCIES})
+
+
+def snapshot_key(db: Session) -> tuple:
+    return _version_key(get_versions(db), MODULES)
+
+
+def get_metrics_snapshot(db: Session) -> Dict[str, Any]:
+    """
+    module_data for every module, built from the same per-module cache the
+    assistant uses and shared by all readers. Treat the result as read-only.
+    """
+    data = lazy_module_data(db)
+    return {key: data.get(key) for key in DEPENDENCIES}
+
+
+def _answer_key(question: str, intents: List[str], versions: Dict[str, Dict[str, Any]]) -> tuple:
+    deps = tuple(sorted({m for key in intent_modules(intents) for m in DEPENDENCIES[key]}))
+    return normalize_question(question), _version_key(versions, deps)
+
+
+def answer_question(db: Session, question: str) -> Dict[str, Any]:
+    """
+    Assistant answer for a question. Intents are detected first and only their
+    modules are computed; answers are memoized by (normalized question, versions
+    of those modules), so a repeated question is a dictionary lookup.
+    """
+    versions = get_versions(db)
+    intents = detect_intents(question)
+    key = _answer_key(question, intents, versions)
+    sections = _answers.get(key)
+    if sections is None:
+        failed: Set[str] = set()
+        sections = compose_sections(intents, lazy_module_data(db, versions, failed))
+        if not failed:
+            _answers.put(key, sections)
+    return compose_response(sections)
+
+
+def _resolve_section(index: int, intent: str, versions: Dict[str, Dict[str, Any]]) -> tuple:
+    # Runs in a worker thread, so it gets its own session
+    db = SessionLocal()
+    failed: Set[str] = set()
+    try:
+        return index, compose_sections([intent], lazy_module_data(db, versions, failed))[0], bool(failed)
+    finally:
+        db.close()
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_answer(db: Session, question: str) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for an answer: one `section` event per intent as soon as
+    its modules are resolved (sections resolve concurrently, so they can arrive
+    out of order; `index` is their place in the answer), then a `done` event
+    with the full response. Memoized answers are replayed immediately.
+    """
+    # Versions are read now, with the request's session; the stream runs after the handler returns
+    versions = get_versions(db)
+    intents = detect_intents(question)
+    key = _answer_key(question, intents, versions)
+
+    def section(index: int, intent: str, parts: List[str], used: List[str]) -> str:
+        return _sse("section", {"index": index, "intent": intent, "content": "\n\n".join(parts), "metrics_used": used})
+
+    async def events():
+        sections = _answers.get(key)
+        if sections is not None:
+            for index, sec in enumerate(sections):
+                yield section(index, *sec)
+        else:
+            resolved: List[Any] = [None] * len(intents)
+            any_failed = False
+            pending = [run_in_threadpool(_resolve_section, i, intent, versions) for i, intent in enumerate(intents)]
+            for next_done in asyncio.as_completed(pending):
+                index, sec, failed = await next_done
+                resolved[index] = sec
+                any_failed = any_failed or failed
+                yield section(index, *sec)
+            sections = resolved
+            if not any_failed:
+                _answers.put(key, sections)
+        yield _sse("done", compose_response(sections))
+
+    return events()
@@ -6,6 +6,10 @@ from models.fraud import FraudRecord
 from models.expense import ExpenseItem
 from models.inventory import InventoryItem
 from models.green_grid import GreenGridRecord
+from services.inventory_history_service import get_consumption_rates
+from services.reorder_engine import get_reorder_points
+from services.anomaly_engine import Z_THRESHOLD
+from services.energy_profile_service import PEAK_SLOT_FACTOR, SPIKE_FACTOR, summarize_profile
 
 
 def get_fraud_recommendations() -> List[Dict[str, Any]]:
@@ -123,23 +127,40 @@ def get_inventory_recommendations() -> List[Dict[str, Any]]:
     try:
         db: Session = SessionLocal()
         try:
-            items = db.query(InventoryItem).all()
-            if not items:
+            points = get_reorder_points(db)
+            if points.empty:
                 return []
 
-            reorder_threshold = 30
-            low_stock_items = [i for i in items if i.quantity < reorder_threshold]
-            very_low_items = [i for i in items if i.quantity < 10]
-            over_stock_items = [i for i in items if i.quantity > 200]
+            # Per-SKU thresholds from the shared reorder-point engine
+            items = points.reset_index()
+            low_stock_items = items[items["is_low"]]
+            very_low_items = items[items["quantity"] < items["reorder_at"] / 2]
+            over_stock_items = items[
+                ((items["weekly_demand"] > 0) & (items["days_of_cover"] > 180))
+                | ((items["weekly_demand"] == 0) & (items["quantity"] > 5 * items["reorder_at"]))
+            ]
 
-            low_pct = (len(low_stock_items) / len(items)) * 100 if items else 0
+            low_pct = (len(low_stock_items) / len(items)) * 100
 
-            if very_low_items:
-                names = ", ".join(i.item_name for i in very_low_items[:3])
+            if len(very_low_items):
+                names = ", ".join(very_low_items["item_name"].head(3))
                 recs.append({
                     "severity": "critical",
                     "title": "Critical Stock Depletion Risk",
-                    "message": f"{len(very_low_items)} items near zero stock: {names}. Place emergency reorders immediately to prevent operational disruption.",
+                    "message": f"{len(very_low_items)} items below half their reorder point: {names}. Place emergency reorders immediately to prevent operational disruption.",
+                })
+            # Class-A SKUs hold most of the stock value, so their shortfalls come first
+            class_a_low = [
+                name for (name,) in db.query(InventoryItem.item_name)
+                .filter(InventoryItem.abc_class == "A", InventoryItem.quantity < InventoryItem.reorder_at)
+                .order_by(InventoryItem.quantity)
+                .all()
+            ]
+            if class_a_low:
+                recs.append({
+                    "severity": "high",
+                    "title": "High-Value Items Below Reorder Point",
+                    "message": f"{len(class_a_low)} class-A items (top 80% of stock value) need replenishment: {', '.join(class_a_low[:3])}. Prioritise these orders and review their safety stock.",
                 })
             if low_pct > 40:
                 recs.append({
@@ -153,12 +174,24 @@ def get_inventory_recommendations() -> List[Dict[str, Any]]:
                     "title": "Inventory Replenishment Needed",
                     "message": f"{len(low_stock_items)} items below reorder point. Review supplier lead times and adjust min-max thresholds to optimize carrying costs.",
                 })
-            if over_stock_items:
-                names = ", ".join(i.item_name for i in over_stock_items[:3])
+            # Measured turnover: compare consumption across the last two uploads
+            rates = get_consumption_rates(db)
+            if len(rates) == 2 and rates[0]["units_per_week"] > 0:
+                prev_rate = rates[0]["units_per_week"]
+                curr_rate = rates[1]["units_per_week"]
+                change_pct = (curr_rate - prev_rate) / prev_rate * 100
+                if change_pct < -20:
+                    recs.append({
+                        "severity": "medium",
+                        "title": "Stock Turnover Slowing",
+                        "message": f"Consumption fell {abs(change_pct):.0f}% between the last two uploads ({prev_rate:,.0f} → {curr_rate:,.0f} units/week). Reduce reorder quantities to avoid tying up working capital.",
+                    })
+            if len(over_stock_items):
+                names = ", ".join(over_stock_items["item_name"].head(3))
                 recs.append({
                     "severity": "low",
                     "title": "Overstock Identified",
-                    "message": f"{len(over_stock_items)} items overstocked (>200 units): {names}. Reduce reorder rate to free up working capital and warehouse space.",
+                    "message": f"{len(over_stock_items)} items overstocked (>180 days of cover or 5× their reorder point): {names}. Reduce reorder rate to free up working capital and warehouse space.",
                 })
             if not recs:
                 recs.append({
@@ -179,27 +212,35 @@ def get_green_grid_recommendations() -> List[Dict[str, Any]]:
     try:
         db: Session = SessionLocal()
         try:
-            records = db.query(GreenGridRecord).all()
-            if not records:
+            # Same cube and thresholds as /green-grid/data
+            profile = summarize_profile(db)
+            if not profile["readings"]:
                 return []
 
-            usages = [float(r.usage_kwh) for r in records]
-            avg_usage = sum(usages) / len(usages) if usages else 0
-            max_usage = max(usages) if usages else 0
-            peak_records = [r for r in records if float(r.usage_kwh) > avg_usage * 1.4]
-            high_carbon_threshold = avg_usage * 1.6
+            avg_usage = profile["avg_kwh"]
+            max_usage = profile["peak_kwh"]
 
-            if max_usage > high_carbon_threshold:
+            if max_usage > avg_usage * SPIKE_FACTOR:
                 recs.append({
                     "severity": "high",
                     "title": "High Carbon Emission Period Detected",
                     "message": f"Peak consumption of {max_usage:.1f} kWh exceeds safe threshold by {((max_usage / avg_usage - 1) * 100):.0f}%. Shift high-load processes to off-peak hours and audit high-carbon equipment categories.",
                 })
-            if len(peak_records) > len(records) * 0.3:
+            # Local spikes flagged by the online detector at ingest (index-backed count)
+            spikes = db.query(GreenGridRecord.id).filter(
+                GreenGridRecord.is_anomaly == True, GreenGridRecord.anomaly_score > 0
+            ).count()
+            if spikes:
+                recs.append({
+                    "severity": "medium",
+                    "title": "Local Usage Spikes Detected",
+                    "message": f"{spikes} readings ran more than {Z_THRESHOLD:g} standard deviations above their department's recent baseline. Review /green-grid/anomalies for equipment faults or unscheduled loads.",
+                })
+            if profile["peak_slots"] > profile["slots"] * 0.3:
                 recs.append({
                     "severity": "medium",
                     "title": "Frequent Off-Peak Overrun",
-                    "message": f"{len(peak_records)} of {len(records)} hours exceed 40% above average usage. Enable automated load-balancing and consider renewable energy sourcing for peak hours.",
+                    "message": f"{profile['peak_slots']} of {profile['slots']} weekly hour slots run {(PEAK_SLOT_FACTOR - 1) * 100:.0f}% above average usage. Enable automated load-balancing and consider renewable energy sourcing for peak hours.",
                 })
             if avg_usage > 80:
                 recs.append({
@@ -0,0 +1,155 @@
+"""
+Reorder-point engine for Smart Inventory.
+Computes per-SKU reorder points, safety stock and days of cover in one
+vectorized pass over the catalogue (a single groupby("category") with
+transform for the per-category statistics).
+
+Demand comes from the forecast engine's fitted weekly stock trend. SKUs with
+measured depletion get a demand-based reorder point (lead-time demand +
+safety stock); the rest fall back to the category rule of 20% of the
+largest on-hand quantity in their category, min 5.
+
+Safety stock uses each SKU's own demand variability (the spread of its
+per-interval consumption rate over the snapshot history); SKUs with fewer
+than MIN_DEMAND_INTERVALS intervals use the spread across their category.
+"""
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from database import engine
+from models.inventory import InventoryItem
+from services.data_version_service import bump_version, get_version
+from services.forecast_engine import fit_item_trends, load_stock_history
+from services.versioned_cache import VersionedCache
+
+
+LEAD_TIME_DAYS = 7
+SERVICE_LEVEL_Z = 1.65          # ~95% cycle service level
+CATEGORY_SHARE = 0.2            # fallback: 20% of max quantity in category
+MIN_REORDER_POINT = 5
+MIN_DEMAND_INTERVALS = 3        # snapshot intervals before a SKU's own demand spread is trusted
+_SECONDS_PER_WEEK = 7 * 24 * 3600
+
+_cache = VersionedCache(maxsize=4)
+
+
+def demand_std(history: pd.DataFrame) -> pd.Series:
+    """
+    Per-SKU standard deviation of weekly demand, indexed by item_name.
+    Demand per interval is the stock decrease between consecutive snapshots
+    divided by the interval length (restocks count as zero demand). NaN for
+    SKUs with fewer than MIN_DEMAND_INTERVALS intervals.
+    """
+    if history.empty:
+        return pd.Series(dtype=float)
+    h = history.assign(captured_at=pd.to_datetime(history["captured_at"])).sort_values(
+        ["item_name", "captured_at"], kind="stable"
+    )
+    g = h.groupby("item_name", sort=False)
+    weeks = g["captured_at"].diff().dt.total_seconds() / _SECONDS_PER_WEEK
+    used = (-g["quantity"].diff()).clip(lower=0)
+    rate = (used / weeks).where(weeks > 0)
+    stats = rate.groupby(h["item_name"]).agg(["std", "count"])
+    return stats["std"].where(stats["count"] >= MIN_DEMAND_INTERVALS)
+
+
+def compute_reorder_points(items: pd.DataFrame, per_sku: bool = True) -> pd.DataFrame:
+    """
+    items: DataFrame with item_name, category, quantity and slope (weekly trend),
+    optionally demand_std (weekly; NaN where the SKU has too little history).
+
+    Adds columns: weekly_demand, safety_stock, reorder_at, days_of_cover, is_low.
+    With per_sku=False every SKU gets its category-level reorder point.
+    """
+    df = items.copy()
+    df["weekly_demand"] = (-df["slope"]).clip(lower=0)
+    daily = df["weekly_demand"] / 7.0
+
+    g = df.groupby("category", sort=False)
+    cat_max_qty = g["quantity"].transform("max")
+    cat_daily_mean = g["weekly_demand"].transform("mean") / 7.0
+    cat_daily_std = g["weekly_demand"].transform("std").fillna(0.0) / 7.0
+    if per_sku and "demand_std" in df:
+        daily_std = (df["demand_std"] / 7.0).fillna(cat_daily_std)
+    else:
+        daily_std = cat_daily_std
+
+    sqrt_lead = np.sqrt(LEAD_TIME_DAYS)
+    safety_stock = SERVICE_LEVEL_Z * daily_std * sqrt_lead
+    category_floor = np.maximum(MIN_REORDER_POINT, np.floor(cat_max_qty * CATEGORY_SHARE))
+
+    if per_sku:
+        demand_point = daily * LEAD_TIME_DAYS + safety_stock
+        reorder_at = np.where(daily > 0, np.maximum(MIN_REORDER_POINT, demand_point), category_floor)
+    else:
+        demand_point = cat_daily_mean * LEAD_TIME_DAYS + safety_stock
+        reorder_at = np.where(cat_daily_mean > 0, np.maximum(MIN_REORDER_POINT, demand_point), category_floor)
+
+    df["safety_stock"] = np.ceil(safety_stock).astype(int)
+    df["reorder_at"] = np.ceil(reorder_at).astype(int)
+    with np.errstate(divide="ignore"):
+        df["days_of_cover"] = np.where(daily > 0, df["quantity"] / daily, np.inf)
+    df["is_low"] = df["quantity"] < df["reorder_at"]
+    return df
+
+
+def _reorder_inputs(db: Session) -> pd.DataFrame:
+    trends = fit_item_trends(db)
+    std = demand_std(load_stock_history(db))
+    return trends.assign(demand_std=trends["item_name"].map(std).astype(float))
+
+
+def apply_reorder_points(db: Session) -> None:
+    """
+    Recompute reorder points for the whole catalogue and persist them on the
+    inventory rows (one executemany UPDATE). Called inside the upload
+    transaction so SQL filters on reorder_at see the new thresholds.
+    """
+    db.flush()
+    trends = _reorder_inputs(db)
+    if trends.empty:
+        return
+    points = compute_reorder_points(trends)
+    ids = dict(db.query(InventoryItem.item_name, InventoryItem.id).all())
+    db.execute(
+        update(InventoryItem),
+        [
+            {"id": ids[name], "reorder_at": int(rp)}
+            for name, rp in zip(points["item_name"], points["reorder_at"])
+        ],
+    )
+
+
+def get_reorder_points(db: Session) -> pd.DataFrame:
+    """Cached reorder-point frame (indexed by item_name) for the current inventory version."""
+    version = get_version(db, "inventory")
+    return _cache.get_or_compute(
+        ("reorder", version),
+        lambda: compute_reorder_points(_reorder_inputs(db)).set_index("item_name"),
+    )
+
+
+def reorder_details(points: pd.DataFrame, name: str) -> Dict[str, Optional[Any]]:
+    """safety_stock / days_of_cover for one SKU, JSON-friendly."""
+    if name not in points.index:
+        return {"safety_stock": None, "days_of_cover": None}
+    row = points.loc[name]
+    cover = float(row["days_of_cover"])
+    return {
+        "safety_stock": int(row["safety_stock"]),
+        "days_of_cover": None if np.isinf(cover) else round(cover, 1),
+    }
+
+
+def backfill_reorder_points(bind=engine) -> None:
+    """Fill reorder_at for rows stored before reorder points were persisted."""
+    with Session(bind) as db:
+        if db.query(InventoryItem.id).filter(InventoryItem.reorder_at.is_(None)).first() is None:
+            return
+        apply_reorder_points(db)
+        bump_version(db, "inventory")     # cached reports and answers were built from the old values
+        db.commit()
@@ -0,0 +1,148 @@
+# Rendered PDF reports on disk, keyed by the module data versions they were built from
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.config import REPORT_CACHE_DIR
+from database import SessionLocal
+from services.data_version_service import get_versions, on_version_change
+from services.fraud_service import fraud_snapshot_stamp
+from services.report_service import build_report
+
+
+# Modules the report reads; a version change in any of them means a new file
+REPORT_MODULES = ("expense", "fraud", "green_grid", "inventory")
+KEEP_REPORTS = 4
+PRUNE_GRACE_SECONDS = 60        # a file served (or rendered) this recently is never pruned
+PRERENDER_DELAY_SECONDS = 2.0   # coalesce bursts of uploads; the fraud snapshot JSON is written just after commit
+PRERENDER_INTERVAL_SECONDS = 300  # at most one background render per 5 minutes (live ingest bumps every few seconds)
+
+_render_lock = threading.Lock()
+_worker_lock = threading.Lock()
+_pending = threading.Event()
+_worker: Optional[threading.Thread] = None
+
+
+def _directory() -> Path:
+    return Path(REPORT_CACHE_DIR)
+
+
+def report_key(db: Session) -> str:
+    # The fraud snapshot JSON is written just after its upload commits; its mtime keeps
+    # a report rendered in between from being served once the snapshot lands
+    versions = get_versions(db)
+    modules = "-".join(f"{m}{versions[m]['version']}" for m in REPORT_MODULES)
+    return f"{modules}-snap{fraud_snapshot_stamp()}"
+
+
+def _cached(key: str) -> Optional[Tuple[Path, str]]:
+    # File names carry the content hash, so the ETag survives restarts without a sidecar
+    for path in _directory().glob(f"report_{key}_*.pdf"):
+        return path, f'"{path.stem.rsplit("_", 1)[1]}"'
+    return None
+
+
+def _touch(hit: Optional[Tuple[Path, str]]) -> Optional[Tuple[Path, str]]:
+    """Mark a cached file as just served so _prune leaves it to the response; None if it is gone."""
+    if hit is None:
+        return None
+    try:
+        os.utime(hit[0])
+    except OSError:
+        return None     # pruned between lookup and use
+    return hit
+
+
+def _prune() -> None:
+    cutoff = time.time() - PRUNE_GRACE_SECONDS
+    files = sorted(_directory().glob("report_*.pdf"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in files[KEEP_REPORTS:]:
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def _render(key: str) -> Tuple[Path, str]:
+    with _render_lock:
+        hit = _touch(_cached(key))
+        if hit is not None:
+            return hit
+        directory = _directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                build_report(out)
+            digest = hashlib.sha256()
+            with open(tmp, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    digest.update(chunk)
+            etag = digest.hexdigest()[:32]
+            path = directory / f"report_{key}_{etag}.pdf"
+            os.replace(tmp, path)
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        _prune()
+        return path, f'"{etag}"'
+
+
+def get_report_file(db: Optional[Session] = None) -> Tuple[Path, str]:
+    """(path, strong ETag) of the report for the current data, rendering it on a miss."""
+    if db is None:
+        with SessionLocal() as session:
+            key = report_key(session)
+    else:
+        key = report_key(db)
+    return _touch(_cached(key)) or _render(key)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match evaluation (weak comparison, as RFC 9110 specifies for this header)."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+def _prerender_loop() -> None:
+    last = float("-inf")
+    while True:
+        _pending.wait()
+        # Changes during the wait are picked up by this render; later ones wait for the next slot
+        time.sleep(max(PRERENDER_DELAY_SECONDS, last + PRERENDER_INTERVAL_SECONDS - time.monotonic()))
+        _pending.clear()
+        last = time.monotonic()
+        try:
+            get_report_file()
+        except Exception:
+            pass    # the next download renders on demand
+
+
+def schedule_prerender(modules: Set[str], bind=None) -> None:
+    """
+    Render the report in the background after a commit that changed report
+    data, at most once per PRERENDER_INTERVAL_SECONDS. A download in between
+    renders on demand.
+    """
+    global _worker
+    if not modules & set(REPORT_MODULES):
+        return
+    if bind is not None and bind is not SessionLocal.kw.get("bind"):
+        return      # a commit to some other database than the one the report reads
+    _pending.set()
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_prerender_loop, name="report-prerender", daemon=True)
+            _worker.start()
+
+
+on_version_change(schedule_prerender)
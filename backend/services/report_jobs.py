@@ -0,0 +1,177 @@
+# Full-detail report jobs: rendered in a worker process, progress tracked in report_jobs
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from core.config import REPORT_CACHE_DIR
+from database import SessionLocal, engine
+from models.report_job import ReportJob
+from services.data_version_service import get_versions
+from services.report_service import build_full_report
+
+
+REPORT_JOB_WORKERS = 1          # full renders are CPU-bound; one at a time keeps the API responsive
+KEEP_JOBS = 20                  # finished jobs (and their files) kept per server
+PROGRESS_INTERVAL_SECONDS = 1.0
+APPENDIX_MODULES = ("fraud", "inventory", "green_grid")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _jobs_dir() -> Path:
+    return Path(REPORT_CACHE_DIR) / "jobs"
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: the API process runs threads (reading buffer, pre-renderer) that must not be forked
+            _executor = ProcessPoolExecutor(
+                max_workers=REPORT_JOB_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def shutdown_report_workers() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def job_status(job: ReportJob) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "progress": round(job.progress or 0.0, 3),
+        "rows_done": job.rows_done,
+        "rows_total": job.rows_total,
+        "pages": job.pages,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "error": job.error,
+    }
+
+
+def render_job(job_id: str) -> None:
+    """Worker-process entry point: render the full report to a temp file, then publish it."""
+    db = SessionLocal()
+    try:
+        job = db.get(ReportJob, job_id)
+        if job is None or job.status != "queued":
+            return
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        directory = _jobs_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{job_id}.pdf"
+        tmp = directory / f"{job_id}.pdf.tmp"
+        rows_done = 0
+        last_write = 0.0
+
+        def on_progress(rows: int, page: int) -> None:
+            nonlocal rows_done, last_write
+            rows_done = rows
+            now = time.monotonic()
+            if now - last_write < PROGRESS_INTERVAL_SECONDS:
+                return
+            last_write = now
+            job.rows_done = rows
+            job.pages = page
+            job.progress = min(rows / job.rows_total, 0.99) if job.rows_total else 0.0
+            db.commit()
+
+        try:
+            with open(tmp, "wb") as out:
+                pages = build_full_report(out, on_progress)
+            os.replace(tmp, path)
+        except Exception as e:
+            db.rollback()
+            tmp.unlink(missing_ok=True)
+            job.status = "failed"
+            job.error = str(e)[:500]
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            return
+
+        job.status = "done"
+        job.pages = pages
+        job.rows_done = rows_done
+        job.progress = 1.0
+        job.path = str(path)
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+def _prune_jobs(db: Session) -> None:
+    stale = (
+        db.query(ReportJob)
+        .filter(ReportJob.status.in_(("done", "failed")))
+        .order_by(ReportJob.created_at.desc())
+        .offset(KEEP_JOBS)
+        .all()
+    )
+    for job in stale:
+        if job.path:
+            Path(job.path).unlink(missing_ok=True)
+        db.delete(job)
+    db.commit()
+
+
+def create_report_job(db: Session, user: Dict[str, Any]) -> Dict[str, Any]:
+    """Queue a full-detail report for the worker process."""
+    versions = get_versions(db)
+    job = ReportJob(
+        id=uuid.uuid4().hex,
+        status="queued",
+        requested_by=user.get("sub"),
+        created_at=datetime.utcnow(),
+        rows_total=sum(versions[m]["row_count"] for m in APPENDIX_MODULES),
+    )
+    db.add(job)
+    db.commit()
+    _prune_jobs(db)
+    try:
+        _pool().submit(render_job, job.id)
+    except Exception as e:
+        shutdown_report_workers()       # a broken pool is replaced on the next submit
+        job.status = "failed"
+        job.error = str(e)[:500]
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        raise HTTPException(status_code=503, detail="Report worker unavailable")
+    return job_status(job)
+
+
+def get_report_job(db: Session, job_id: str, user: Dict[str, Any]) -> ReportJob:
+    job = db.get(ReportJob, job_id)
+    if job is None or job.requested_by != user.get("sub"):
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+
+def fail_interrupted_jobs(bind=engine) -> None:
+    """At startup: jobs whose worker died with the previous server process will never finish."""
+    with Session(bind) as db:
+        db.query(ReportJob).filter(ReportJob.status.in_(("queued", "running"))).update(
+            {"status": "failed", "error": "Interrupted by a server restart", "finished_at": datetime.utcnow()},
+            synchronize_session=False,
+        )
+        db.commit()
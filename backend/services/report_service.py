@@ -1,18 +1,29 @@
 import json
+import re
+import zlib
+from array import array
 from io import BytesIO
+from itertools import chain, islice
 from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, List, Optional
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfdoc import PDFArray, PDFName, PDFStream
+from reportlab.pdfgen.canvas import Canvas
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
 
-from services.health_score_service import get_health_score
-from services.expense_service import get_expense_summary
-from services.fraud_service import get_fraud_insights
-from services.inventory_service import get_inventory_summary
-from services.green_grid_service import get_green_grid_data, get_energy_chart_data
+from models.fraud import FraudRecord
+from models.green_grid import GreenGridRecord
+from models.inventory import InventoryItem
+from models.vendor import Vendor
+from services.metrics_snapshot import get_metrics_snapshot
+from services.inventory_service import get_inventory_items
+from services.green_grid_service import get_energy_chart_data
 from database import SessionLocal
 
 
@@ -20,13 +31,33 @@ _FRAUD_SNAPSHOT_PATH = Path(__file__).resolve().parent / "fraud_snapshot.json"
 
 
 def generate_report_pdf() -> bytes:
+    buffer = BytesIO()
+    build_report(buffer)
+    return buffer.getvalue()
+
+
+def build_report(out: BinaryIO) -> None:
+    """Render the executive summary PDF into a binary file object."""
+    _document(out).build(_summary_story())
+
+
+def _document(out: BinaryIO) -> SimpleDocTemplate:
+    return SimpleDocTemplate(out, pagesize=letter, rightMargin=inch, leftMargin=inch)
+
+
+def _summary_story() -> list:
     db = SessionLocal()
     try:
-        health = get_health_score()
-        expense = get_expense_summary(db)
-        fraud = get_fraud_insights(db)
-        inventory = get_inventory_summary(db)
-        green = get_green_grid_data(db)
+        metrics = get_metrics_snapshot(db)
+        health = metrics["health"]
+        # Modules without data are None in the snapshot
+        expense = metrics["expense"] or {"by_category": [], "total": 0, "trend": "stable", "trend_percent": 0}
+        fraud = metrics["fraud"] or {}
+        inventory = metrics["inventory"] or {}
+        low_stock_rows = get_inventory_items(db, limit=10, sort="stock", below_threshold=True)["items"]
+        if not low_stock_rows:
+            low_stock_rows = get_inventory_items(db, limit=10)["items"]
+        green = metrics["green_grid"] or {}
         energy_chart = get_energy_chart_data(db)
     finally:
         db.close()
@@ -40,8 +71,6 @@ def generate_report_pdf() -> bytes:
     except Exception:
         fraud_snapshot = None
 
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=inch, leftMargin=inch)
     styles = getSampleStyleSheet()
     story = []
 
@@ -146,34 +175,33 @@ def generate_report_pdf() -> bytes:
             story.append(ft)
 
     # Smart Inventory section (if inventory data exists)
-    items = inventory.get("items") or []
-    if items:
+    if inventory.get("total_items"):
         story.append(Spacer(1, 0.4 * inch))
         story.append(Paragraph("Smart Inventory — Low Stock Snapshot", styles["Heading2"]))
         story.append(Spacer(1, 0.15 * inch))
 
-        # Derive low-stock items based on summary thresholds
-        low_stock_rows = []
-        for it in items:
-            try:
-                stock = int(it.get("stock", 0))
-                reorder_at = int(it.get("reorder_at", 0))
-            except (TypeError, ValueError):
-                stock = 0
-                reorder_at = 0
-            if stock < reorder_at:
-                low_stock_rows.append(it)
-
-        inv_data = [["Item", "Category", "Stock", "Reorder At"]]
-        source_rows = low_stock_rows or items
-        for it in source_rows[:10]:
+        class_a = [c for c in inventory.get("by_class", []) if c["abc_class"] == "A"]
+        if class_a:
+            a_items = sum(c["items"] for c in class_a)
+            a_share = sum(c["value_share"] for c in class_a)
+            story.append(Paragraph(
+                f"Class A: {a_items} of {inventory['total_items']} items hold {a_share:.1f}% of stock value.",
+                styles["Normal"],
+            ))
+            story.append(Spacer(1, 0.1 * inch))
+
+        # Low-stock rows come from the paginated listing; falls back to the
+        # first items when nothing is below threshold.
+        inv_data = [["Item", "Category", "Class", "Stock", "Reorder At"]]
+        for it in low_stock_rows:
             inv_data.append([
                 str(it.get("name", "")),
                 str(it.get("category", "")),
+                (it.get("abc_class") or "") + (it.get("xyz_class") or ""),
                 str(it.get("stock", "")),
                 str(it.get("reorder_at", "")),
             ])
-        itable = Table(inv_data, colWidths=[2.4 * inch, 1.6 * inch, 1.0 * inch, 1.0 * inch])
+        itable = Table(inv_data, colWidths=[2.2 * inch, 1.4 * inch, 0.7 * inch, 0.9 * inch, 1.0 * inch])
         itable.setStyle(TableStyle([
             ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
             ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
@@ -198,6 +226,12 @@ def generate_report_pdf() -> bytes:
             f"Average usage: {avg_usage:.2f} kWh · Potential savings: {savings:.1f}% · Suggested peak shift: {shift:.1f}%",
             styles["Normal"],
         ))
+        peak_hours = green.get("peak_hours") or []
+        if peak_hours:
+            story.append(Paragraph(
+                "Peak hours: " + ", ".join(f"{h:02d}:00" for h in peak_hours),
+                styles["Normal"],
+            ))
         story.append(Spacer(1, 0.15 * inch))
 
         if energy_chart:
@@ -219,6 +253,262 @@ def generate_report_pdf() -> bytes:
             ]))
             story.append(gtable)
 
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
+    return story
+
+
+# ── Full-detail report (appendices with every row) ───────────────────────
+
+APPENDIX_ROWS_PER_TABLE = 50    # about one page per table; platypus splits the rest
+PART_FLOWABLES = 100            # flowables laid out per part document before it is merged into the output
+STREAM_BATCH = 1000             # rows per keyset query
+LOOKAHEAD_FLOWABLES = 4         # flowables materialized ahead of the layout engine
+
+_APPENDIX_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ("BACKGROUND", (0, 1), (-1, -1), colors.lightblue),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+])
+
+
+class _CompactCanvas(Canvas):
+    """
+    Canvas that deflates each page's content stream as soon as the page is
+    finished. ReportLab keeps every page until save(); compressed, a full
+    appendix page costs ~2 KB of memory instead of ~15 KB.
+    """
+
+    def showPage(self):
+        super().showPage()
+        page = self._doc.Pages.pages[-1]
+        if page.stream:
+            contents = PDFStream(content=zlib.compress(page.stream.encode("utf8")))
+            contents.dictionary["Filter"] = PDFArray([PDFName("FlateDecode")])   # already applied
+            contents.__Comment__ = "page stream"
+            page.Contents, page.stream = contents, None
+
+
+class _StreamedStory(list):
+    """
+    Flowable list for doc.build that is refilled from an iterator as platypus
+    consumes it (build pops from the front and pushes split remainders back),
+    so only a few appendix tables exist at any time instead of the whole story.
+    """
+
+    def __init__(self, flowables: Iterator):
+        super().__init__()
+        self._source = flowables
+        self._fill()
+
+    def _fill(self) -> None:
+        while len(self) < LOOKAHEAD_FLOWABLES:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                return
+
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        self._fill()
+
+
+class _PdfMerger:
+    """
+    Streaming concatenation of ReportLab documents. Each part's objects are
+    renumbered and written to `out` as soon as the part is added; only the
+    byte offsets of written objects and the page ids stay in memory, so the
+    output can grow without the process growing with it. Object 1 (catalog)
+    and object 2 (page tree) are written by close().
+    """
+
+    _REF = re.compile(rb"(\d+) 0 R\b")
+
+    def __init__(self, out: BinaryIO):
+        self._out = out
+        self._pos = 0
+        self._offsets = array("q", [0, 0, 0])    # index = object id; 0 is the free-list head
+        self._kids = array("q")
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data: bytes) -> None:
+        self._out.write(data)
+        self._pos += len(data)
+
+    def add(self, pdf: bytes) -> int:
+        """Append every page of one complete ReportLab PDF. Returns its page count."""
+        xref_at = int(pdf[pdf.rindex(b"startxref") + 9:].split()[0])
+        lines = pdf[xref_at:].split(b"\n")
+        count = int(lines[1].split()[1])
+        starts = sorted(int(line[:10]) for line in lines[2:2 + count] if line[17:18] == b"n")
+        trailer = pdf[pdf.index(b"trailer", xref_at):]
+        root = int(re.search(rb"/Root (\d+) 0 R", trailer).group(1))
+        info = re.search(rb"/Info (\d+) 0 R", trailer)
+
+        objects = {}
+        for start, end in zip(starts, starts[1:] + [xref_at]):
+            objects[int(pdf[start:pdf.index(b" ", start)])] = (start, end)
+        catalog = pdf[slice(*objects[root])]
+        tree = int(re.search(rb"/Pages (\d+) 0 R", catalog).group(1))
+        kids = pdf[slice(*objects[tree])]
+        kids = kids[kids.index(b"/Kids"):]
+        kids = [int(n) for n in self._REF.findall(kids[:kids.index(b"]")])]
+
+        skip = {root, tree} | ({int(info.group(1))} if info else set())
+        ids = {}
+        for old in objects:
+            if old not in skip:
+                ids[old] = len(self._offsets) + len(ids)
+        ids[tree] = 2
+        for old, (start, end) in objects.items():
+            if old in skip:
+                continue
+            body = pdf[pdf.index(b"obj", start) + 3:end]
+            split = body.find(b"\nstream\n")
+            head, stream = (body, b"") if split < 0 else (body[:split], body[split:])
+            head = self._REF.sub(lambda m: b"%d 0 R" % ids[int(m.group(1))], head)
+            self._offsets.append(self._pos)
+            self._write(b"%d 0 obj" % ids[old] + head + stream)
+        self._kids.extend(ids[k] for k in kids)
+        return len(kids)
+
+    def close(self) -> None:
+        """Write the catalog, the page tree, the cross-reference table and the trailer."""
+        self._offsets[1] = self._pos
+        self._write(b"1 0 obj\n<<\n/Pages 2 0 R /Type /Catalog\n>>\nendobj\n")
+        self._offsets[2] = self._pos
+        self._write(b"2 0 obj\n<<\n/Count %d /Type /Pages /Kids [" % len(self._kids))
+        for start in range(0, len(self._kids), 1000):
+            self._write(b"".join(b" %d 0 R" % k for k in self._kids[start:start + 1000]))
+        self._write(b" ]\n>>\nendobj\n")
+
+        xref_at = self._pos
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % len(self._offsets))
+        for start in range(1, len(self._offsets), 1000):
+            self._write(b"".join(b"%010d 00000 n \n" % o for o in self._offsets[start:start + 1000]))
+        self._write(b"trailer\n<<\n/Root 1 0 R /Size %d\n>>\nstartxref\n%d\n%%%%EOF\n" % (len(self._offsets), xref_at))
+
+
+def _keyset_rows(db: Session, stmt, keys: list) -> Iterator:
+    """
+    Rows of stmt ordered by keys (selected as its last columns), fetched in
+    short batches: no read lock is held across the render and memory stays flat.
+    """
+    last = None
+    while True:
+        q = stmt.order_by(*keys).limit(STREAM_BATCH)
+        if last is not None:
+            q = q.where(tuple_(*keys) > tuple_(*last))
+        rows = db.execute(q).all()
+        yield from rows
+        if len(rows) < STREAM_BATCH:
+            return
+        last = tuple(rows[-1][-len(keys):])
+
+
+def _fraud_rows(db: Session) -> Iterator[List[str]]:
+    stmt = (
+        select(FraudRecord.transaction_id, Vendor.name, FraudRecord.amount, FraudRecord.is_fraud, FraudRecord.id)
+        .outerjoin(Vendor, FraudRecord.vendor_id == Vendor.id)
+    )
+    for tx, vendor, amount, flagged, _ in _keyset_rows(db, stmt, [FraudRecord.id]):
+        yield [str(tx or ""), str(vendor or ""), f"${(amount or 0):,.2f}", "Flagged" if flagged else "Normal"]
+
+
+def _inventory_rows(db: Session) -> Iterator[List[str]]:
+    stmt = select(
+        InventoryItem.category, InventoryItem.abc_class, InventoryItem.xyz_class,
+        InventoryItem.quantity, InventoryItem.reorder_at, InventoryItem.item_name,
+    )
+    for category, abc, xyz, qty, reorder_at, name in _keyset_rows(db, stmt, [InventoryItem.item_name]):
+        yield [name, category, (abc or "") + (xyz or ""), str(qty), "" if reorder_at is None else str(reorder_at)]
+
+
+def _energy_rows(db: Session) -> Iterator[List[str]]:
+    # Timestamped readings in time order, then those stored without a date
+    stmt = (
+        select(GreenGridRecord.department, GreenGridRecord.usage_kwh, GreenGridRecord.is_anomaly,
+               GreenGridRecord.ts, GreenGridRecord.id)
+        .where(GreenGridRecord.ts.is_not(None))
+    )
+    for dept, usage, anomaly, ts, _ in _keyset_rows(db, stmt, [GreenGridRecord.ts, GreenGridRecord.id]):
+        yield [ts.strftime("%Y-%m-%d %H:%M"), dept or "General", f"{float(usage or 0):.3f}", "Spike" if anomaly else ""]
+    stmt = (
+        select(GreenGridRecord.hour, GreenGridRecord.hour_of_day, GreenGridRecord.department,
+               GreenGridRecord.usage_kwh, GreenGridRecord.id)
+        .where(GreenGridRecord.ts.is_(None))
+    )
+    for label, hour, dept, usage, _ in _keyset_rows(db, stmt, [GreenGridRecord.id]):
+        when = f"{hour:02d}:00" if hour is not None else str(label or "")
+        yield [f"{when} (no date)", dept or "General", f"{float(usage or 0):.3f}", ""]
+
+
+def _appendix(title: str, header: List[str], widths: List[float], rows: Iterator[List[str]],
+              on_rows: Callable[[int], None]) -> Iterator:
+    styles = getSampleStyleSheet()
+    yield Paragraph(title, styles["Heading2"])
+    yield Spacer(1, 0.15 * inch)
+    chunk: List[List[str]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == APPENDIX_ROWS_PER_TABLE:
+            yield Table([header] + chunk, colWidths=[w * inch for w in widths], repeatRows=1, style=_APPENDIX_STYLE)
+            on_rows(len(chunk))
+            chunk = []
+    if chunk:
+        yield Table([header] + chunk, colWidths=[w * inch for w in widths], repeatRows=1, style=_APPENDIX_STYLE)
+        on_rows(len(chunk))
+
+
+def _parts(flowables: Iterator, size: int) -> Iterator[Iterator]:
+    """Consecutive slices of at most `size` flowables; each must be consumed before the next is drawn."""
+    for first in flowables:
+        yield chain([first], islice(flowables, size - 1))
+
+
+def build_full_report(out: BinaryIO, on_progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Render the executive summary plus appendices listing every fraud
+    transaction, inventory item and energy reading into out.
+
+    Rows are read in keyset batches and turned into flowables only as the
+    layout engine reaches them. The story is laid out in part documents of
+    PART_FLOWABLES flowables (each appendix starts a new part, so a new
+    page); every finished part is appended to out by a streaming merge, so
+    memory stays flat however many rows there are. on_progress(rows_done,
+    page) is called after each appendix table. Returns the page count.
+    """
+    merger = _PdfMerger(out)
+    db = SessionLocal()
+    try:
+        done = pages = 0
+        doc = None
+
+        def on_rows(n: int) -> None:
+            nonlocal done
+            done += n
+            if on_progress:
+                on_progress(done, pages + getattr(doc, "page", 0))     # no page yet while the part prefills
+
+        def sections() -> Iterator[Iterator]:
+            yield iter(_summary_story())
+            for appendix in (
+                _appendix("Appendix A — All Transactions", ["Transaction ID", "Vendor", "Amount", "Status"],
+                          [1.8, 2.0, 1.2, 1.0], _fraud_rows(db), on_rows),
+                _appendix("Appendix B — All Inventory Items", ["Item", "Category", "Class", "Stock", "Reorder At"],
+                          [2.2, 1.4, 0.7, 0.9, 1.0], _inventory_rows(db), on_rows),
+                _appendix("Appendix C — All Energy Readings", ["Time", "Department", "Usage (kWh)", "Anomaly"],
+                          [1.8, 2.0, 1.2, 1.0], _energy_rows(db), on_rows),
+            ):
+                yield from _parts(appendix, PART_FLOWABLES)
+
+        for part in sections():
+            buffer = BytesIO()
+            doc = _document(buffer)
+            doc.build(_StreamedStory(part), canvasmaker=_CompactCanvas)
+            pages += merger.add(buffer.getvalue())
+        merger.close()
+        return pages
+    finally:
+        db.close()
@@ -0,0 +1,187 @@
+"""
+Full-text search over inventory items and fraud transactions.
+
+Backed by SQLite FTS5 tables with the trigram tokenizer (case-insensitive
+substring matching), kept in sync with the base tables by triggers so every
+writer — bulk or ORM — maintains the index without extra code.
+
+Lookups run in three passes, stopping once `limit` rows are found:
+  1. prefix   — range scan on the base table's unique index
+  2. substring — FTS5 phrase match
+  3. fuzzy    — rows ranked by how many of the query's trigrams they
+                contain, so typos still surface the closest rows
+"""
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from database import engine
+
+
+_DDL = [
+    # Inventory: external-content table over inventory(item_name, category)
+    """CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts USING fts5(
+        item_name, category, content='inventory', content_rowid='id', tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS inventory_fts_ai AFTER INSERT ON inventory BEGIN
+        INSERT INTO inventory_fts(rowid, item_name, category) VALUES (new.id, new.item_name, new.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS inventory_fts_ad AFTER DELETE ON inventory BEGIN
+        INSERT INTO inventory_fts(inventory_fts, rowid, item_name, category)
+        VALUES ('delete', old.id, old.item_name, old.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS inventory_fts_au AFTER UPDATE OF item_name, category ON inventory BEGIN
+        INSERT INTO inventory_fts(inventory_fts, rowid, item_name, category)
+        VALUES ('delete', old.id, old.item_name, old.category);
+        INSERT INTO inventory_fts(rowid, item_name, category) VALUES (new.id, new.item_name, new.category);
+    END""",
+    # Fraud: standalone table so the vendor name (a dimension lookup) can be indexed too
+    """CREATE VIRTUAL TABLE IF NOT EXISTS fraud_fts USING fts5(
+        transaction_id, vendor, tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS fraud_fts_ai AFTER INSERT ON fraud_records BEGIN
+        INSERT INTO fraud_fts(rowid, transaction_id, vendor)
+        VALUES (new.id, new.transaction_id, (SELECT name FROM vendors WHERE id = new.vendor_id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS fraud_fts_ad AFTER DELETE ON fraud_records BEGIN
+        DELETE FROM fraud_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS fraud_fts_au AFTER UPDATE OF transaction_id, vendor_id ON fraud_records BEGIN
+        DELETE FROM fraud_fts WHERE rowid = old.id;
+        INSERT INTO fraud_fts(rowid, transaction_id, vendor)
+        VALUES (new.id, new.transaction_id, (SELECT name FROM vendors WHERE id = new.vendor_id));
+    END""",
+]
+
+_REBUILD = [
+    "INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')",
+    "DELETE FROM fraud_fts",
+    """INSERT INTO fraud_fts(rowid, transaction_id, vendor)
+       SELECT f.id, f.transaction_id, v.name FROM fraud_records f LEFT JOIN vendors v ON v.id = f.vendor_id""",
+]
+
+# Fuzzy pass: skip trigrams matching more rows than this; keep rows sharing >= 30% of the rest
+_GRAM_CAP = 2000
+_MIN_SHARED_GRAMS = 0.3
+
+_fts_available = False
+
+
+def ensure_search_index(bind=engine) -> None:
+    """Create FTS tables/triggers if missing and backfill them from existing rows."""
+    global _fts_available
+    try:
+        with bind.begin() as conn:
+            existed = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = 'fraud_fts'")
+            ).first() is not None
+            for stmt in _DDL:
+                conn.execute(text(stmt))
+            if not existed:
+                for stmt in _REBUILD:
+                    conn.execute(text(stmt))
+        _fts_available = True
+    except OperationalError:
+        # SQLite built without FTS5/trigram: search falls back to prefix scans
+        _fts_available = False
+
+
+def _phrase(q: str) -> str:
+    return '"' + q.replace('"', '""') + '"'
+
+
+def prefix_bounds(prefix: str) -> Tuple[str, str]:
+    """
+    [lo, hi) bounds matching every string that starts with `prefix`.
+    Range predicates use the column's BINARY index, unlike LIKE 'prefix%'.
+    """
+    return prefix, prefix + "\U0010ffff"
+
+
+def _fts_ids(db: Session, fts: str, match: str, limit: int) -> List[int]:
+    return db.execute(
+        text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :match LIMIT :limit"),
+        {"match": match, "limit": limit},
+    ).scalars().all()
+
+
+def _fuzzy_ids(db: Session, fts: str, q: str, limit: int) -> List[int]:
+    """
+    Rows ranked by the number of trigrams they share with the query.
+    Trigrams matching more than _GRAM_CAP rows don't discriminate and are
+    skipped, so each lookup is bounded regardless of table size.
+    """
+    grams = sorted({q[i:i + 3] for i in range(len(q) - 2)})
+    shared: Counter = Counter()
+    selective = 0
+    for gram in grams:
+        ids = _fts_ids(db, fts, _phrase(gram), _GRAM_CAP + 1)
+        if len(ids) <= _GRAM_CAP:
+            selective += 1
+            shared.update(ids)
+    min_shared = max(1, round(selective * _MIN_SHARED_GRAMS))
+    return [rid for rid, n in shared.most_common() if n >= min_shared][:limit]
+
+
+def _search(db: Session, index: Dict[str, str], q: str, limit: int) -> List[Dict[str, Any]]:
+    q = q.strip()
+    if not q:
+        return []
+    limit = max(1, min(limit, 100))
+    hits: Dict[int, str] = {}
+
+    lo, hi = prefix_bounds(q)
+    for rid in db.execute(
+        text(f"SELECT {index['id']} {index['from']} WHERE {index['key']} >= :lo AND {index['key']} < :hi "
+             f"ORDER BY {index['key']} LIMIT :limit"),
+        {"lo": lo, "hi": hi, "limit": limit},
+    ).scalars():
+        hits.setdefault(rid, "prefix")
+
+    if _fts_available and len(q) >= 3:
+        if len(hits) < limit:
+            for rid in _fts_ids(db, index["fts"], _phrase(q), limit + len(hits)):
+                hits.setdefault(rid, "substring")
+        if len(hits) < limit:
+            for rid in _fuzzy_ids(db, index["fts"], q.lower(), limit + len(hits)):
+                hits.setdefault(rid, "fuzzy")
+
+    ranked = list(hits)[:limit]
+    if not ranked:
+        return []
+    rows = db.execute(
+        text(f"SELECT {index['columns']} {index['from']} WHERE {index['id']} IN :ids")
+        .bindparams(bindparam("ids", expanding=True)),
+        {"ids": ranked},
+    ).mappings()
+    by_id = {row["id"]: dict(row) for row in rows}
+    return [{**by_id[rid], "match": hits[rid]} for rid in ranked if rid in by_id]
+
+
+_INVENTORY_INDEX = {
+    "fts": "inventory_fts",
+    "id": "i.id",
+    "key": "i.item_name",
+    "columns": "i.id, i.item_name AS name, i.category, i.quantity AS stock, i.price, i.reorder_at",
+    "from": "FROM inventory i",
+}
+
+_FRAUD_INDEX = {
+    "fts": "fraud_fts",
+    "id": "r.id",
+    "key": "r.transaction_id",
+    "columns": "r.id, r.transaction_id, r.amount, r.is_fraud, v.name AS vendor",
+    "from": "FROM fraud_records r LEFT JOIN vendors v ON v.id = r.vendor_id",
+}
+
+
+def search_inventory(db: Session, q: str, limit: int = 20) -> List[Dict[str, Any]]:
+    return _search(db, _INVENTORY_INDEX, q, limit)
+
+
+def search_fraud(db: Session, q: str, limit: int = 20) -> List[Dict[str, Any]]:
+    rows = _search(db, _FRAUD_INDEX, q, limit)
+    for r in rows:
+        r["is_fraud"] = bool(r["is_fraud"])
+    return rows
@@ -0,0 +1,85 @@
+# Time-of-use tariff: rate table per day type × hour-of-day, versioned via the data-version registry
+from typing import Any, Dict, List
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from models.energy_tariff import EnergyTariffRate
+from services.data_version_service import bump_version, get_version
+
+
+DAY_TYPES = ("weekday", "weekend")
+
+# Used until a tariff is saved: off-peak 0.12, shoulder 07-17 0.20, weekday peak 17-21 0.30
+DEFAULT_BANDS = [
+    {"day_type": "weekday", "start_hour": 0, "end_hour": 7, "rate": 0.12},
+    {"day_type": "weekday", "start_hour": 7, "end_hour": 17, "rate": 0.20},
+    {"day_type": "weekday", "start_hour": 17, "end_hour": 21, "rate": 0.30},
+    {"day_type": "weekday", "start_hour": 21, "end_hour": 24, "rate": 0.12},
+    {"day_type": "weekend", "start_hour": 0, "end_hour": 17, "rate": 0.12},
+    {"day_type": "weekend", "start_hour": 17, "end_hour": 21, "rate": 0.18},
+    {"day_type": "weekend", "start_hour": 21, "end_hour": 24, "rate": 0.12},
+]
+
+
+def _bands_to_matrix(bands: List[Dict[str, Any]]) -> np.ndarray:
+    """Expand [start_hour, end_hour) bands into a 2 × 24 rate matrix (row 0 weekday, row 1 weekend)."""
+    matrix = np.full((len(DAY_TYPES), 24), np.nan)
+    for band in bands:
+        if band["day_type"] not in DAY_TYPES:
+            raise HTTPException(status_code=400, detail=f"day_type must be one of: {', '.join(DAY_TYPES)}")
+        if not 0 <= band["start_hour"] < band["end_hour"] <= 24:
+            raise HTTPException(status_code=400, detail="Bands need 0 <= start_hour < end_hour <= 24")
+        if band["rate"] < 0:
+            raise HTTPException(status_code=400, detail="rate must be non-negative")
+        matrix[DAY_TYPES.index(band["day_type"]), band["start_hour"]:band["end_hour"]] = band["rate"]
+    return matrix
+
+
+def get_rate_matrix(db: Session) -> np.ndarray:
+    """Current tariff as a 2 × 24 matrix indexed [is_weekend, hour]."""
+    rows = db.execute(select(EnergyTariffRate.day_type, EnergyTariffRate.hour, EnergyTariffRate.rate)).all()
+    if not rows:
+        return _bands_to_matrix(DEFAULT_BANDS)
+    matrix = np.full((len(DAY_TYPES), 24), np.nan)
+    for day_type, hour, rate in rows:
+        matrix[DAY_TYPES.index(day_type), hour] = rate
+    return matrix
+
+
+def _matrix_to_bands(matrix: np.ndarray) -> List[Dict[str, Any]]:
+    """Collapse runs of equal rates back into bands for display."""
+    bands = []
+    for d, day_type in enumerate(DAY_TYPES):
+        start = 0
+        for h in range(1, 25):
+            if h == 24 or matrix[d, h] != matrix[d, start]:
+                bands.append({"day_type": day_type, "start_hour": start, "end_hour": h, "rate": float(matrix[d, start])})
+                start = h
+    return bands
+
+
+def get_tariff(db: Session) -> Dict[str, Any]:
+    return {
+        "version": get_version(db, "tariff"),
+        "is_default": db.query(EnergyTariffRate).first() is None,
+        "bands": _matrix_to_bands(get_rate_matrix(db)),
+    }
+
+
+def set_tariff(db: Session, bands: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Replace the tariff. Bands must cover all 24 hours of both day types."""
+    matrix = _bands_to_matrix(bands)
+    if np.isnan(matrix).any():
+        raise HTTPException(status_code=400, detail="Bands must cover every hour of both weekday and weekend")
+    db.execute(delete(EnergyTariffRate))
+    db.execute(insert(EnergyTariffRate), [
+        {"day_type": day_type, "hour": h, "rate": float(matrix[d, h])}
+        for d, day_type in enumerate(DAY_TYPES)
+        for h in range(24)
+    ])
+    bump_version(db, "tariff")
+    db.commit()
+    return get_tariff(db)
@@ -0,0 +1,65 @@
+# Vendor dimension: bulk dictionary-encoding of vendor names into integer keys
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from models.vendor import Vendor
+
+
+# Column names accepted as the vendor field in uploaded CSVs (lowercased)
+VENDOR_COLUMN_ALIASES = ("vendor", "vendor_name", "merchant", "merchant_name", "payee", "supplier")
+
+# Keep IN (...) lists under SQLite's bound-parameter limit
+_LOOKUP_CHUNK = 500
+
+
+def find_vendor_column(columns: Iterable[str]) -> Optional[str]:
+    """Return the first column that holds vendor names, or None."""
+    for col in columns:
+        if str(col).strip().lower() in VENDOR_COLUMN_ALIASES:
+            return col
+    return None
+
+
+def _lookup_ids(names: List[str], db: Session) -> Dict[str, int]:
+    found: Dict[str, int] = {}
+    for start in range(0, len(names), _LOOKUP_CHUNK):
+        chunk = names[start:start + _LOOKUP_CHUNK]
+        rows = db.execute(select(Vendor.id, Vendor.name).where(Vendor.name.in_(chunk)))
+        found.update({name: vid for vid, name in rows})
+    return found
+
+
+def encode_vendors(names: pd.Series, db: Session) -> pd.Series:
+    """
+    Map a column of vendor names to vendor ids, inserting unseen vendors in one
+    bulk INSERT. Distinct names are factorized first so the database only sees
+    each vendor once per upload. Blank/missing names map to None.
+
+    Returns an object Series aligned with `names` (python ints or None).
+    """
+    cleaned = names.astype("string").str.strip()
+    cleaned = cleaned.mask(cleaned.isin(["", "nan", "None"]))
+    codes, uniques = pd.factorize(cleaned)
+    if len(uniques) == 0:
+        return pd.Series([None] * len(names), index=names.index, dtype="object")
+
+    unique_names = [str(n) for n in uniques]
+    id_map = _lookup_ids(unique_names, db)
+    missing = [n for n in unique_names if n not in id_map]
+    if missing:
+        db.execute(insert(Vendor), [{"name": n} for n in missing])
+        id_map.update(_lookup_ids(missing, db))
+
+    ids = np.array([id_map[n] for n in unique_names], dtype=np.int64)
+    encoded = pd.Series(ids.take(codes).astype(object), index=names.index, dtype="object")
+    return encoded.where(codes >= 0, None)
+
+
+def get_vendor_name(vendor_id: Optional[int], db: Session) -> Optional[str]:
+    if vendor_id is None:
+        return None
+    return db.execute(select(Vendor.name).where(Vendor.id == vendor_id)).scalar()
@@ -0,0 +1,213 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+import models.vendor  # noqa: F401  (expense/fraud tables reference vendors)
+from models.green_grid import GreenGridRecord
+from services.carbon_service import GOOD_RATING_KG, get_carbon_estimate
+from models.energy_forecast import EnergyForecastModel
+from services.energy_forecast_engine import MIN_BAND_SHARE, SLOTS, fit_models, get_energy_forecast
+from services.data_version_service import get_version
+from services.energy_timeseries import (
+    DEFAULT_DEPARTMENT,
+    backfill_timestamps,
+    load_hourly_matrix,
+    prepare_readings,
+    store_readings,
+)
+from services.energy_profile_service import rebuild_profile, summarize_profile
+from services.green_grid_service import get_energy_chart_data, get_green_grid_data
+from services.load_shift_engine import optimize_load_shift
+
+
+DEMO_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "demo_csv_data", "green_test.csv")
+
+
+def demo_dated(day=datetime(2024, 3, 4)):
+    """The demo upload (bare hours, no date) with its hours placed on `day`."""
+    readings = prepare_readings(pd.read_csv(DEMO_CSV))
+    ts = pd.Timestamp(day) + pd.to_timedelta(readings["hour_of_day"].astype(int), unit="h")
+    return readings.assign(ts=ts, hour_of_day=None)
+
+
+def demo_hourly():
+    """The dated demo readings as hourly totals, like _hourly_totals."""
+    readings = demo_dated()
+    hourly = readings.groupby(["department", readings["ts"]])["usage_kwh"].sum()
+    return hourly.rename("kwh").rename_axis(["department", "hour"]).reset_index()
+
+
+def memory_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def test_backfill_timestamps_skips_failed_rows():
+    engine = memory_engine()
+    with Session(engine) as db:
+        db.add_all([
+            GreenGridRecord(hour="2024-03-01 08:00", usage_kwh=12.0),
+            GreenGridRecord(hour="not a time", usage_kwh=9.0),
+            GreenGridRecord(hour="19", usage_kwh=7.0),
+            # Stamped with the startup date by an older version
+            GreenGridRecord(hour="20", ts=datetime(2024, 3, 9, 20), department=DEFAULT_DEPARTMENT, usage_kwh=5.0),
+        ])
+        db.commit()
+    backfill_timestamps(bind=engine)
+    with Session(engine) as db:
+        rows = {r.hour: (r.ts, r.hour_of_day, r.department) for r in db.query(GreenGridRecord)}
+        assert get_version(db, "green_grid") == 1, "clearing invented dates bumps the version"
+    assert rows["2024-03-01 08:00"][0] is not None
+    assert rows["not a time"] == (None, None, DEFAULT_DEPARTMENT), "unparseable row is marked as attempted"
+    assert rows["19"] == (None, 19, DEFAULT_DEPARTMENT), "a bare hour gets no date"
+    assert rows["20"] == (None, 20, DEFAULT_DEPARTMENT), "an invented date is cleared"
+
+    updates = []
+    event.listen(engine, "before_cursor_execute", lambda *a: updates.append(a[2]) if a[2].startswith("UPDATE") else None)
+    backfill_timestamps(bind=engine)
+    assert not updates, "second startup must not retry unparseable rows"
+    print("✓ backfill_timestamps parses once, invents no dates and does not retry unparseable labels")
+
+
+def test_hour_only_upload_stays_out_of_time_series():
+    engine = memory_engine()
+    readings = prepare_readings(pd.read_csv(DEMO_CSV))
+    with Session(engine) as db:
+        store_readings(readings, db)
+        db.commit()
+        assert db.query(GreenGridRecord).filter(GreenGridRecord.ts.is_not(None)).count() == 0, "no invented dates"
+        assert db.query(GreenGridRecord).filter(GreenGridRecord.is_anomaly.is_not(None)).count() == 0
+        assert get_energy_chart_data(db) == []
+        assert load_hourly_matrix(db)[1].shape == (0, 24)
+        assert get_carbon_estimate(db)["basis_days"] == 0
+        profile = summarize_profile(db)
+    by_hour = readings.groupby("hour_of_day")["usage_kwh"].mean()
+    assert profile["readings"] == len(readings) and profile["slots"] == 0
+    assert profile["peak_hours"][0] == by_hour.idxmax(), "hour-of-day stats still use the upload"
+    print(f"✓ hour-only upload: no ts, no chart/carbon/anomaly rows, peak hours {profile['peak_hours']}")
+
+
+def test_chart_skips_rows_without_ts():
+    engine = memory_engine()
+    with Session(engine) as db:
+        db.add_all(
+            [GreenGridRecord(hour=f"h{i}", ts=datetime(2024, 3, 1) + timedelta(minutes=10 * i),
+                             department=DEFAULT_DEPARTMENT, usage_kwh=float(i % 7)) for i in range(60)]
+            + [GreenGridRecord(hour="not a time", department=DEFAULT_DEPARTMENT, usage_kwh=99.0)]
+        )
+        db.commit()
+        for method in ("bucket", "lttb"):
+            points = get_energy_chart_data(db, max_points=20, method=method)
+            assert 0 < len(points) <= 20, (method, len(points))
+            assert all(p["ts"] is not None for p in points), method
+            assert max(p.get("max", p["usage"]) for p in points) < 99, f"{method} included an unplaced row"
+        full = get_energy_chart_data(db, max_points=100)
+        assert len(full) == 60
+    print("✓ chart (bucket, lttb, raw) ignores rows without a parsed ts")
+
+
+def test_flat_load_has_no_negative_savings():
+    engine = memory_engine()
+    start = datetime(2024, 3, 4)
+    with Session(engine) as db:
+        db.add_all([
+            GreenGridRecord(hour=f"h{i}", ts=start + timedelta(hours=i), department=DEFAULT_DEPARTMENT, usage_kwh=1.0)
+            for i in range(48)
+        ])
+        db.commit()
+        data = get_green_grid_data(db, start=start, end=start + timedelta(days=2))
+    assert data["potential_savings_percent"] == 0.0
+    assert str(data["potential_savings_percent"]) == "0.0", data["potential_savings_percent"]
+    print("✓ flat load reports 0.0% savings, not -0.0")
+
+
+def test_load_shift_never_reports_negative_reduction():
+    plan = optimize_load_shift(np.full((7, 24), 3.3), 0.2)
+    for key in ("peak_reduction_kwh", "peak_reduction_percent", "avg_daily_peak_reduction_kwh"):
+        assert str(plan[key]) == "0.0", (key, plan[key])
+    assert plan["optimized_peak_kwh"] <= plan["original_peak_kwh"]
+    print("✓ optimize_load_shift clamps a flat load's reductions to 0.0")
+
+
+def test_forecast_with_one_day_of_history():
+    hourly = demo_hourly()
+    model = fit_models(hourly).iloc[0]
+    by_hour = hourly.set_index(hourly["hour"].dt.hour)["kwh"]
+    profile = np.asarray(model["profile"]).reshape(SLOTS // 24, 24)
+    # Unseen weekdays repeat the observed day's shape instead of a flat mean
+    assert np.allclose(profile, profile[0]), "every weekday should share the hour-of-day levels"
+    assert profile[0].std() > 0.5 * by_hour.std()
+    assert np.isclose(model["residual_std"], MIN_BAND_SHARE * by_hour.mean()), "no spare dof → minimum band"
+    print(f"✓ 24h history: hour-of-day profile (std {profile[0].std():.1f}), residual_std={model['residual_std']:.2f}")
+
+
+def test_forecast_residual_std_counts_parameters():
+    rng = np.random.default_rng(7)
+    hours = pd.date_range("2024-01-01", periods=3 * SLOTS, freq="h")
+    kwh = 50 + 10 * np.sin(hours.hour / 24 * 2 * np.pi) + rng.normal(0, 8.0, len(hours))
+    model = fit_models(pd.DataFrame({"department": "Ops", "hour": hours, "kwh": kwh})).iloc[0]
+    # 504 hours, 169 parameters: the dof-corrected spread is close to the true noise
+    assert 7.0 < model["residual_std"] < 9.0, model["residual_std"]
+    print(f"✓ 3 weeks of noise σ=8: residual_std={model['residual_std']:.2f}")
+
+
+def test_forecast_is_fitted_on_write_not_on_read():
+    engine = memory_engine()
+    with Session(engine) as db:
+        store_readings(demo_dated(), db)
+        db.commit()
+        stored = db.query(EnergyForecastModel).all()
+        assert stored and all(m.data_version == get_version(db, "green_grid") for m in stored), "refit after the upload"
+
+    writes = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda *a: writes.append(a[2]) if a[2].split()[0] in ("INSERT", "UPDATE", "DELETE") else None)
+    with Session(engine) as db:
+        db.query(EnergyForecastModel).delete()      # as if the refit had failed
+        db.commit()
+        writes.clear()
+        forecast = get_energy_forecast(db, hours=24)
+    assert not writes, writes
+    assert forecast["departments"], "falls back to an in-memory fit"
+    print("✓ forecast models are refitted by the upload's commit; GET only reads")
+
+
+def test_carbon_estimate_from_demo_upload():
+    engine = memory_engine()
+    readings = demo_dated()
+    with Session(engine) as db:
+        db.add_all([GreenGridRecord(**r) for r in readings.to_dict("records")])
+        db.commit()
+        rebuild_profile(db)
+        db.commit()
+        est = get_carbon_estimate(db)
+    day_kwh = readings["usage_kwh"].sum()
+    # Annualised from the one day that has readings, and flagged as such
+    assert est["basis_days"] == 1 and est["low_confidence"]
+    assert abs(est["kwh_per_year"] - day_kwh * 365) < 1, est
+    assert est["rating"] == ("good" if est["kg_co2_per_year"] < GOOD_RATING_KG else "moderate"), est
+    print(f"✓ demo day: {est['kg_co2_per_year']:,.0f} kg CO2/yr from 1 day (low confidence), rating {est['rating']}")
+
+
+if __name__ == "__main__":
+    test_backfill_timestamps_skips_failed_rows()
+    test_hour_only_upload_stays_out_of_time_series()
+    test_chart_skips_rows_without_ts()
+    test_flat_load_has_no_negative_savings()
+    test_load_shift_never_reports_negative_reduction()
+    test_forecast_with_one_day_of_history()
+    test_forecast_residual_std_counts_parameters()
+    test_forecast_is_fitted_on_write_not_on_read()
+    test_carbon_estimate_from_demo_upload()
+    print("\n ALL TESTS PASSED")
@@ -0,0 +1,91 @@
+import io
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pathlib import Path
+
+from fastapi import UploadFile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+import models.vendor  # noqa: F401  (expense/fraud tables reference vendors)
+from models.fraud import FraudRecord
+from models.health_score import HealthScoreRecord
+from services import fraud_service
+from services.data_version_service import bump_version, get_version, on_version_change
+from services.health_score_service import get_health_score, record_health_score
+
+
+def memory_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def history_rows(engine):
+    with Session(engine) as db:
+        return db.query(HealthScoreRecord).count()
+
+
+def test_reads_do_not_record_history():
+    engine = memory_engine()
+    with Session(engine) as db:
+        db.add_all([FraudRecord(transaction_id=f"T{i}", amount=10.0, is_fraud=i == 0) for i in range(10)])
+        bump_version(db, "fraud")
+        db.commit()
+        db.query(HealthScoreRecord).delete()    # drop the row the upload's commit recorded
+        db.commit()
+        for _ in range(3):
+            assert get_health_score(db)["score"] > 0
+    assert history_rows(engine) == 0, "GET must not write history"
+    print("✓ get_health_score is read-only")
+
+
+def test_history_row_per_data_state():
+    engine = memory_engine()
+    with Session(engine) as db:
+        db.add_all([FraudRecord(transaction_id=f"T{i}", amount=10.0, is_fraud=i == 0) for i in range(10)])
+        bump_version(db, "fraud")
+        db.commit()
+    assert history_rows(engine) == 1, "the commit that bumped fraud records the new state"
+    record_health_score(bind=engine)
+    assert history_rows(engine) == 1, "same versions → one row"
+
+    with Session(engine) as db:
+        db.add(FraudRecord(transaction_id="T10", amount=10.0, is_fraud=True))
+        bump_version(db, "fraud")
+        db.commit()
+    assert history_rows(engine) == 2
+    print("✓ one history row per distinct data state")
+
+
+def test_fraud_upload_bumps_once():
+    engine = memory_engine()
+    changes = []
+    on_version_change(lambda modules, bind: changes.append(set(modules)) if bind is engine else None)
+    csv = b"transaction_id,amount\n" + b"".join(b"T%d,%d\n" % (i, 10 + i) for i in range(20))
+    snapshot = fraud_service._SNAPSHOT_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        fraud_service._SNAPSHOT_PATH = Path(tmp) / "fraud_snapshot.json"
+        try:
+            for _ in range(2):     # the second upload replaces the first
+                with Session(engine) as db:
+                    fraud_service.upload_fraud_csv(UploadFile(io.BytesIO(csv), filename="tx.csv"), db)
+        finally:
+            fraud_service._SNAPSHOT_PATH = snapshot
+    with Session(engine) as db:
+        assert get_version(db, "fraud") == 2
+        assert db.query(FraudRecord).count() == 20
+    assert changes == [{"fraud"}, {"fraud"}], changes
+    assert history_rows(engine) == 2, "no history row for the cleared, empty state"
+    print("✓ a fraud upload replaces its rows in one commit with one version bump")
+
+
+if __name__ == "__main__":
+    test_reads_do_not_record_history()
+    test_history_row_per_data_state()
+    test_fraud_upload_bumps_once()
+    print("\n ALL TESTS PASSED")
@@ -0,0 +1,173 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+import models.vendor  # noqa: F401  (expense/fraud tables reference vendors)
+from models.inventory import InventoryItem
+from models.inventory_snapshot import InventorySnapshot
+from services.classification_engine import backfill_inventory_classes, compute_classes
+from services.data_version_service import get_version
+from services.forecast_engine import load_stock_history
+from services.inventory_history_service import list_snapshot_times, record_stock_snapshots
+from services.reorder_engine import (
+    MIN_DEMAND_INTERVALS,
+    backfill_reorder_points,
+    compute_reorder_points,
+    demand_std,
+)
+from services.stockout_engine import get_stockout_risk
+
+
+def memory_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def seed_inventory(engine, history):
+    """history: {item_name: (category, price, [quantity per weekly upload, None = not listed yet])}"""
+    start = datetime(2024, 1, 1)
+    with Session(engine) as db:
+        for name, (category, price, quantities) in history.items():
+            db.add(InventoryItem(item_name=name, category=category, quantity=quantities[-1], price=price))
+            for week, qty in enumerate(quantities):
+                if qty is None:     # not listed yet
+                    continue
+                db.add(InventorySnapshot(
+                    item_name=name, category=category, quantity=qty, price=price,
+                    captured_at=start + timedelta(weeks=week),
+                ))
+        db.commit()
+
+
+def test_demand_std_needs_enough_intervals():
+    t0 = datetime(2024, 1, 1)
+    history = pd.DataFrame(
+        [("Steady", t0 + timedelta(weeks=w), 100 - 10 * w) for w in range(5)]
+        + [("Bursty", t0 + timedelta(weeks=w), q) for w, q in enumerate([100, 70, 68, 30, 29])]
+        + [("New", t0 + timedelta(weeks=w), 50 - w) for w in range(MIN_DEMAND_INTERVALS)],
+        columns=["item_name", "captured_at", "quantity"],
+    )
+    std = demand_std(history)
+    assert std["Steady"] == 0.0
+    assert std["Bursty"] > 15
+    assert pd.isna(std["New"]), "too few intervals → category fallback"
+    print(f"✓ demand_std: steady=0, bursty={std['Bursty']:.1f}, short history=NaN")
+
+
+def test_safety_stock_is_per_sku():
+    items = pd.DataFrame({
+        "item_name": ["Steady", "Bursty", "New"],
+        "category": ["Tools"] * 3,
+        "quantity": [60, 29, 48],
+        "slope": [-10.0, -18.0, -1.0],
+        "demand_std": [0.0, 18.0, float("nan")],
+    })
+    points = compute_reorder_points(items).set_index("item_name")
+    category = compute_reorder_points(items.drop(columns="demand_std")).set_index("item_name")
+    assert points.loc["Steady", "safety_stock"] == 0
+    assert points.loc["Bursty", "safety_stock"] > points.loc["Steady", "safety_stock"]
+    assert points.loc["New", "safety_stock"] == category.loc["New", "safety_stock"]
+    print(f"✓ safety stock per SKU: {points['safety_stock'].to_dict()}")
+
+
+def test_backfill_reorder_points():
+    engine = memory_engine()
+    seed_inventory(engine, {
+        "Cable": ("Electronics", 5.0, [80, 60, 40, 20, 3]),
+        "Desk": ("Furniture", 120.0, [10, 10, 10, 10, 10]),
+    })
+    backfill_reorder_points(bind=engine)
+    with Session(engine) as db:
+        reorder_at = dict(db.query(InventoryItem.item_name, InventoryItem.reorder_at))
+        assert get_version(db, "inventory") == 1, "a backfill that changed rows bumps the version"
+    backfill_reorder_points(bind=engine)
+    with Session(engine) as db:
+        assert get_version(db, "inventory") == 1, "nothing left to fill → no bump"
+    assert all(v is not None for v in reorder_at.values()), reorder_at
+    assert reorder_at["Cable"] > 3, "depleting SKU should be flagged low"
+    assert reorder_at["Desk"] == 5
+    print(f"✓ backfill filled reorder_at: {reorder_at}")
+
+
+def test_backfill_inventory_classes():
+    engine = memory_engine()
+    seed_inventory(engine, {
+        "Laptop": ("Electronics", 900.0, [20, 20, 20, 20]),
+        "Cable": ("Electronics", 5.0, [80, 10, 60, 5]),
+        "Mouse": ("Electronics", 25.0, [None, None, 30, 30]),
+    })
+    backfill_inventory_classes(bind=engine)
+    backfill_inventory_classes(bind=engine)
+    with Session(engine) as db:
+        classes = {n: (a, x) for n, a, x in db.query(InventoryItem.item_name, InventoryItem.abc_class, InventoryItem.xyz_class)}
+        assert get_version(db, "inventory") == 1, "bumped once, by the run that wrote classes"
+    assert classes["Laptop"] == ("A", "X"), classes
+    assert classes["Cable"][1] == "Z", classes
+    assert classes["Mouse"][0] is not None and classes["Mouse"][1] is None, "short history has no XYZ class"
+    print(f"✓ backfill filled ABC/XYZ: {classes}")
+
+
+def test_unchanged_uploads_add_no_rows_but_count_as_observations():
+    engine = memory_engine()
+    start = datetime(2024, 1, 1)
+    uploads = [
+        {"Desk": 10, "Cable": 80},
+        {"Desk": 10, "Cable": 60},
+        {"Desk": 10, "Cable": 60},     # nothing changed
+        {"Desk": 10, "Cable": 40},
+    ]
+    with Session(engine) as db:
+        for week, stock in enumerate(uploads):
+            records = [{"item_name": n, "category": "Office", "quantity": q, "price": 5.0} for n, q in stock.items()]
+            if week == 0:
+                db.add_all([InventoryItem(**r) for r in records])
+            written = record_stock_snapshots(records, db, start + timedelta(weeks=week))
+            assert written == [2, 1, 0, 1][week], (week, written)
+        db.commit()
+
+        assert db.query(InventorySnapshot).filter_by(item_name="Desk").count() == 1, "no duplicate history rows"
+        assert [t["changed_items"] for t in list_snapshot_times(db)] == [1, 1, 2]
+
+        history = load_stock_history(db)
+        desk = history[history["item_name"] == "Desk"]
+        cable = history[history["item_name"] == "Cable"]
+        assert desk["quantity"].tolist() == [10, 10, 10, 10], "flat periods are forward-filled"
+        assert cable["quantity"].tolist() == [80, 60, 60, 40]
+
+        items = pd.DataFrame({"item_name": ["Desk", "Cable"], "quantity": [10, 40], "price": [5.0, 5.0]})
+        classes = compute_classes(items, history).set_index("item_name")["xyz_class"]
+    assert classes["Desk"] == "X", classes
+    print(f"✓ unchanged SKUs add no rows; history forward-fills them per upload (XYZ {classes.to_dict()})")
+
+
+def test_stockout_uses_per_sku_spread():
+    engine = memory_engine()
+    seed_inventory(engine, {
+        "Steady": ("Tools", 5.0, [100, 90, 80, 70, 60]),
+        "Bursty": ("Tools", 5.0, [100, 100, 70, 70, 60]),
+        "Bolt": ("Tools", 1.0, [200, 150, 100, 50, 60]),
+    })
+    with Session(engine) as db:
+        risk = {i["name"]: i["stockout_probability"] for i in get_stockout_risk(db)["items"]}
+    assert risk["Steady"] == 0.0, "a steady SKU must not inherit the category's spread"
+    assert risk["Bursty"] > 0.1, risk
+    print(f"✓ stockout risk uses each SKU's own demand spread: {risk}")
+
+
+if __name__ == "__main__":
+    test_demand_std_needs_enough_intervals()
+    test_safety_stock_is_per_sku()
+    test_backfill_reorder_points()
+    test_backfill_inventory_classes()
+    test_unchanged_uploads_add_no_rows_but_count_as_observations()
+    test_stockout_uses_per_sku_spread()
+    print("\n ALL TESTS PASSED")
@@ -0,0 +1,238 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import io
+import multiprocessing
+import re
+import sqlite3
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from core.security import get_current_user
+from database import Base, SessionLocal, get_db
+import models.vendor  # noqa: F401  (expense/fraud tables reference vendors)
+from models.fraud import FraudRecord
+from routers import report
+from services import data_version_service, fraud_service, report_cache, report_jobs, report_service
+from services.data_version_service import bump_version
+
+
+def make_client():
+    """Report router on an in-memory database, a temp cache dir and a temp fraud snapshot."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal.configure(bind=engine)
+    tmp = Path(tempfile.mkdtemp())
+    report_cache.REPORT_CACHE_DIR = str(tmp / "reports")
+    fraud_service._SNAPSHOT_PATH = report_service._FRAUD_SNAPSHOT_PATH = tmp / "fraud_snapshot.json"
+    # Renders happen on request here, not in the background pre-render thread
+    if report_cache.schedule_prerender in data_version_service._listeners:
+        data_version_service._listeners.remove(report_cache.schedule_prerender)
+
+    def db_override():
+        with Session(engine) as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(report.router)
+    app.dependency_overrides[get_db] = db_override
+    app.dependency_overrides[get_current_user] = lambda: {"sub": "tester"}
+    return TestClient(app), engine
+
+
+def upload_fraud(engine, start):
+    with Session(engine) as db:
+        db.add_all([FraudRecord(transaction_id=f"T{i}", amount=100, is_fraud=i % 4 == 0) for i in range(start, start + 8)])
+        bump_version(db, "fraud")
+        db.commit()
+
+
+def test_etag_and_304():
+    client, engine = make_client()
+    upload_fraud(engine, 0)
+    first = client.get("/report/pdf")
+    assert first.status_code == 200 and first.content.startswith(b"%PDF")
+    etag = first.headers["etag"]
+    again = client.get("/report/pdf", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["etag"] == etag
+    assert client.get("/report/pdf", headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+
+    upload_fraud(engine, 100)
+    changed = client.get("/report/pdf", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    print("✓ /report/pdf: ETag, 304 on match, fresh render after a data change")
+
+
+def test_fraud_snapshot_changes_report_key():
+    client, engine = make_client()
+    upload_fraud(engine, 0)
+    # A download between the upload's commit and its snapshot write...
+    stale = client.get("/report/pdf")
+    with Session(engine) as db:
+        before = report_cache.report_key(db)
+    fraud_service._write_fraud_snapshot({"transactions": [
+        {"transaction_id": "T0", "amount": 100, "risk_score": 80, "risk_label": "High Risk"}
+    ]})
+    with Session(engine) as db:
+        after = report_cache.report_key(db)
+    # ...must not be served once the snapshot lands
+    assert before != after, "snapshot write must change the report key"
+    fresh = client.get("/report/pdf", headers={"If-None-Match": stale.headers["etag"]})
+    assert fresh.status_code == 200 and fresh.headers["etag"] != stale.headers["etag"]
+    print(f"✓ fraud snapshot write re-keys the cached report ({before} → {after})")
+
+
+def test_served_file_is_not_pruned():
+    client, engine = make_client()
+    upload_fraud(engine, 0)
+    path, etag = report_cache.get_report_file()
+    directory = path.parent
+    old = time.time() - 3600
+    for i in range(report_cache.KEEP_REPORTS + 1):
+        fake = directory / f"report_old{i}_{i:032d}.pdf"
+        fake.write_bytes(b"%PDF")
+        os.utime(fake, (old + i, old + i))
+    os.utime(path, (old - 60, old - 60))     # rendered long ago...
+
+    assert report_cache.get_report_file() == (path, etag)   # ...but served now
+    report_cache._prune()
+    assert path.exists(), "a file just handed to a response must survive the prune"
+    assert len(list(directory.glob("report_*.pdf"))) == report_cache.KEEP_REPORTS
+
+    path.unlink()    # pruned anyway between lookup and use → render again
+    assert report_cache.get_report_file()[0].exists()
+    print("✓ _prune keeps recently served reports; a vanished hit is re-rendered")
+
+
+def test_prerender_is_rate_limited():
+    renders = []
+    real = (report_cache.get_report_file, report_cache.PRERENDER_DELAY_SECONDS, report_cache.PRERENDER_INTERVAL_SECONDS)
+    report_cache.get_report_file = lambda: renders.append(time.monotonic())
+    report_cache.PRERENDER_DELAY_SECONDS, report_cache.PRERENDER_INTERVAL_SECONDS = 0.05, 1.0
+    try:
+        report_cache.schedule_prerender({"green_grid"})
+        time.sleep(0.3)
+        assert len(renders) == 1
+        for _ in range(5):      # live-ingest flushes
+            report_cache.schedule_prerender({"green_grid"})
+            time.sleep(0.05)
+        time.sleep(0.2)
+        assert len(renders) == 1, "no second render inside the interval"
+        time.sleep(0.9)
+        assert len(renders) == 2, "changes during the interval get one render after it"
+    finally:
+        report_cache.get_report_file, report_cache.PRERENDER_DELAY_SECONDS, report_cache.PRERENDER_INTERVAL_SECONDS = real
+    print(f"✓ background renders are at least {report_cache.PRERENDER_INTERVAL_SECONDS:g}s apart under live ingest")
+
+
+def pdf_objects(pdf: bytes):
+    """(object count, page count, all page text) of a PDF, checking every xref offset on the way."""
+    xref = int(pdf[pdf.rindex(b"startxref") + 9:].split()[0])
+    lines = pdf[xref:].split(b"\n")
+    size = int(lines[1].split()[1])
+    for obj, line in enumerate(lines[3:2 + size], 1):
+        assert pdf[int(line[:10]):].startswith(b"%d 0 obj" % obj), obj
+    root = int(re.search(rb"/Root (\d+) 0 R", pdf[xref:]).group(1))
+    tree = re.search(rb"/Pages (\d+) 0 R", pdf[int(lines[2 + root][:10]):]).group(1)
+    count = int(re.search(rb"/Count (\d+)", pdf[int(lines[2 + int(tree)][:10]):]).group(1))
+    text = b"".join(zlib.decompress(s) for s in re.findall(rb"stream\n(.*?)endstream", pdf, re.S))
+    return size, count, text
+
+
+def test_full_report_is_complete_across_parts():
+    client, engine = make_client()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO fraud_records (transaction_id, amount, is_fraud) VALUES (?, ?, ?)",
+            [(f"T{i}", 100, i % 4 == 0) for i in range(1200)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO green_grid_records (hour, hour_of_day, department, usage_kwh) VALUES ('19', 19, 'Ops', 2.5)"
+        )
+    part = report_service.PART_FLOWABLES
+    report_service.PART_FLOWABLES = 5       # many small parts
+    try:
+        out = io.BytesIO()
+        pages = report_service.build_full_report(out)
+    finally:
+        report_service.PART_FLOWABLES = part
+    size, count, text = pdf_objects(out.getvalue())
+    assert count == pages > 24, (count, pages)
+    assert b"(T0)" in text and b"(T1199)" in text, "every row is listed"
+    assert b"19:00 \\(no date\\)" in text, "hour-only readings are listed too"
+    assert b"Truncated" not in text
+    print(f"✓ full report: 1,200 rows over {pages} pages merged from parts into one valid PDF ({size} objects)")
+
+
+def _rss_kb() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def _render_rss_growth(db_path: str):
+    """Worker process: render the full report from db_path; (pages, peak RSS growth in KB over the render)."""
+    SessionLocal.configure(bind=create_engine(f"sqlite:///{db_path}"))
+    report_service._FRAUD_SNAPSHOT_PATH = Path(db_path).with_suffix(".json")
+    start = peak = _rss_kb()
+
+    def sample(rows: int, page: int) -> None:
+        nonlocal peak
+        peak = max(peak, _rss_kb())
+
+    with open(os.devnull, "wb") as out:
+        pages = report_service.build_full_report(out, sample)
+    return pages, peak - start
+
+
+def test_full_report_memory_is_flat():
+    tmp = Path(tempfile.mkdtemp())
+    growth = {}
+    for rows in (5_000, 120_000):
+        path = tmp / f"report_{rows}.db"
+        Base.metadata.create_all(bind=create_engine(f"sqlite:///{path}"))
+        with sqlite3.connect(path) as conn:
+            conn.executemany(
+                "INSERT INTO fraud_records (transaction_id, amount, is_fraud) VALUES (?, ?, ?)",
+                ((f"T{i}", 100, i % 4 == 0) for i in range(rows)),
+            )
+        # A fresh process per size, so peak RSS is this render's alone
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pages, growth[rows] = pool.submit(_render_rss_growth, str(path)).result()
+        assert pages > rows / 50
+    extra_mb = (growth[120_000] - growth[5_000]) / 1024
+    assert extra_mb < 20, f"peak RSS grew {extra_mb:.1f} MB more for 24x the rows"
+    print(f"✓ 120,000-row report peaks {extra_mb:.1f} MB above a 5,000-row one")
+
+
+def test_importing_main_has_no_startup_side_effects():
+    calls = []
+    real = report_jobs.fail_interrupted_jobs
+    report_jobs.fail_interrupted_jobs = lambda *a, **k: calls.append(1)
+    try:
+        sys.modules.pop("main", None)
+        import main  # noqa: F401  (what a spawned report worker does via __mp_main__)
+    finally:
+        report_jobs.fail_interrupted_jobs = real
+    assert not calls, "startup work belongs in the lifespan, not at import"
+    print("✓ importing main does not fail running report jobs")
+
+
+if __name__ == "__main__":
+    test_etag_and_304()
+    test_fraud_snapshot_changes_report_key()
+    test_served_file_is_not_pruned()
+    test_prerender_is_rate_limited()
+    test_full_report_is_complete_across_parts()
+    test_full_report_memory_is_flat()
+    test_importing_main_has_no_startup_side_effects()
+    print("\n ALL TESTS PASSED")
@@ -59,6 +59,7 @@ const unlockVariants = {
 
 export default function SmartInventory() {
   const [summary, setSummary] = useState<Awaited<ReturnType<typeof inventoryApi.summary>> | null>(null)
+  const [itemsPage, setItemsPage] = useState<Awaited<ReturnType<typeof inventoryApi.items>> | null>(null)
   const [forecast, setForecast] = useState<Awaited<ReturnType<typeof inventoryApi.forecast>> | null>(null)
   const [isClearing, setIsClearing] = useState(false)
   const { hasData, loading, refreshStatus } = useModuleStatus('inventory')
@@ -66,11 +67,19 @@ export default function SmartInventory() {
 
   const loadData = () => {
     inventoryApi.summary().then(setSummary).catch(() => setSummary(null))
+    inventoryApi.items().then(setItemsPage).catch(() => setItemsPage(null))
     inventoryApi.forecast().then(setForecast).catch(() => setForecast(null))
   }
 
   useEffect(() => { if (hasData) loadData() }, [hasData])
 
+  const loadMoreItems = () => {
+    if (!itemsPage?.next_cursor) return
+    inventoryApi.items(itemsPage.next_cursor)
+      .then(next => setItemsPage({ items: [...itemsPage.items, ...next.items], next_cursor: next.next_cursor }))
+      .catch(() => {})
+  }
+
   const handleFileUpload = async (file: File) => {
     const res = await inventoryApi.upload(file)
     if (res.success) { await refreshStatus(); loadData(); return res }
@@ -82,7 +91,7 @@ export default function SmartInventory() {
     setIsClearing(true)
     try {
       await inventoryApi.clear()
-      setSummary(null); setForecast(null)
+      setSummary(null); setItemsPage(null); setForecast(null)
       await refreshStatus()
     } catch { alert('Failed to reset.') } finally { setIsClearing(false) }
   }
@@ -151,7 +160,7 @@ export default function SmartInventory() {
           <p className="mb-1 text-[10px] font-bold uppercase tracking-[0.13em]" style={{ color: 'rgb(var(--ds-text-muted))', fontFamily: 'var(--ds-font-mono)' }}>Total Items</p>
           <div className="flex items-center gap-2">
             <Box className="h-5 w-5" style={{ color: ACCENT }} />
-            <span className="text-3xl font-black" style={{ color: ACCENT, fontFamily: 'var(--ds-font-display)' }}>{summary?.items?.length ?? 0}</span>
+            <span className="text-3xl font-black" style={{ color: ACCENT, fontFamily: 'var(--ds-font-display)' }}>{summary?.total_items ?? 0}</span>
           </div>
           <p className="mt-1 text-xs" style={{ color: 'rgb(var(--ds-text-muted))', fontFamily: 'var(--ds-font-mono)' }}>SKUs tracked</p>
         </div>
@@ -185,9 +194,9 @@ export default function SmartInventory() {
           style={{ background: 'rgb(var(--ds-bg-surface))', border: `1px solid ${ACCENT}15`, boxShadow: 'var(--ds-card-shadow)' }}
         >
           <p className="mb-4 text-[10px] font-bold uppercase tracking-[0.13em]" style={{ color: 'rgb(var(--ds-text-muted))', fontFamily: 'var(--ds-font-mono)' }}>STOCK LEVELS</p>
-          {summary?.items ? (
+          {itemsPage?.items ? (
             <div className="inv-scroll space-y-2.5 max-h-64 overflow-y-auto pr-2">
-              {summary.items.map((item, i) => {
+              {itemsPage.items.map((item, i) => {
                 const isLow = item.stock < item.reorder_at
                 const pct = Math.min(100, (item.stock / (item.reorder_at * 3)) * 100)
                 return (
@@ -220,6 +229,15 @@ export default function SmartInventory() {
                   </motion.div>
                 )
               })}
+              {itemsPage.next_cursor && (
+                <button
+                  onClick={loadMoreItems}
+                  className="w-full rounded-xl py-2 text-xs font-semibold"
+                  style={{ color: ACCENT, border: `1px solid ${ACCENT}30`, fontFamily: 'var(--ds-font-mono)' }}
+                >
+                  Load more
+                </button>
+              )}
             </div>
           ) : (
             <p className="text-xs" style={{ color: 'rgb(var(--ds-text-muted))', fontFamily: 'var(--ds-font-mono)' }}>Loading stock data…</p>
@@ -2,7 +2,11 @@ import { api, uploadCsv } from '../../../services/api'
 
 export const inventoryApi = {
     status: () => api<{ has_data: boolean }>('/inventory/status'),
-    summary: () => api<{ items: { name: string; stock: number; reorder_at: number }[]; low_stock_count: number; suggestions: string[] }>('/inventory/summary'),
+    summary: () => api<{ total_items: number; total_units: number; total_value: number; low_stock_count: number; suggestions: string[] }>('/inventory/summary'),
+    items: (cursor?: string) =>
+        api<{ items: { name: string; stock: number; reorder_at: number; category: string; price: number; safety_stock: number | null; days_of_cover: number | null; abc_class: string | null; xyz_class: string | null }[]; next_cursor: string | null }>(
+            `/inventory/items?sort=stock&limit=50${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`
+        ),
     forecast: () => api<{ week: string; predicted_stock: number }[]>('/inventory/forecast'),
     upload: (file: File) =>
         uploadCsv<{ success: boolean; records_added: number; errors: string[] }>('/inventory/upload-csv', file),
@@ -777,6 +777,7 @@ export default function Dashboard() {
                   <p className="mt-1.5 text-xs leading-relaxed max-w-xs"
                     style={{ color: 'rgba(108,128,162,0.8)', fontFamily: 'var(--ds-font-mono)' }}>
                     {carbon.equivalent}
+                    {carbon.low_confidence && ` · low confidence (${carbon.basis_days} day${carbon.basis_days === 1 ? '' : 's'} of readings)`}
                   </p>
                 </div>
                 <div className="shrink-0 rounded-xl px-4 py-2 text-center"
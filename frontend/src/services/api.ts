@@ -83,7 +83,12 @@ export const recommendations = {
   list: () => api<{ id: number; category: string; icon: string; title: string; priority: string }[]>('/recommendations'),
 }
 export const carbon = {
-  estimate: () => api<{ kg_co2_per_year: number; equivalent: string; rating: string; suggestions: string[] }>('/carbon/estimate'),
+  estimate: () => api<{ kg_co2_per_year: number; equivalent: string; rating: string; basis_days: number; low_confidence: boolean; suggestions: string[] }>('/carbon/estimate'),
+}
+export type DataVersions = Record<string, { version: number; row_count: number; updated_at: string | null }>
+export const dataVersions = {
+  // Cheap registry read; /data/versions/stream pushes the same shape as SSE `versions` events
+  get: () => api<DataVersions>('/data/versions'),
 }
 export const report = {
   pdf: async (): Promise<Blob> => {